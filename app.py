@@ -1,6 +1,8 @@
-from flask import Flask, render_template, request, jsonify, session, send_file, send_from_directory
+from flask import Flask, render_template, request, jsonify, session, send_file, send_from_directory, stream_with_context, url_for
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime, date, timedelta
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import parse_options_header
+from datetime import datetime, date, timedelta, timezone
 import requests
 from bs4 import BeautifulSoup
 import threading
@@ -10,7 +12,15 @@ import csv
 import io
 import json
 import sqlite3
-from urllib.parse import urljoin
+import atexit
+import hashlib
+import queue
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+from itertools import groupby, islice
+from operator import attrgetter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse, parse_qs, urlencode, urlunparse
 # Optional timezone support
 try:
     import pytz  # type: ignore
@@ -26,7 +36,8 @@ except ImportError as e:
     pytz = FallbackTimezone()  # type: ignore
 # Optional push notification imports
 try:
-    from pywebpush import webpush, WebPushException
+    from pywebpush import webpush, WebPushException, WebPusher
+    from py_vapid import Vapid
     PUSH_NOTIFICATIONS_AVAILABLE = True
     print("✅ pywebpush imported successfully")
 except ImportError as e:
@@ -53,12 +64,22 @@ except ImportError as e:
         pass
     def webpush(*args, **kwargs):
         raise WebPushException("Push notifications not available")
+    WebPusher = None
+    Vapid = None
+# Optional columnar export support
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError as e:
+    print(f"❌ Warning: pyarrow not available. Parquet and Arrow exports disabled. Error: {e}")
+    PYARROW_AVAILABLE = False
 
 import base64
 
 app = Flask(__name__, static_folder='static')
 app.config['SECRET_KEY'] = 'your-secret-key-here'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///permits.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('PERMITS_DATABASE_URI', 'sqlite:///permits.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 db = SQLAlchemy(app)
@@ -66,6 +87,14 @@ db = SQLAlchemy(app)
 # Database model
 class Permit(db.Model):
     __tablename__ = 'permits'  # Explicitly set table name
+    __table_args__ = (
+        # Natural key of a permit row; ingest dedupes against this constraint
+        db.Index('ux_permits_natural_key', 'api_number', 'lease_name', 'well_number', unique=True),
+        # Sort and filter keys for the index page
+        db.Index('ix_permits_created_at', 'created_at', 'id'),
+        db.Index('ix_permits_county', 'county'),
+        db.Index('ix_permits_operator', 'operator'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     county = db.Column(db.String(100), nullable=False)
@@ -75,7 +104,7 @@ class Permit(db.Model):
     api_number = db.Column(db.String(50), nullable=False)
     date_issued = db.Column(db.Date, nullable=False)
     rrc_link = db.Column(db.String(500), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # Keyset paging position
 
 # Push notification subscription model
 class Subscription(db.Model):
@@ -114,6 +143,16 @@ class DeviceSubscription(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_error = db.Column(db.String(500))  # Last push error message
     error_count = db.Column(db.Integer, default=0)  # Consecutive error count
+    backoff_until = db.Column(db.DateTime)  # Skip sends until this time (UTC) after transient failures
+
+# Per-device view filters and dismissals, so the index page can page and count what the device shows
+class DeviceView(db.Model):
+    __tablename__ = 'device_views'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    device_id = db.Column(db.String(100), nullable=False, unique=True)
+    prefs_json = db.Column(db.Text)  # viewFilterCounties, dismissedCountySet, dismissedPermitSet
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 # Seen permits table for deduplication
 class SeenPermit(db.Model):
@@ -124,6 +163,27 @@ class SeenPermit(db.Model):
     first_seen_at = db.Column(db.DateTime, default=datetime.utcnow)
     expires_at = db.Column(db.DateTime)  # TTL for cleanup
 
+# Per-day scrape watermark for incremental runs
+class ScrapeWatermark(db.Model):
+    __tablename__ = 'scrape_watermarks'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    scrape_date = db.Column(db.Date, nullable=False, unique=True)  # Texas submitted date that was queried
+    last_status_no = db.Column(db.Integer)  # Highest RRC status number ingested for that date
+    last_status_date = db.Column(db.String(20))
+    last_run_at = db.Column(db.DateTime)  # UTC time of the last complete run for that date
+
+# Append-only log of permit inserts and deletes; the id doubles as the change version clients sync from
+class PermitChange(db.Model):
+    __tablename__ = 'permit_changes'
+    # Ids must never be reused once pruned, or clients holding them as since would skip changes
+    __table_args__ = {'sqlite_autoincrement': True}
+    
+    id = db.Column(db.Integer, primary_key=True)
+    permit_id = db.Column(db.Integer, nullable=False)
+    action = db.Column(db.String(10), nullable=False)  # 'insert' or 'delete'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
 # Global scraping status
 scraping_status = {
     'is_running': False,
@@ -132,6 +192,128 @@ scraping_status = {
     'error': None
 }
 
+class DataVersion:
+    """Monotonic version of the permit table, bumped by every write that changes what we serve.
+    
+    Seeded from the clock so it keeps increasing across restarts and an ETag
+    issued by an earlier process can never match newer data.
+    
+    modified_at backs Last-Modified, which only has whole seconds, so it is the
+    second of the last write and never later than now. conditional_get() leaves
+    Last-Modified out while that second is still running, since a later write
+    in the same second would not change it.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = int(time.time() * 1000)
+        self.modified_at = self.current_second()
+    
+    @staticmethod
+    def current_second():
+        return datetime.now(timezone.utc).replace(microsecond=0)
+    
+    def bump(self):
+        with self._lock:
+            self.version = max(self.version + 1, int(time.time() * 1000))
+            self.modified_at = max(self.modified_at, self.current_second())
+            return self.version
+
+data_version = DataVersion()
+
+# Live updates over Server-Sent Events
+EVENTS_HEARTBEAT = int(os.getenv('EVENTS_HEARTBEAT', '20'))  # Seconds between keep-alive comments
+EVENTS_STREAM_TIMEOUT = int(os.getenv('EVENTS_STREAM_TIMEOUT', '300'))  # Streams end and reconnect after this long
+EVENTS_QUEUE_SIZE = int(os.getenv('EVENTS_QUEUE_SIZE', '32'))  # Pending events kept per connection
+
+def _default_max_streams():
+    """Open event streams the server can hold while leaving room for ordinary requests (see gunicorn.conf.py)"""
+    try:
+        from gevent import monkey
+        green = monkey.is_module_patched('socket')
+    except ImportError:
+        green = False
+    if green:
+        # A stream is a greenlet and a socket
+        return max(1, int(os.getenv('WEB_WORKER_CONNECTIONS', '1000')) - 100)
+    # A stream holds a worker thread; keep two for everything else
+    return max(1, int(os.getenv('WEB_THREADS', '32')) - 2)
+
+EVENTS_MAX_STREAMS = int(os.getenv('EVENTS_MAX_STREAMS') or _default_max_streams())
+
+class EventBroadcaster:
+    """Fans scraper events out to every open event stream.
+    
+    Each connection gets its own bounded queue. Events are snapshots (the
+    current status, the latest change version), so when a slow client's queue
+    is full the oldest pending event is dropped rather than growing memory.
+    """
+    
+    def __init__(self, max_streams=EVENTS_MAX_STREAMS, queue_size=EVENTS_QUEUE_SIZE):
+        self.max_streams = max_streams
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._queues = set()
+    
+    def subscribe(self):
+        """Register a connection; returns its queue, or None when all stream slots are taken"""
+        with self._lock:
+            if len(self._queues) >= self.max_streams:
+                return None
+            events = queue.Queue(maxsize=self.queue_size)
+            self._queues.add(events)
+            return events
+    
+    def unsubscribe(self, events):
+        with self._lock:
+            self._queues.discard(events)
+    
+    def publish(self, event, data):
+        message = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        with self._lock:
+            queues = list(self._queues)
+        for events in queues:
+            while True:
+                try:
+                    events.put_nowait(message)
+                    break
+                except queue.Full:
+                    try:
+                        events.get_nowait()
+                    except queue.Empty:
+                        pass
+    
+    def stream(self, events, initial=()):
+        """Yield SSE frames for one connection until it times out or the client goes away.
+        
+        The slot is released when the generator finishes; a response that is
+        never iterated must also unsubscribe on close (see api_events).
+        """
+        try:
+            yield "retry: 5000\n\n"  # Reconnect delay after a stream ends
+            for message in initial:
+                yield message
+            deadline = time.monotonic() + EVENTS_STREAM_TIMEOUT
+            while time.monotonic() < deadline:
+                try:
+                    yield events.get(timeout=EVENTS_HEARTBEAT)
+                except queue.Empty:
+                    # Comment line: keeps proxies from closing the idle connection and
+                    # surfaces a disconnected client as a failed write
+                    yield ": heartbeat\n\n"
+        finally:
+            self.unsubscribe(events)
+
+event_broadcaster = EventBroadcaster()
+
+def format_scraping_status():
+    """scraping_status as sent to the browser"""
+    status_copy = scraping_status.copy()
+    if status_copy['last_run']:
+        # Format with timezone for display
+        status_copy['last_run'] = status_copy['last_run'].strftime('%m/%d/%Y %I:%M:%S %p %Z')
+    return status_copy
+
 # Texas timezone for RRC scraping
 if PYTZ_AVAILABLE:
     TEXAS_TZ = pytz.timezone('America/Chicago')
@@ -143,9 +325,10 @@ else:
 VAPID_PRIVATE_KEY = os.getenv('VAPID_PRIVATE_KEY')
 VAPID_PUBLIC_KEY = os.getenv('VAPID_PUBLIC_KEY')
 VAPID_CLAIMS = {
-    "sub": os.getenv('VAPID_SUBJECT', 'mailto:admin@rrc-monitor.com'),
-    "aud": "https://web.push.apple.com"  # Apple-specific audience
+    "sub": os.getenv('VAPID_SUBJECT', 'mailto:admin@rrc-monitor.com')
 }
+VAPID_TOKEN_TTL = int(os.getenv('VAPID_TOKEN_TTL', str(12 * 60 * 60)))  # Lifetime of a signed VAPID JWT
+VAPID_TOKEN_REFRESH_MARGIN = int(os.getenv('VAPID_TOKEN_REFRESH_MARGIN', '600'))  # Re-sign this long before expiry
 
 # Check if VAPID keys are properly configured
 if not VAPID_PRIVATE_KEY or not VAPID_PUBLIC_KEY:
@@ -159,11 +342,60 @@ else:
     print(f"DEBUG: VAPID_PRIVATE_KEY starts with: {VAPID_PRIVATE_KEY[:50]}...")
     print(f"DEBUG: VAPID_PUBLIC_KEY starts with: {VAPID_PUBLIC_KEY[:50]}...")
 
-def send_push_notification(subscription, title, body, url=None):
-    """Send push notification to a subscription"""
+def _push_service_origin(endpoint):
+    """scheme://host of a push endpoint, e.g. https://web.push.apple.com"""
+    parsed = urlparse(endpoint)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+class VapidSigner:
+    """Signs VAPID headers with a key parsed once, caching them per push service.
+    
+    The audience of a VAPID JWT is the push service origin, so one signed token
+    serves every subscription on that service until it nears expiry.
+    """
+    
+    def __init__(self, private_key, claims, token_ttl=12 * 60 * 60, refresh_margin=600):
+        self.private_key = private_key
+        self.claims = dict(claims)
+        self.token_ttl = token_ttl
+        self.refresh_margin = min(refresh_margin, token_ttl // 2)
+        self._vapid = None
+        self._signed = {}  # audience -> (expires_at, headers)
+        self._lock = threading.Lock()
+    
+    def _key(self):
+        if self._vapid is None:
+            self._vapid = Vapid.from_string(private_key=self.private_key)
+        return self._vapid
+    
+    def headers_for(self, endpoint):
+        """VAPID Authorization headers for a subscription endpoint"""
+        audience = _push_service_origin(endpoint)
+        now = int(time.time())
+        with self._lock:
+            cached = self._signed.get(audience)
+            if cached and cached[0] - self.refresh_margin > now:
+                return dict(cached[1])
+            expires_at = now + self.token_ttl
+            headers = self._key().sign(dict(self.claims, aud=audience, exp=expires_at))
+            self._signed[audience] = (expires_at, headers)
+            return dict(headers)
+
+vapid_signer = VapidSigner(
+    VAPID_PRIVATE_KEY, VAPID_CLAIMS,
+    token_ttl=VAPID_TOKEN_TTL,
+    refresh_margin=VAPID_TOKEN_REFRESH_MARGIN
+) if PUSH_NOTIFICATIONS_AVAILABLE and Vapid is not None else None
+
+def send_push_notification(subscription, title, body, url=None, requests_session=None):
+    """Send push notification to a subscription (optionally over a shared requests.Session)"""
+    return push_to_subscription(subscription, title, body, url, requests_session)[0]
+
+def push_to_subscription(subscription, title, body, url=None, requests_session=None):
+    """Send a push and report (success, HTTP status or None, error message)"""
     if not PUSH_NOTIFICATIONS_AVAILABLE:
         print("Push notifications not available - skipping notification")
-        return False
+        return False, None, "Push notifications not available"
         
     try:
         # Debug: Print subscription data structure
@@ -172,7 +404,7 @@ def send_push_notification(subscription, title, body, url=None):
         # Validate subscription data
         if not subscription.get('endpoint'):
             print("ERROR: Missing endpoint in subscription")
-            return False
+            return False, None, "Missing endpoint"
             
         keys = subscription.get('keys', {})
         p256dh = keys.get('p256dh', '')
@@ -182,7 +414,7 @@ def send_push_notification(subscription, title, body, url=None):
         
         if not p256dh or not auth:
             print(f"ERROR: Missing or empty keys - p256dh: '{p256dh}', auth: '{auth}'")
-            return False
+            return False, None, "Missing subscription keys"
         
         payload = json.dumps({
             "title": title,
@@ -196,49 +428,48 @@ def send_push_notification(subscription, title, body, url=None):
         if 'webpush' in globals() and callable(webpush):
             print(f"DEBUG: Using pywebpush with subscription: {subscription}")
             
-            # Check if this is an Apple Push Notification endpoint
             endpoint = subscription.get('endpoint', '')
-            is_apple = 'web.push.apple.com' in endpoint
-            
-            if is_apple:
-                print("DEBUG: Detected Apple Push Notification endpoint")
-                # Use Apple-specific VAPID claims
-                apple_claims = {
-                    "sub": os.getenv('VAPID_SUBJECT', 'mailto:admin@rrc-monitor.com'),
-                    "aud": "https://web.push.apple.com"
-                }
-                webpush(
+            if vapid_signer is None:
+                # pywebpush is missing; the stand-in raises WebPushException
+                response = webpush(
                     subscription_info=subscription,
                     data=payload,
                     vapid_private_key=VAPID_PRIVATE_KEY,
-                    vapid_claims=apple_claims
+                    vapid_claims=dict(VAPID_CLAIMS)
                 )
             else:
-                print("DEBUG: Using standard VAPID claims")
-                webpush(
-                    subscription_info=subscription,
-                    data=payload,
-                    vapid_private_key=VAPID_PRIVATE_KEY,
-                    vapid_claims=VAPID_CLAIMS
+                # Same request webpush() builds, but with the cached VAPID headers for this push service
+                response = WebPusher(subscription, requests_session=requests_session).send(
+                    payload,
+                    vapid_signer.headers_for(endpoint),
+                    ttl=0,
+                    content_encoding="aes128gcm",
+                    timeout=10
                 )
+                if response.status_code > 202:
+                    raise WebPushException(
+                        f"Push failed: {response.status_code} {response.reason}\nResponse body:{response.text}",
+                        response=response
+                    )
             
             print("DEBUG: Push notification sent successfully")
-            return True
+            return True, getattr(response, 'status_code', None), None
         else:
             # Fallback: Simple HTTP request to push service
             print("DEBUG: Using fallback push method")
-            return send_push_fallback(subscription, payload)
+            return send_push_fallback(subscription, payload, requests_session)
             
     except WebPushException as e:
         print(f"Push notification failed: {e}")
-        return False
+        status_code = e.response.status_code if getattr(e, 'response', None) is not None else None
+        return False, status_code, str(e)[:500]
     except Exception as e:
         print(f"Unexpected error sending push notification: {e}")
         import traceback
         traceback.print_exc()
-        return False
+        return False, None, str(e)[:500]
 
-def send_push_fallback(subscription, payload):
+def send_push_fallback(subscription, payload, requests_session=None):
     """Fallback push notification using direct HTTP requests"""
     try:
         import requests
@@ -248,7 +479,7 @@ def send_push_fallback(subscription, payload):
         
         if not endpoint:
             print("Missing push subscription endpoint")
-            return False
+            return False, None, "Missing endpoint"
         
         # Send HTTP request to push service
         headers = {
@@ -256,134 +487,587 @@ def send_push_fallback(subscription, payload):
             'TTL': '86400'
         }
         
-        response = requests.post(endpoint, data=payload, headers=headers, timeout=10)
+        response = (requests_session or requests).post(endpoint, data=payload, headers=headers, timeout=10)
         
         if response.status_code in [200, 201, 202]:
             print(f"✅ Push notification sent successfully")
-            return True
+            return True, response.status_code, None
         else:
             print(f"❌ Push notification failed: {response.status_code}")
-            return False
+            return False, response.status_code, f"Push service returned {response.status_code}"
             
     except Exception as e:
         print(f"❌ Fallback push notification failed: {e}")
-        return False
+        return False, None, str(e)[:500]
 
-def send_notifications_for_new_permits(new_permits):
-    """Send push notifications for new permits to subscribed users with device-scoped preferences"""
-    if not new_permits:
-        return
+# Push fan-out configuration
+PUSH_WORKERS = int(os.getenv('PUSH_WORKERS', '8'))
+PUSH_PER_SERVICE_CONCURRENCY = int(os.getenv('PUSH_PER_SERVICE_CONCURRENCY', '4'))
+PUSH_MAX_ATTEMPTS = int(os.getenv('PUSH_MAX_ATTEMPTS', '3'))
+PUSH_RETRY_DELAY = float(os.getenv('PUSH_RETRY_DELAY', '5'))  # Seconds, multiplied by the attempt number
+PUSH_MODE = os.getenv('PUSH_MODE', 'digest').lower()  # 'digest' (one push per device) or 'single' (one per permit)
+PUSH_DIGEST_MAX_BATCH = int(os.getenv('PUSH_DIGEST_MAX_BATCH', '50'))  # Permits per digest push
+PUSH_COALESCE_WINDOW = float(os.getenv('PUSH_COALESCE_WINDOW', '10'))  # Seconds to wait for more permits before sending
+
+# Subscription health configuration
+PUSH_BACKOFF_BASE = int(os.getenv('PUSH_BACKOFF_BASE', '60'))  # Seconds; doubles with each consecutive failure
+PUSH_BACKOFF_MAX = int(os.getenv('PUSH_BACKOFF_MAX', '21600'))  # Cap the backoff at 6 hours
+PUSH_MAX_CONSECUTIVE_ERRORS = int(os.getenv('PUSH_MAX_CONSECUTIVE_ERRORS', '8'))  # Prune after this many failures in a row
+
+class SubscriptionHealth:
+    """Tracks push endpoint health from the HTTP status of each send.
     
-    if not PUSH_NOTIFICATIONS_AVAILABLE:
-        print("Push notifications not available - skipping notifications")
-        return
+    404/410 mean the push service has dropped the subscription, so it is pruned.
+    429/5xx and network errors are transient: the endpoint is put on exponential
+    backoff and skipped until it expires. Endpoints that keep failing are pruned
+    after max_consecutive_errors. Any other 4xx (400, 401/403 from a VAPID
+    mismatch, 413 payload too large) is a problem on our side that retrying
+    won't fix, so it is logged and recorded but neither retried nor backed off.
+    """
+    
+    DEAD = 'dead'
+    BACKOFF = 'backoff'
+    REJECTED = 'rejected'
+    OK = 'ok'
+    SEVERITY = {OK: 0, REJECTED: 1, BACKOFF: 2, DEAD: 3}
+    
+    def __init__(self, backoff_base=60, backoff_max=21600, max_consecutive_errors=8):
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_consecutive_errors = max_consecutive_errors
+    
+    def classify(self, success, status_code):
+        if success:
+            return self.OK
+        if status_code in (404, 410):
+            return self.DEAD
+        if status_code is None or status_code == 429 or status_code >= 500:
+            return self.BACKOFF
+        return self.REJECTED
+    
+    def backoff_delay(self, error_count):
+        return min(self.backoff_base * 2 ** max(error_count - 1, 0), self.backoff_max)
+    
+    def deliverable(self, subscriptions):
+        """The subscriptions whose endpoints are not backing off"""
+        now = datetime.utcnow()
+        return [subscription for subscription in subscriptions
+                if subscription.backoff_until is None or subscription.backoff_until <= now]
+    
+    def record(self, subscriptions, outcomes):
+        """Apply per-device outcomes ({id: (state, error)}); returns ids that should be pruned"""
+        now = datetime.utcnow()
+        dead_ids = set()
+        for subscription in subscriptions:
+            if subscription.id not in outcomes:
+                continue
+            state, error = outcomes[subscription.id]
+            if state == self.OK:
+                # Reset error count on successful send
+                subscription.error_count = 0
+                subscription.last_error = None
+                subscription.backoff_until = None
+            elif state == self.DEAD:
+                dead_ids.add(subscription.id)
+            elif state == self.REJECTED:
+                subscription.last_error = (error or "Push service rejected the notification")[:500]
+            else:
+                subscription.error_count = (subscription.error_count or 0) + 1
+                subscription.last_error = (error or "Failed to send notification")[:500]
+                subscription.backoff_until = now + timedelta(seconds=self.backoff_delay(subscription.error_count))
+                if subscription.error_count >= self.max_consecutive_errors:
+                    dead_ids.add(subscription.id)
+        return dead_ids
+    
+    def prune(self, dead_ids):
+        """Delete dead subscriptions in one statement; returns how many were removed"""
+        if not dead_ids:
+            return 0
+        pruned = DeviceSubscription.query.filter(
+            DeviceSubscription.id.in_(dead_ids)
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        for subscription_id in dead_ids:
+            push_routing_index.remove(subscription_id)
+        return pruned
+
+subscription_health = SubscriptionHealth(
+    backoff_base=PUSH_BACKOFF_BASE,
+    backoff_max=PUSH_BACKOFF_MAX,
+    max_consecutive_errors=PUSH_MAX_CONSECUTIVE_ERRORS
+)
+
+class PushRoutingIndex:
+    """In-memory county -> device routing built from DeviceSubscription prefs.
+    
+    Each device's prefs_json is parsed once and folded into inverted indexes, so
+    routing a permit is a few dict lookups and set operations. The subscribe and
+    prefs endpoints keep it current; sync() catches rows changed elsewhere by
+    comparing the raw prefs string and only reparses what changed.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._raw_prefs = {}            # subscription id -> prefs_json the entry was built from
+        self._entries = {}              # subscription id -> (monitor_counties, dismissed_counties, dismissed_permits)
+        self._by_county = {}            # county -> ids monitoring it explicitly
+        self._wildcard = set()          # ids with no county filter (all counties)
+        self._dismissed_by_county = {}  # county -> ids that dismissed it
+        self._dismissed_by_permit = {}  # permit id -> ids that dismissed it
+        self.invalid = {}               # subscription id -> prefs parse error
+    
+    @staticmethod
+    def _parse(prefs_json):
+        prefs = json.loads(prefs_json) if prefs_json else {}
+        return (
+            frozenset(prefs.get('monitorCounties', [])),
+            frozenset(prefs.get('dismissedCountySet', [])),
+            frozenset(prefs.get('dismissedPermitSet', []))
+        )
+    
+    def _discard(self, subscription_id):
+        entry = self._entries.pop(subscription_id, None)
+        self._raw_prefs.pop(subscription_id, None)
+        self.invalid.pop(subscription_id, None)
+        if entry is None:
+            return
+        monitor_counties, dismissed_counties, dismissed_permits = entry
+        self._wildcard.discard(subscription_id)
+        for index, keys in ((self._by_county, monitor_counties),
+                            (self._dismissed_by_county, dismissed_counties),
+                            (self._dismissed_by_permit, dismissed_permits)):
+            for key in keys:
+                ids = index.get(key)
+                if ids is not None:
+                    ids.discard(subscription_id)
+                    if not ids:
+                        del index[key]
+    
+    def _add(self, subscription_id, prefs_json):
+        try:
+            entry = self._parse(prefs_json)
+        except Exception as e:
+            print(f"Invalid notification preferences for subscription {subscription_id}: {e}")
+            entry = (frozenset(), frozenset(), frozenset())
+            self.invalid[subscription_id] = str(e)
+            # Unparseable prefs route nowhere until the device saves them again
+            self._entries[subscription_id] = entry
+            self._raw_prefs[subscription_id] = prefs_json
+            return
+        monitor_counties, dismissed_counties, dismissed_permits = entry
+        self._entries[subscription_id] = entry
+        self._raw_prefs[subscription_id] = prefs_json
+        if monitor_counties:
+            for county in monitor_counties:
+                self._by_county.setdefault(county, set()).add(subscription_id)
+        else:
+            self._wildcard.add(subscription_id)
+        for county in dismissed_counties:
+            self._dismissed_by_county.setdefault(county, set()).add(subscription_id)
+        for permit_id in dismissed_permits:
+            self._dismissed_by_permit.setdefault(permit_id, set()).add(subscription_id)
+    
+    def update(self, subscription_id, prefs_json):
+        """Re-index one subscription after its prefs changed"""
+        with self._lock:
+            self._discard(subscription_id)
+            self._add(subscription_id, prefs_json)
+    
+    def remove(self, subscription_id):
+        with self._lock:
+            self._discard(subscription_id)
+    
+    def sync(self, subscriptions):
+        """Bring the index in line with the given subscription rows"""
+        with self._lock:
+            current = {subscription.id for subscription in subscriptions}
+            for subscription_id in set(self._entries) - current:
+                self._discard(subscription_id)
+            for subscription in subscriptions:
+                if subscription.id not in self._entries or self._raw_prefs[subscription.id] != subscription.prefs_json:
+                    self._discard(subscription.id)
+                    self._add(subscription.id, subscription.prefs_json)
+    
+    def route(self, permit):
+        """Ids of the subscriptions that want a notification for this permit"""
+        county = permit['county']
+        with self._lock:
+            if county in self._by_county:
+                recipients = self._wildcard | self._by_county[county]
+            else:
+                recipients = set(self._wildcard)
+            recipients -= self._dismissed_by_county.get(county, set())
+            recipients -= self._dismissed_by_permit.get(str(permit['id']), set())
+        return recipients
+
+push_routing_index = PushRoutingIndex()
+
+# Notification dedupe configuration
+SEEN_PERMIT_TTL_HOURS = int(os.getenv('SEEN_PERMIT_TTL_HOURS', '24'))
+SEEN_PERMIT_SWEEP_INTERVAL = int(os.getenv('SEEN_PERMIT_SWEEP_INTERVAL', '3600'))  # Seconds between expiry sweeps
+
+class SeenPermitCache:
+    """In-process TTL set of permits already notified, backed by seen_permits.
+    
+    Warm-loaded at startup and checked in memory; newly seen permits are
+    written in one bulk upsert, and a sweeper thread (started with the scrape
+    scheduler) deletes expired rows so the table stays bounded. All times are
+    naive UTC, matching the stored column.
+    """
+    
+    def __init__(self, ttl_hours=24, sweep_interval=3600, chunk_size=500):
+        self.ttl = timedelta(hours=ttl_hours)
+        self.sweep_interval = sweep_interval
+        self.chunk_size = chunk_size
+        self._expiry = {}  # permit key -> expires_at
+        self._lock = threading.Lock()
+        self._sweeper = None
+    
+    @staticmethod
+    def key_for(permit):
+        return f"{permit['api_number']}_{permit['lease_name']}_{permit['well_number']}"
+    
+    def warm(self):
+        """Load unexpired keys from the table (needs an app context)"""
+        now = datetime.utcnow()
+        rows = db.session.query(SeenPermit.permit_no, SeenPermit.expires_at).filter(
+            SeenPermit.expires_at > now
+        ).all()
+        with self._lock:
+            self._expiry = {permit_no: expires_at for permit_no, expires_at in rows}
+        print(f"Loaded {len(rows)} seen permits for notification dedupe")
+    
+    def claim(self, keys):
+        """Return the keys not seen within the TTL and mark them seen (needs an app context)"""
+        now = datetime.utcnow()
+        expires_at = now + self.ttl
+        fresh = []
+        with self._lock:
+            for key in keys:
+                seen_until = self._expiry.get(key)
+                if seen_until is not None and seen_until > now:
+                    continue
+                self._expiry[key] = expires_at
+                fresh.append(key)
+        self._flush(fresh, expires_at)
+        return fresh
+    
+    def _flush(self, keys, expires_at):
+        if not keys:
+            return
+        dialect = db.engine.dialect.name
+        if dialect not in ('sqlite', 'postgresql'):
+            SeenPermit.query.filter(SeenPermit.permit_no.in_(keys)).delete(synchronize_session=False)
+            db.session.add_all([SeenPermit(permit_no=key, expires_at=expires_at) for key in keys])
+            db.session.commit()
+            return
+        
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        
+        for start in range(0, len(keys), self.chunk_size):
+            stmt = insert(SeenPermit).values([
+                {'permit_no': key, 'first_seen_at': datetime.utcnow(), 'expires_at': expires_at}
+                for key in keys[start:start + self.chunk_size]
+            ])
+            # Expired rows the sweeper has not reached yet are renewed in place
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['permit_no'],
+                set_={'expires_at': stmt.excluded.expires_at}
+            )
+            db.session.execute(stmt)
+        db.session.commit()
+    
+    def sweep(self):
+        """Delete expired rows and forget expired keys (needs an app context)"""
+        now = datetime.utcnow()
+        with self._lock:
+            self._expiry = {key: expires_at for key, expires_at in self._expiry.items() if expires_at > now}
+        removed = SeenPermit.query.filter(
+            db.or_(SeenPermit.expires_at <= now, SeenPermit.expires_at.is_(None))
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        if removed:
+            print(f"Removed {removed} expired seen permits")
+        return removed
+    
+    def start_sweeper(self):
+        def sweep_periodically():
+            while True:
+                time.sleep(self.sweep_interval)
+                try:
+                    with app.app_context():
+                        self.sweep()
+                except Exception as e:
+                    print(f"Error sweeping seen permits: {e}")
+        
+        if self._sweeper is None or not self._sweeper.is_alive():
+            self._sweeper = threading.Thread(target=sweep_periodically, name='seen-permit-sweeper', daemon=True)
+            self._sweeper.start()
+
+seen_permit_cache = SeenPermitCache(
+    ttl_hours=SEEN_PERMIT_TTL_HOURS,
+    sweep_interval=SEEN_PERMIT_SWEEP_INTERVAL
+)
+
+class PushDispatcher:
+    """Sends web pushes for new permits off the scraper thread.
+    
+    Jobs are queued and fanned out by a background thread through a bounded
+    worker pool. Each push service (origin) gets its own keep-alive
+    requests.Session and a cap on concurrent sends; failed sends go to a retry
+    queue and are retried with a growing delay.
+    
+    In digest mode, jobs that arrive within the coalescing window are merged
+    and each device gets one push summarising all of its matching permits.
+    """
+    
+    def __init__(self, workers=8, per_service_concurrency=4, max_attempts=3, retry_delay=5,
+                 mode='digest', digest_max_batch=50, coalesce_window=10):
+        self.workers = max(1, workers)
+        self.per_service_concurrency = max(1, per_service_concurrency)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay = retry_delay
+        self.mode = mode
+        self.digest_max_batch = max(1, digest_max_batch)
+        self.coalesce_window = coalesce_window
+        self._jobs = queue.Queue()
+        self._executor = None
+        self._thread = None
+        self._sessions = {}
+        self._service_slots = {}
+        self._lock = threading.Lock()
+    
+    def submit(self, permits):
+        """Queue permit dicts for notification and return immediately"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._executor = self._executor or ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix='push-send'
+                )
+                self._thread = threading.Thread(target=self._run, name='push-dispatcher', daemon=True)
+                self._thread.start()
+        self._jobs.put(permits)
+    
+    def _next_batch(self):
+        """Block for the next job, then merge any jobs that arrive within the coalescing window"""
+        permits = list(self._jobs.get())
+        jobs = 1
+        deadline = time.time() + self.coalesce_window
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                permits.extend(self._jobs.get(timeout=remaining))
+                jobs += 1
+            except queue.Empty:
+                break
+        return permits, jobs
+    
+    def _run(self):
+        while True:
+            permits, jobs = self._next_batch()
+            try:
+                with app.app_context():
+                    self._fan_out(permits)
+            except Exception as e:
+                print(f"Error sending notifications: {e}")
+                import traceback
+                traceback.print_exc()
+            finally:
+                for _ in range(jobs):
+                    self._jobs.task_done()
+    
+    def _service(self, endpoint):
+        """Shared session and concurrency slots for the push service behind an endpoint"""
+        origin = _push_service_origin(endpoint)
+        with self._lock:
+            if origin not in self._sessions:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self.per_service_concurrency
+                )
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[origin] = session
+                self._service_slots[origin] = threading.BoundedSemaphore(self.per_service_concurrency)
+            return self._sessions[origin], self._service_slots[origin]
+    
+    def _send(self, message):
+        session, slots = self._service(message['subscription']['endpoint'])
+        with slots:
+            return push_to_subscription(
+                message['subscription'], message['title'], message['body'], message['url'],
+                requests_session=session
+            )
+    
+    def _deliver(self, messages):
+        """Send messages concurrently, retrying transient failures.
+        
+        Returns ({subscription id: (health state, error)} for every device
+        messaged, number of messages delivered).
+        """
+        # Final (state, error) of each message; a retry overwrites the attempt before it
+        message_outcomes = [None] * len(messages)
+        retry_queue = list(range(len(messages)))
+        for attempt in range(1, self.max_attempts + 1):
+            results = list(self._executor.map(self._send, [messages[index] for index in retry_queue]))
+            failed = []
+            for index, (success, status_code, error) in zip(retry_queue, results):
+                state = subscription_health.classify(success, status_code)
+                message_outcomes[index] = (state, error)
+                if state == SubscriptionHealth.BACKOFF:
+                    failed.append(index)
+                elif state == SubscriptionHealth.REJECTED:
+                    print(f"❌ Push service rejected notification for device {messages[index]['device_id']} "
+                          f"with {status_code}; check the VAPID keys and payload size, not retrying: {error}")
+            retry_queue = failed
+            if not retry_queue or attempt == self.max_attempts:
+                break
+            print(f"Retrying {len(retry_queue)} failed push notifications (attempt {attempt + 1})")
+            time.sleep(self.retry_delay * attempt)
+        
+        outcomes = {}
+        for message, (state, error) in zip(messages, message_outcomes):
+            # A device is only as healthy as its worst message
+            previous = outcomes.get(message['subscription_id'])
+            if previous is None or SubscriptionHealth.SEVERITY[state] >= SubscriptionHealth.SEVERITY[previous[0]]:
+                outcomes[message['subscription_id']] = (state, error)
+        sent = sum(1 for state, _ in message_outcomes if state == SubscriptionHealth.OK)
+        return outcomes, sent
+    
+    def _messages_for(self, subscription, permits):
+        """Push messages for one device: a digest per batch of permits, or one per permit"""
+        target = {
+            'subscription_id': subscription.id,
+            'device_id': subscription.device_id,
+            'subscription': {
+                "endpoint": subscription.endpoint,
+                "keys": {
+                    "p256dh": subscription.p256dh,
+                    "auth": subscription.auth
+                }
+            }
+        }
+        
+        if self.mode == 'single':
+            batches = [[permit] for permit in permits]
+        else:
+            batches = [permits[i:i + self.digest_max_batch] for i in range(0, len(permits), self.digest_max_batch)]
+        
+        messages = []
+        for batch in batches:
+            if len(batch) == 1:
+                permit = batch[0]
+                content = {
+                    'title': f"New Permit in {permit['county']}",
+                    'body': f"{permit['operator']} - {permit['lease_name']} #{permit['well_number']}",
+                    'url': permit['rrc_link']
+                }
+            else:
+                counties = list(dict.fromkeys(permit['county'].title() for permit in batch))
+                county_label = ', '.join(counties[:3])
+                if len(counties) > 3:
+                    county_label += f" +{len(counties) - 3} more"
+                leases = [f"{permit['operator']} - {permit['lease_name']} #{permit['well_number']}" for permit in batch[:3]]
+                if len(batch) > 3:
+                    leases.append(f"+{len(batch) - 3} more")
+                content = {
+                    'title': f"{len(batch)} new permits in {county_label}",
+                    'body': '; '.join(leases),
+                    'url': '/'
+                }
+            messages.append(dict(target, permit_count=len(batch), **content))
+        return messages
     
-    with app.app_context():
-        # Get all active device subscriptions
-        subscriptions = DeviceSubscription.query.all()
+    def _fan_out(self, permits):
+        # The routing index covers every subscription, so devices keep their parsed prefs while
+        # backing off; only endpoints that are not backing off are sent to
+        all_subscriptions = DeviceSubscription.query.all()
+        push_routing_index.sync(all_subscriptions)
+        subscriptions = subscription_health.deliverable(all_subscriptions)
         
         if not subscriptions:
             print("No active device subscriptions found")
             return
         
-        notifications_sent = 0
-        pruned_endpoints = 0
+        # Matching permits per device, in arrival order
+        deliverable_ids = {subscription.id for subscription in subscriptions}
+        permits_by_subscription = {}
         
-        for permit in new_permits:
-            # Check if we've already sent notification for this permit (deduplication)
-            permit_key = f"{permit.api_number}_{permit.lease_name}_{permit.well_number}"
-            
-            # Check if permit was already seen (with 24h TTL)
-            seen_permit = SeenPermit.query.filter_by(permit_no=permit_key).first()
-            current_time = datetime.now(TEXAS_TZ) if TEXAS_TZ else datetime.utcnow()
-            if seen_permit and seen_permit.expires_at > current_time:
-                print(f"Skipping duplicate notification for permit {permit_key}")
+        # Skip permits we already notified about within the TTL (deduplication)
+        fresh_keys = set(seen_permit_cache.claim([SeenPermitCache.key_for(permit) for permit in permits]))
+        skipped = 0
+        
+        for permit in permits:
+            if SeenPermitCache.key_for(permit) not in fresh_keys:
+                skipped += 1
                 continue
             
-            # Record this permit as seen (24h TTL)
-            if not seen_permit:
-                seen_permit = SeenPermit(
-                    permit_no=permit_key,
-                    expires_at=current_time + timedelta(hours=24)
-                )
-                db.session.add(seen_permit)
-            else:
-                seen_permit.expires_at = current_time + timedelta(hours=24)
-            
-            permit_county = permit.county
-            
-            # Send notification to devices that want this county
-            for subscription in subscriptions:
-                try:
-                    # Parse user preferences
-                    prefs = json.loads(subscription.prefs_json) if subscription.prefs_json else {}
-                    
-                    # Get preference sets
-                    monitor_counties = set(prefs.get('monitorCounties', []))
-                    dismissed_counties = set(prefs.get('dismissedCountySet', []))
-                    dismissed_permits = set(prefs.get('dismissedPermitSet', []))
-                    
-                    # Skip if county is dismissed
-                    if permit_county in dismissed_counties:
-                        continue
-                    
-                    # Skip if permit is dismissed
-                    if str(permit.id) in dismissed_permits:
-                        continue
-                    
-                    # Skip if user has specific counties selected and this isn't one of them
-                    if monitor_counties and permit_county not in monitor_counties:
-                        continue
-                    
-                    # Send notification
-                    subscription_data = {
-                        "endpoint": subscription.endpoint,
-                        "keys": {
-                            "p256dh": subscription.p256dh,
-                            "auth": subscription.auth
-                        }
-                    }
-                    
-                    title = f"New Permit in {permit_county}"
-                    body = f"{permit.operator} - {permit.lease_name} #{permit.well_number}"
-                    url = permit.rrc_link
-                    
-                    success = send_push_notification(subscription_data, title, body, url)
-                    
-                    if success:
-                        notifications_sent += 1
-                        # Reset error count on successful send
-                        subscription.error_count = 0
-                        subscription.last_error = None
-                        print(f"Sent notification to device {subscription.device_id} for {permit_county} permit")
-                    else:
-                        # Increment error count
-                        subscription.error_count += 1
-                        subscription.last_error = "Failed to send notification"
-                        
-                except Exception as e:
-                    print(f"Error processing subscription for device {subscription.device_id}: {e}")
-                    subscription.error_count += 1
-                    subscription.last_error = str(e)
-                    continue
-            
-            # Prune dead endpoints (404/410 errors)
-            dead_subscriptions = DeviceSubscription.query.filter(
-                DeviceSubscription.error_count >= 3
-            ).all()
-            
-            for dead_sub in dead_subscriptions:
-                print(f"Pruning dead subscription for device {dead_sub.device_id}")
-                db.session.delete(dead_sub)
-                pruned_endpoints += 1
+            # Collect the permit for each device that wants this county
+            for subscription_id in push_routing_index.route(permit) & deliverable_ids:
+                permits_by_subscription.setdefault(subscription_id, []).append(permit)
+        
+        if skipped:
+            print(f"Skipping duplicate notifications for {skipped} permits")
+        
+        for subscription in subscriptions:
+            if subscription.id in push_routing_index.invalid:
+                subscription.error_count = (subscription.error_count or 0) + 1
+                subscription.last_error = push_routing_index.invalid[subscription.id]
+        
+        db.session.commit()
+        
+        messages = []
+        for subscription in subscriptions:
+            if subscription.id in permits_by_subscription:
+                messages.extend(self._messages_for(subscription, permits_by_subscription[subscription.id]))
         
-        # Commit all changes
+        outcomes, sent = self._deliver(messages)
+        delivered = sum(1 for state, _ in outcomes.values() if state == SubscriptionHealth.OK)
+        
+        # Update endpoint health, then prune dead endpoints (404/410 errors) in one go
+        dead_ids = subscription_health.record(subscriptions, outcomes)
         db.session.commit()
+        pruned_endpoints = subscription_health.prune(dead_ids)
         
-        print(f"Sent {notifications_sent} push notifications for {len(new_permits)} new permits")
+        print(f"Sent {sent} of {len(messages)} push notifications, {delivered} of {len(permits_by_subscription)} devices reached, for {len(permits)} new permits")
         if pruned_endpoints > 0:
             print(f"Pruned {pruned_endpoints} dead endpoints")
 
+push_dispatcher = PushDispatcher(
+    workers=PUSH_WORKERS,
+    per_service_concurrency=PUSH_PER_SERVICE_CONCURRENCY,
+    max_attempts=PUSH_MAX_ATTEMPTS,
+    retry_delay=PUSH_RETRY_DELAY,
+    mode=PUSH_MODE,
+    digest_max_batch=PUSH_DIGEST_MAX_BATCH,
+    coalesce_window=PUSH_COALESCE_WINDOW
+)
+
+def send_notifications_for_new_permits(new_permits):
+    """Queue push notifications for new permits; delivery happens on the push dispatcher thread"""
+    if not new_permits:
+        return
+    
+    if not PUSH_NOTIFICATIONS_AVAILABLE:
+        print("Push notifications not available - skipping notifications")
+        return
+    
+    # Hand plain values to the dispatcher so it never touches this thread's session
+    push_dispatcher.submit([{
+        'id': permit.id,
+        'county': permit.county,
+        'operator': permit.operator,
+        'lease_name': permit.lease_name,
+        'well_number': permit.well_number,
+        'api_number': permit.api_number,
+        'rrc_link': permit.rrc_link
+    } for permit in new_permits])
+
 def get_or_create_user_settings(session_id):
     """Get or create user settings for a session"""
     settings = UserSettings.query.filter_by(session_id=session_id).first()
@@ -433,557 +1117,1269 @@ TEXAS_COUNTIES = (
     'WILLACY', 'WILLIAMSON', 'WILSON', 'WINKLER', 'WISE', 'WOOD', 'YOAKUM', 'YOUNG',
     'ZAPATA', 'ZAVALA'
 )
+TEXAS_COUNTY_SET = frozenset(TEXAS_COUNTIES)
 
-def scrape_rrc_permits():
-    """Scrape new permits from RRC website using Selenium for proper form interaction"""
-    global scraping_status
+# RRC spellings that differ from the TEXAS_COUNTIES entries
+COUNTY_ALIASES = {
+    'THROCKMORTON': 'THROCK MORTON',
+    'DE WITT': 'DEWITT',
+    'MC CULLOCH': 'MCCULLOCH',
+    'MC LENNAN': 'MCLENNAN',
+    'MC MULLEN': 'MCMULLEN',
+    'LASALLE': 'LA SALLE'
+}
+
+def _compact_county_key(name):
+    """County name without spaces or punctuation, so 'DE WITT' and 'DEWITT' share a key"""
+    return ''.join(char for char in name if char.isalnum())
+
+# Every accepted spelling (exact, alias or compacted) -> TEXAS_COUNTIES entry
+_COUNTY_LOOKUP = {}
+for _county in TEXAS_COUNTIES:
+    _COUNTY_LOOKUP[_county] = _county
+    _COUNTY_LOOKUP.setdefault(_compact_county_key(_county), _county)
+for _alias, _county in COUNTY_ALIASES.items():
+    _COUNTY_LOOKUP[_alias] = _county
+    _COUNTY_LOOKUP.setdefault(_compact_county_key(_alias), _county)
+del _alias, _county
+
+# Selenium driver pool configuration
+CHROME_USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+DRIVER_POOL_SIZE = int(os.getenv('RRC_DRIVER_POOL_SIZE', '1'))
+DRIVER_MAX_NAVIGATIONS = int(os.getenv('RRC_DRIVER_MAX_NAVIGATIONS', '200'))
+DRIVER_MAX_RSS_MB = int(os.getenv('RRC_DRIVER_MAX_RSS_MB', '1024'))
+DRIVER_CHECKOUT_TIMEOUT = float(os.getenv('RRC_DRIVER_CHECKOUT_TIMEOUT', '60'))
+
+def _build_chrome_options():
+    """Build the Chrome options used for headless scraping in cloud environments"""
+    from selenium.webdriver.chrome.options import Options
     
-    scraping_status['is_running'] = True
-    scraping_status['error'] = None
-    scraping_status['last_run'] = datetime.now(TEXAS_TZ)
+    # Set up Chrome options for headless mode and cloud deployment
+    chrome_options = Options()
+    chrome_options.add_argument('--headless')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--disable-web-security')
+    chrome_options.add_argument('--disable-features=VizDisplayCompositor')
+    chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.add_argument('--disable-extensions')
+    chrome_options.add_argument('--disable-plugins')
+    chrome_options.add_argument('--disable-images')
+    chrome_options.add_argument('--disable-javascript')
+    chrome_options.add_argument('--disable-css')
+    chrome_options.add_argument('--disable-logging')
+    chrome_options.add_argument('--disable-background-timer-throttling')
+    chrome_options.add_argument('--disable-backgrounding-occluded-windows')
+    chrome_options.add_argument('--disable-renderer-backgrounding')
+    chrome_options.add_argument('--disable-ipc-flooding-protection')
+    chrome_options.add_argument(f'--user-agent={CHROME_USER_AGENT}')
+    
+    # Additional cloud-specific options
+    if DRIVER_POOL_SIZE == 1:
+        # A fixed debugging port only works while a single browser is alive
+        chrome_options.add_argument('--remote-debugging-port=9222')
+    chrome_options.add_argument('--disable-background-networking')
+    chrome_options.add_argument('--disable-default-apps')
+    chrome_options.add_argument('--disable-sync')
+    chrome_options.add_argument('--metrics-recording-only')
+    chrome_options.add_argument('--no-first-run')
+    chrome_options.add_argument('--safebrowsing-disable-auto-update')
+    chrome_options.add_argument('--disable-client-side-phishing-detection')
+    chrome_options.add_argument('--disable-hang-monitor')
+    chrome_options.add_argument('--disable-prompt-on-repost')
+    chrome_options.add_argument('--disable-domain-reliability')
+    chrome_options.add_argument('--disable-component-extensions-with-background-pages')
+    chrome_options.add_argument('--disable-features=TranslateUI,BlinkGenPropertyTrees')
+    
+    # Set binary location for cloud environments
+    if os.path.exists('/usr/bin/google-chrome'):
+        chrome_options.binary_location = '/usr/bin/google-chrome'
+    elif os.path.exists('/usr/bin/chromium-browser'):
+        chrome_options.binary_location = '/usr/bin/chromium-browser'
+    
+    return chrome_options
+
+def _create_chrome_driver():
+    """Start a new headless Chrome, preferring a system ChromeDriver over webdriver-manager"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    
+    chrome_options = _build_chrome_options()
     
     try:
-        print("Starting RRC permit scraping...")
+        # Set ChromeDriver path for cloud environments
+        chromedriver_path = None
+        possible_paths = [
+            '/usr/local/bin/chromedriver',
+            '/usr/bin/chromedriver',
+            '/opt/chromedriver',
+            '/app/chromedriver'
+        ]
         
-        with app.app_context():
-            # Get today's date in Texas timezone
-            if TEXAS_TZ:
-                texas_now = datetime.now(TEXAS_TZ)
-            else:
-                texas_now = datetime.utcnow()
-            today = texas_now.date()
-            date_str = today.strftime('%m/%d/%Y')
-            print(f"Scraping for Texas date: {date_str} (Texas time: {texas_now.strftime('%I:%M:%S %p')})")
-            
-            # Try Selenium approach first for proper form interaction
-            try:
-                from selenium import webdriver
-                from selenium.webdriver.common.by import By
-                from selenium.webdriver.support.ui import WebDriverWait
-                from selenium.webdriver.support import expected_conditions as EC
-                from selenium.webdriver.chrome.options import Options
-                from selenium.webdriver.common.keys import Keys
-                from selenium.webdriver.chrome.service import Service
-                from webdriver_manager.chrome import ChromeDriverManager
-                
-                print(f"Using Selenium to scrape RRC for date: {date_str}")
-                
-                # Set up Chrome options for headless mode and cloud deployment
-                chrome_options = Options()
-                chrome_options.add_argument('--headless')
-                chrome_options.add_argument('--no-sandbox')
-                chrome_options.add_argument('--disable-dev-shm-usage')
-                chrome_options.add_argument('--disable-gpu')
-                chrome_options.add_argument('--disable-web-security')
-                chrome_options.add_argument('--disable-features=VizDisplayCompositor')
-                chrome_options.add_argument('--window-size=1920,1080')
-                chrome_options.add_argument('--disable-extensions')
-                chrome_options.add_argument('--disable-plugins')
-                chrome_options.add_argument('--disable-images')
-                chrome_options.add_argument('--disable-javascript')
-                chrome_options.add_argument('--disable-css')
-                chrome_options.add_argument('--disable-logging')
-                chrome_options.add_argument('--disable-background-timer-throttling')
-                chrome_options.add_argument('--disable-backgrounding-occluded-windows')
-                chrome_options.add_argument('--disable-renderer-backgrounding')
-                chrome_options.add_argument('--disable-features=TranslateUI')
-                chrome_options.add_argument('--disable-ipc-flooding-protection')
-                chrome_options.add_argument('--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-                
-                # Additional cloud-specific options
-                chrome_options.add_argument('--remote-debugging-port=9222')
-                chrome_options.add_argument('--disable-background-networking')
-                chrome_options.add_argument('--disable-default-apps')
-                chrome_options.add_argument('--disable-sync')
-                chrome_options.add_argument('--metrics-recording-only')
-                chrome_options.add_argument('--no-first-run')
-                chrome_options.add_argument('--safebrowsing-disable-auto-update')
-                chrome_options.add_argument('--disable-client-side-phishing-detection')
-                chrome_options.add_argument('--disable-hang-monitor')
-                chrome_options.add_argument('--disable-prompt-on-repost')
-                chrome_options.add_argument('--disable-domain-reliability')
-                chrome_options.add_argument('--disable-component-extensions-with-background-pages')
-                chrome_options.add_argument('--disable-background-timer-throttling')
-                chrome_options.add_argument('--disable-renderer-backgrounding')
-                chrome_options.add_argument('--disable-backgrounding-occluded-windows')
-                chrome_options.add_argument('--disable-features=TranslateUI,BlinkGenPropertyTrees')
-                chrome_options.add_argument('--disable-ipc-flooding-protection')
-                
-                # Set binary location for cloud environments
-                if os.path.exists('/usr/bin/google-chrome'):
-                    chrome_options.binary_location = '/usr/bin/google-chrome'
-                elif os.path.exists('/usr/bin/chromium-browser'):
-                    chrome_options.binary_location = '/usr/bin/chromium-browser'
-                
-                # Try to use webdriver-manager for automatic ChromeDriver management
-                try:
-                    # Set ChromeDriver path for cloud environments
-                    chromedriver_path = None
-                    possible_paths = [
-                        '/usr/local/bin/chromedriver',
-                        '/usr/bin/chromedriver',
-                        '/opt/chromedriver',
-                        '/app/chromedriver'
-                    ]
-                    
-                    for path in possible_paths:
-                        if os.path.exists(path):
-                            chromedriver_path = path
-                            print(f"✅ Found ChromeDriver at: {path}")
-                            break
-                    
-                    if not chromedriver_path:
-                        print("⚠️ ChromeDriver not found in standard locations, will use webdriver-manager")
-                    
-                    if chromedriver_path:
-                        service = Service(chromedriver_path)
-                        driver = webdriver.Chrome(service=service, options=chrome_options)
-                        print(f"✅ ChromeDriver initialized successfully with system driver at {chromedriver_path}")
-                    else:
-                        service = Service(ChromeDriverManager().install())
-                        driver = webdriver.Chrome(service=service, options=chrome_options)
-                        print("✅ ChromeDriver initialized successfully with WebDriverManager")
-                except Exception as e:
-                    print(f"ChromeDriver initialization failed: {e}")
-                    try:
-                        # Fallback to system ChromeDriver without service
-                        driver = webdriver.Chrome(options=chrome_options)
-                        print("✅ ChromeDriver initialized successfully with system driver (no service)")
-                    except Exception as e2:
-                        print(f"All ChromeDriver attempts failed: {e2}")
-                        raise e2
-                
-                try:
-                    # Navigate to the RRC search page
-                    search_url = "https://webapps.rrc.state.tx.us/DP/initializePublicQueryAction.do"
-                    print(f"Navigating to: {search_url}")
-                    driver.get(search_url)
-                    
-                    # Wait for page to load and check if we're on the right page
-                    WebDriverWait(driver, 15).until(
-                        EC.presence_of_element_located((By.TAG_NAME, "form"))
-                    )
-                    
-                    print(f"Page loaded successfully. Current URL: {driver.current_url}")
-                    print(f"Page title: {driver.title}")
-                    
-                    # Check if we're on the correct page (should contain "Search for W-1s" or similar)
-                    page_source = driver.page_source
-                    if "Search for W-1s" in page_source or "Drilling Permit" in page_source:
-                        print("✅ Successfully loaded the RRC public query form")
-                    else:
-                        print("⚠️ Page content doesn't match expected RRC query form")
-                        print(f"Page contains: {page_source[:500]}...")
-                    
-                    # Look for all input fields to debug
-                    all_inputs = driver.find_elements(By.TAG_NAME, "input")
-                    print(f"Found {len(all_inputs)} input fields on the page")
-                    
-                    # Find and fill the Submit Start field
-                    try:
-                        begin_field = driver.find_element(By.NAME, "submitStart")
-                        begin_field.clear()
-                        begin_field.send_keys(date_str)
-                        print(f"✅ Filled Submit Start: {date_str}")
-                    except Exception as e:
-                        print(f"❌ Could not find submitStart field: {e}")
-                        # List all input fields for debugging
-                        for inp in all_inputs:
-                            if inp.get_attribute('name'):
-                                print(f"  Input field: name='{inp.get_attribute('name')}', type='{inp.get_attribute('type')}', placeholder='{inp.get_attribute('placeholder')}'")
-                            
-                    # Find and fill the Submit End field
-                    try:
-                        end_field = driver.find_element(By.NAME, "submitEnd")
-                        end_field.clear()
-                        end_field.send_keys(date_str)
-                        print(f"✅ Filled Submit End: {date_str}")
-                    except Exception as e:
-                        print(f"❌ Could not find submitEnd field: {e}")
-                    
-                    # Find and click the Submit button
-                    try:
-                        # Look for all submit buttons to debug
-                        submit_buttons = driver.find_elements(By.CSS_SELECTOR, "input[type='submit']")
-                        print(f"Found {len(submit_buttons)} submit buttons")
-                        
-                        # Find the correct submit button (name='submit' with value='Submit')
-                        search_button = None
-                        for i, button in enumerate(submit_buttons):
-                            name = button.get_attribute('name')
-                            value = button.get_attribute('value')
-                            print(f"Button {i}: name='{name}', value='{value}', text=''")
-                            if name == 'submit' and value == 'Submit':
-                                search_button = button
-                                break
-                        
-                        if search_button:
-                            print("✅ Found Submit button (name='submit', value='Submit'), clicking...")
-                            search_button.click()
-                        else:
-                            raise Exception("Could not find submit button with name='submit' and value='Submit'")
-                        
-                        # Wait for results page to load
-                        WebDriverWait(driver, 20).until(
-                            lambda driver: driver.current_url != search_url
-                        )
-                        
-                        print(f"After search, current URL: {driver.current_url}")
-                        
-                        # Check if we got redirected to login
-                        if 'login' in driver.current_url.lower():
-                            print("⚠️ Redirected to login page - this shouldn't happen with public form")
-                            scraping_status['last_count'] = 0
-                            return
-                        
-                        # Parse the results page
-                        soup = BeautifulSoup(driver.page_source, 'html.parser')
-                        permits = parse_rrc_results(soup, today)
-                        
-                        # Check for pagination and scrape additional pages
-                        page_count = 1
-                        total_permits = permits if permits else []
-                        
-                        # Look for pagination links
-                        pagination_links = driver.find_elements(By.XPATH, "//a[contains(@href, 'pager.offset')]")
-                        if pagination_links:
-                            print(f"Found {len(pagination_links)} pagination links")
-                            
-                            # Get unique page URLs
-                            page_urls = set()
-                            for link in pagination_links:
-                                href = link.get_attribute('href')
-                                if href and 'pager.offset' in href:
-                                    page_urls.add(href)
-                            
-                            print(f"Found {len(page_urls)} unique page URLs")
-                            
-                            # Scrape each additional page
-                            for page_url in page_urls:
-                                try:
-                                    page_count += 1
-                                    print(f"Scraping page {page_count}: {page_url}")
-                                    
-                                    driver.get(page_url)
-                                    WebDriverWait(driver, 10).until(
-                                        lambda driver: driver.current_url == page_url
-                                    )
-                                    
-                                    # Parse this page
-                                    soup = BeautifulSoup(driver.page_source, 'html.parser')
-                                    page_permits = parse_rrc_results(soup, today)
-                                    
-                                    if page_permits:
-                                        total_permits.extend(page_permits)
-                                        print(f"Found {len(page_permits)} permits on page {page_count}")
-                                    else:
-                                        print(f"No permits found on page {page_count}")
-                                        
-                                except Exception as e:
-                                    print(f"Error scraping page {page_count}: {e}")
-                                    continue
-                        
-                        if total_permits:
-                            print(f"✅ Found {len(total_permits)} total permits across {page_count} pages via Selenium")
-                            scraping_status['last_count'] = len(total_permits)
-                            return
-                        else:
-                            print("No permits found in any page")
-                            
-                    except Exception as e:
-                        print(f"Error clicking Search button: {e}")
-                        # Try alternative button selectors
-                        try:
-                            submit_buttons = driver.find_elements(By.XPATH, "//input[@type='submit']")
-                            print(f"Found {len(submit_buttons)} submit buttons")
-                            for i, btn in enumerate(submit_buttons):
-                                print(f"Button {i}: name='{btn.get_attribute('name')}', value='{btn.get_attribute('value')}', text='{btn.text}'")
-                            
-                            # Click the first submit button that's not "Log In"
-                            for btn in submit_buttons:
-                                if btn.get_attribute('value') and 'log' not in btn.get_attribute('value').lower():
-                                    print(f"Clicking button with value: {btn.get_attribute('value')}")
-                                    btn.click()
-                                    break
-                                    
-                        except Exception as e2:
-                            print(f"Alternative button click failed: {e2}")
-                
-                finally:
-                    driver.quit()
-                    
-            except ImportError as e:
-                print(f"Selenium not available: {e}, falling back to requests...")
-            except Exception as selenium_error:
-                print(f"Selenium failed: {selenium_error}, falling back to requests...")
-                # Log the specific error for debugging
-                import traceback
-                print(f"Selenium error details: {traceback.format_exc()}")
-                
-            # Fallback to requests approach
-            try:
-                print("Using requests fallback for RRC scraping...")
-                session = requests.Session()
-                session.headers.update({
-                    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Accept-Encoding': 'gzip, deflate',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                    'Referer': 'https://webapps.rrc.state.tx.us/'
-                })
-                
-                # Try to access the public permit search directly (no login required)
-                search_url = "https://webapps.rrc.state.tx.us/DP/initializePublicQueryAction.do"
-                print(f"Attempting to access public search: {search_url}")
-                
-                response = session.get(search_url, timeout=30)
-                print(f"Search page status: {response.status_code}")
-                print(f"Final URL: {response.url}")
-                
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    
-                    # Check if we're on the correct page (should contain "Search for W-1s")
-                    if "Search for W-1s" in response.text or "Drilling Permit" in response.text:
-                        print("✅ Successfully loaded the RRC public query form")
-                    elif 'login' in response.url.lower() or soup.find('input', {'name': 'userid'}):
-                        print("⚠️ Redirected to login page - this shouldn't happen with public form")
-                        scraping_status['last_count'] = 0
-                        return
-                    else:
-                        print("⚠️ Page content doesn't match expected RRC query form")
-                        print(f"Page contains: {response.text[:500]}...")
-                    
-                    # Look for the permit search form
-                    form = soup.find('form')
-                    if form:
-                        print("Found permit search form, extracting fields...")
-                        
-                        # Extract form action and method
-                        action = form.get('action', '')
-                        method = form.get('method', 'post').lower()
-                        
-                        # Build form data with today's date
-                        form_data = {}
-                        for input_field in form.find_all(['input', 'select', 'textarea']):
-                            name = input_field.get('name')
-                            if name:
-                                if name == 'submittedDateFrom' or name == 'submittedDateTo':
-                                    form_data[name] = date_str
-                                    print(f"Setting {name} to {date_str}")
-                                elif input_field.get('type') == 'submit':
-                                    form_data[name] = input_field.get('value', 'Submit')
-                                elif input_field.get('type') == 'hidden':
-                                    form_data[name] = input_field.get('value', '')
-                                elif input_field.get('type') == 'text' and not name.startswith('submittedDate'):
-                                    form_data[name] = ''
-                        
-                        # Submit the form
-                        if action:
-                            submit_url = urljoin(search_url, action)
-                            print(f"Submitting form to: {submit_url}")
-                            print(f"Form data: {form_data}")
-                            
-                            submit_response = session.post(submit_url, data=form_data, timeout=30)
-                            print(f"Form submission status: {submit_response.status_code}")
-                            print(f"Form submission URL: {submit_response.url}")
-                            
-                            if submit_response.status_code == 200:
-                                results_soup = BeautifulSoup(submit_response.content, 'html.parser')
-                                permits = parse_rrc_results(results_soup, today)
-                                
-                                if permits:
-                                    print(f"Found {len(permits)} permits via form submission")
-                                    scraping_status['last_count'] = len(permits)
-                                    return
-                                else:
-                                    print("No permits found in search results")
-                    else:
-                        print("No search form found on page")
-                else:
-                    print(f"Failed to access search page: {response.status_code}")
-                    
-            except Exception as requests_error:
-                print(f"Requests fallback also failed: {requests_error}")
-                import traceback
-                print(f"Requests error details: {traceback.format_exc()}")
-                
-            print("No new permits found for today")
-            scraping_status['last_count'] = 0
-            
+        for path in possible_paths:
+            if os.path.exists(path):
+                chromedriver_path = path
+                print(f"✅ Found ChromeDriver at: {path}")
+                break
+        
+        if chromedriver_path:
+            service = Service(chromedriver_path)
+            driver = webdriver.Chrome(service=service, options=chrome_options)
+            print(f"✅ ChromeDriver initialized successfully with system driver at {chromedriver_path}")
+        else:
+            print("⚠️ ChromeDriver not found in standard locations, will use webdriver-manager")
+            from webdriver_manager.chrome import ChromeDriverManager
+            service = Service(ChromeDriverManager().install())
+            driver = webdriver.Chrome(service=service, options=chrome_options)
+            print("✅ ChromeDriver initialized successfully with WebDriverManager")
+    except ImportError:
+        raise
     except Exception as e:
-        print(f"Error scraping RRC permits: {e}")
-        import traceback
-        traceback.print_exc()
-        scraping_status['error'] = str(e)
-    finally:
-        scraping_status['is_running'] = False
+        print(f"ChromeDriver initialization failed: {e}")
+        try:
+            # Fallback to system ChromeDriver without service
+            driver = webdriver.Chrome(options=chrome_options)
+            print("✅ ChromeDriver initialized successfully with system driver (no service)")
+        except Exception as e2:
+            print(f"All ChromeDriver attempts failed: {e2}")
+            raise e2
+    
+    return driver
+
+def _process_tree_rss_mb(root_pid):
+    """Resident memory (MB) of a process and all its descendants, read from /proc"""
+    if not root_pid or not os.path.isdir('/proc'):
+        return None
+    
+    children = {}
+    rss_pages = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                stat = f.read()
+            # The command name may contain spaces, so split after the closing paren
+            fields = stat[stat.rindex(')') + 2:].split()
+            ppid = int(fields[1])
+            children.setdefault(ppid, []).append(int(entry))
+            rss_pages[int(entry)] = int(fields[21])
+        except (OSError, ValueError, IndexError):
+            continue
+    
+    total_pages = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        total_pages += rss_pages.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    
+    return total_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+class PooledDriver:
+    """A pooled Chrome instance that tracks how many pages it has loaded"""
+    
+    def __init__(self, driver):
+        self.driver = driver
+        self.navigations = 0
+        self.created_at = time.monotonic()
+        self.broken = False
+    
+    def get(self, url):
+        self.navigations += 1
+        self.driver.get(url)
+    
+    def rss_mb(self):
+        try:
+            return _process_tree_rss_mb(self.driver.service.process.pid)
+        except Exception:
+            return None
+    
+    def is_healthy(self):
+        try:
+            # Cheap round-trip through ChromeDriver to make sure the browser still answers
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+    
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception as e:
+            print(f"Error closing Chrome: {e}")
+
+class ChromeDriverPool:
+    """Long-lived pool of warm Chrome drivers shared across scrapes.
+    
+    Drivers are started lazily, health-checked on checkout and recycled after
+    max_navigations page loads or once the browser's process tree grows past
+    max_rss_mb. Checkout blocks for at most checkout_timeout seconds.
+    """
+    
+    def __init__(self, size=1, max_navigations=200, max_rss_mb=1024, checkout_timeout=60):
+        self.size = max(1, size)
+        self.max_navigations = max_navigations
+        self.max_rss_mb = max_rss_mb
+        self.checkout_timeout = checkout_timeout
+        self._idle = []
+        self._created = 0
+        self._lock = threading.Condition()
+    
+    def _needs_recycle(self, pooled):
+        if pooled.broken:
+            return 'marked broken'
+        if self.max_navigations and pooled.navigations >= self.max_navigations:
+            return f'{pooled.navigations} navigations'
+        if self.max_rss_mb:
+            rss = pooled.rss_mb()
+            if rss is not None and rss > self.max_rss_mb:
+                return f'{rss:.0f} MB resident'
+        return None
+    
+    def _acquire(self):
+        deadline = time.monotonic() + self.checkout_timeout
+        with self._lock:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._created < self.size:
+                    # Reserve the slot now and start Chrome outside the lock
+                    self._created += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No Chrome driver available after {self.checkout_timeout}s")
+                self._lock.wait(remaining)
+        
+        try:
+            return PooledDriver(_create_chrome_driver())
+        except BaseException:
+            self._discard_slot()
+            raise
+    
+    def _discard_slot(self):
+        with self._lock:
+            self._created -= 1
+            self._lock.notify()
+    
+    def _release(self, pooled):
+        reason = self._needs_recycle(pooled)
+        if reason:
+            print(f"♻️ Recycling Chrome driver ({reason})")
+            pooled.quit()
+            self._discard_slot()
+            return
+        
+        with self._lock:
+            self._idle.append(pooled)
+            self._lock.notify()
+    
+    @contextmanager
+    def checkout(self):
+        """Check out a healthy driver; it is returned to the pool when the block exits"""
+        pooled = self._acquire()
+        if not pooled.is_healthy():
+            print("⚠️ Pooled Chrome driver failed health check, starting a new one")
+            pooled.quit()
+            # Give the dead driver's slot back first so a failed restart can't leak it
+            self._discard_slot()
+            pooled = self._acquire()
+        
+        try:
+            # Start every scrape from a clean RRC session
+            pooled.driver.delete_all_cookies()
+            yield pooled
+        except BaseException:
+            pooled.broken = not pooled.is_healthy()
+            raise
+        finally:
+            self._release(pooled)
+    
+    def shutdown(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+        for pooled in idle:
+            pooled.quit()
+
+chrome_driver_pool = ChromeDriverPool(
+    size=DRIVER_POOL_SIZE,
+    max_navigations=DRIVER_MAX_NAVIGATIONS,
+    max_rss_mb=DRIVER_MAX_RSS_MB,
+    checkout_timeout=DRIVER_CHECKOUT_TIMEOUT
+)
+atexit.register(chrome_driver_pool.shutdown)
 
+# RRC scrape engine configuration
+RRC_BASE_URL = 'https://webapps.rrc.state.tx.us'
+RRC_SEARCH_URL = f'{RRC_BASE_URL}/DP/initializePublicQueryAction.do'
+SCRAPE_ENGINE = os.getenv('RRC_SCRAPE_ENGINE', 'http').lower()
+SELENIUM_FALLBACK = os.getenv('RRC_SELENIUM_FALLBACK', 'false').lower() in ('1', 'true', 'yes')
+SCRAPE_MODE = os.getenv('RRC_SCRAPE_MODE', 'incremental').lower()  # 'incremental' or 'full'
+WATERMARK_RETENTION_DAYS = 7  # Days of ScrapeWatermark rows kept
+PAGE_FETCH_WORKERS = int(os.getenv('RRC_PAGE_WORKERS', '4'))
+PAGE_FETCH_MIN_INTERVAL = float(os.getenv('RRC_PAGE_MIN_INTERVAL', '0.25'))  # Seconds between requests to one host
+
+class HostRateLimiter:
+    """Spaces requests to the same host at least min_interval seconds apart, across threads"""
+    
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+    
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+rrc_rate_limiter = HostRateLimiter(PAGE_FETCH_MIN_INTERVAL)
+
+class RRCFormSession:
+    """Replayable model of the RRC public W-1 query form.
+    
+    Loads initializePublicQueryAction.do, captures the form action and every
+    field a browser would submit (hidden fields, selects, defaults) and
+    replays the query over a cookie-keeping requests.Session.
+    """
+    
+    DATE_FROM_FIELD = 'submitStart'
+    DATE_TO_FIELD = 'submitEnd'
+    SUBMIT_NAME = 'submit'
+    SUBMIT_VALUE = 'Submit'
+    
+    def __init__(self, timeout=30):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': CHROME_USER_AGENT,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+            'Referer': f'{RRC_BASE_URL}/'
+        })
+        # Keep one pooled connection per pagination worker
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max(PAGE_FETCH_WORKERS, 1))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.action_url = None
+        self.method = 'post'
+        self.fields = {}
+    
+    def load(self):
+        """Fetch the query form and capture its action and default field values"""
+        response = self.session.get(RRC_SEARCH_URL, timeout=self.timeout)
+        response.raise_for_status()
+        
+        soup = BeautifulSoup(response.content, 'html.parser')
+        if 'login' in response.url.lower() or soup.find('input', {'name': 'userid'}):
+            raise RuntimeError("Redirected to login page - this shouldn't happen with public form")
+        
+        form = None
+        for candidate in soup.find_all('form'):
+            if candidate.find(attrs={'name': self.DATE_FROM_FIELD}):
+                form = candidate
+                break
+        if form is None:
+            raise RuntimeError(f"No form with a {self.DATE_FROM_FIELD} field found at {response.url}")
+        
+        self.action_url = urljoin(response.url, form.get('action') or RRC_SEARCH_URL)
+        self.method = (form.get('method') or 'post').lower()
+        self.fields = self._default_fields(form)
+        print(f"✅ Loaded RRC query form ({len(self.fields)} fields, action {self.action_url})")
+        return self
+    
+    def _default_fields(self, form):
+        """Collect the name/value pairs a browser would send for an untouched form"""
+        fields = {}
+        for field in form.find_all(['input', 'select', 'textarea']):
+            name = field.get('name')
+            if not name or field.has_attr('disabled'):
+                continue
+            
+            if field.name == 'select':
+                options = field.find_all('option')
+                selected = [o for o in options if o.has_attr('selected')] or options[:1]
+                if selected:
+                    fields[name] = selected[0].get('value', selected[0].get_text(strip=True))
+            elif field.name == 'textarea':
+                fields[name] = field.get_text()
+            else:
+                field_type = (field.get('type') or 'text').lower()
+                if field_type in ('checkbox', 'radio'):
+                    if field.has_attr('checked'):
+                        fields[name] = field.get('value', 'on')
+                elif field_type in ('submit', 'button', 'image', 'reset', 'file'):
+                    # Only the clicked submit button is sent; added in build_query()
+                    continue
+                else:
+                    fields[name] = field.get('value', '')
+        return fields
+    
+    def build_query(self, date_from, date_to):
+        """Form data for a submitted-date range query (dates as MM/DD/YYYY)"""
+        data = dict(self.fields)
+        data[self.DATE_FROM_FIELD] = date_from
+        data[self.DATE_TO_FIELD] = date_to
+        data[self.SUBMIT_NAME] = self.SUBMIT_VALUE
+        return data
+    
+    def submit(self, date_from, date_to):
+        """Run the query and return the first results page (url, bytes, charset)"""
+        if self.action_url is None:
+            self.load()
+        
+        data = self.build_query(date_from, date_to)
+        print(f"Submitting form to: {self.action_url}")
+        if self.method == 'get':
+            response = self.session.get(self.action_url, params=data, timeout=self.timeout)
+        else:
+            response = self.session.post(self.action_url, data=data, timeout=self.timeout)
+        response.raise_for_status()
+        
+        if 'login' in response.url.lower():
+            raise RuntimeError("Redirected to login page - this shouldn't happen with public form")
+        
+        return response.url, response.content, self.declared_charset(response)
+    
+    def fetch(self, url):
+        """Fetch a follow-up page (e.g. a pager.offset link) within the same session; returns (bytes, charset)"""
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.content, self.declared_charset(response)
+    
+    @staticmethod
+    def declared_charset(response):
+        """The charset from the Content-Type header, or None so the parser reads the page's meta charset.
+        
+        response.encoding isn't used because requests assumes ISO-8859-1 for
+        any text/* response that doesn't name a charset.
+        """
+        _, options = parse_options_header(response.headers.get('Content-Type', ''))
+        return options.get('charset')
+    
+    def adopt_cookies(self, cookies):
+        """Continue a browser session over HTTP using Selenium-style cookie dicts"""
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie['name'], cookie['value'],
+                domain=cookie.get('domain'), path=cookie.get('path', '/')
+            )
+        return self
+    
+    @staticmethod
+    def page_urls(html, base_url, encoding=None):
+        """Absolute URLs of the Struts pager.offset links on a results page, read with the results parser backend"""
+        urls = []
+        for href in results_parser.links(html, encoding):
+            if 'pager.offset' in href:
+                url = urljoin(base_url, href)
+                if url not in urls:
+                    urls.append(url)
+        return urls
+    
+    @staticmethod
+    def page_offset(url):
+        """The pager.offset of a results page URL (0 for the first page)"""
+        values = parse_qs(urlparse(url).query).get('pager.offset')
+        try:
+            return int(values[0]) if values else 0
+        except ValueError:
+            return None
+    
+    @classmethod
+    def expand_page_urls(cls, urls):
+        """One URL per results page, ordered by offset.
+        
+        The pager only links a window of pages (plus Next/Last), so the gaps
+        are filled in from the page size and the largest offset seen.
+        """
+        by_offset = {}
+        for url in urls:
+            offset = cls.page_offset(url)
+            if offset:
+                by_offset.setdefault(offset, url)
+        if not by_offset:
+            return []
+        
+        offsets = sorted(by_offset)
+        page_size = offsets[0]
+        for previous, current in zip(offsets, offsets[1:]):
+            page_size = min(page_size, current - previous)
+        
+        template = urlparse(by_offset[offsets[0]])
+        query = parse_qs(template.query, keep_blank_values=True)
+        for offset in range(page_size, offsets[-1] + 1, page_size):
+            if offset not in by_offset:
+                query['pager.offset'] = [str(offset)]
+                by_offset[offset] = urlunparse(template._replace(query=urlencode(query, doseq=True)))
+        
+        return [by_offset[offset] for offset in sorted(by_offset)]
+
+def fetch_pages_concurrently(fetch, urls, workers=None, rate_limiter=None):
+    """Fetch URLs through a bounded worker pool.
+    
+    Returns (url, html, error) tuples in the same order as urls, so callers can
+    reassemble pages by offset no matter which request finished first.
+    """
+    if not urls:
+        return []
+    
+    rate_limiter = rate_limiter or rrc_rate_limiter
+    
+    def fetch_one(url):
+        rate_limiter.wait(url)
+        return fetch(url)
+    
+    workers = max(1, min(workers or PAGE_FETCH_WORKERS, len(urls)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rrc-page') as executor:
+        futures = [executor.submit(fetch_one, url) for url in urls]
+        results = []
+        for url, future in zip(urls, futures):
+            try:
+                results.append((url, future.result(), None))
+            except Exception as e:
+                results.append((url, None, e))
+    return results
+
+def _fetch_page_rows(form_session, urls):
+    """Fetch result pages concurrently and read their rows; returns (url, rows, error) in offset order"""
+    pages = []
+    for page_url, page, error in fetch_pages_concurrently(form_session.fetch, urls):
+        rows = None
+        if error is None:
+            try:
+                content, encoding = page
+                rows = read_permit_rows(content, encoding) or []
+            except Exception as e:
+                error = e
+        pages.append((page_url, rows, error))
+    return pages
+
+def _is_stale_page(rows, watermark_status_no):
+    """True when every row on the page is at or below the watermark"""
+    status_numbers = [row['status_no'] for row in rows if row['status_no'] is not None]
+    return bool(rows) and len(status_numbers) == len(rows) and max(status_numbers) <= watermark_status_no
+
+def _status_order(rows):
+    """'desc' or 'asc' when every row is numbered and the numbers are strictly monotonic, else None"""
+    status_numbers = [row['status_no'] for row in rows]
+    if len(status_numbers) < 2 or None in status_numbers:
+        return None
+    pairs = list(zip(status_numbers, status_numbers[1:]))
+    if all(a > b for a, b in pairs):
+        return 'desc'
+    if all(a < b for a, b in pairs):
+        return 'asc'
+    return None
+
+def _fetch_pages_above_watermark(form_session, first_rows, page_urls, watermark_status_no):
+    """Fetch only the result pages that can hold filings newer than the watermark.
+    
+    Skipping pages is only safe when the results are sorted by status number,
+    so the first page must be strictly monotonic; otherwise every page is
+    fetched. Pages are then walked from the newest end in waves of
+    PAGE_FETCH_WORKERS, stopping after the first wave that reaches an
+    already-ingested page. A fetched page that breaks the order turns the
+    stop off and the rest of the pages are fetched too.
+    """
+    order = _status_order(first_rows)
+    if order is None:
+        print("Result pages are not sorted by status number, fetching all of them")
+        return _fetch_page_rows(form_session, page_urls)
+    
+    if order == 'desc':
+        if _is_stale_page(first_rows, watermark_status_no):
+            return []
+        ordered_urls = page_urls
+    else:
+        ordered_urls = list(reversed(page_urls))
+    
+    pages = []
+    sorted_pages = True
+    wave_size = max(PAGE_FETCH_WORKERS, 1)
+    for start in range(0, len(ordered_urls), wave_size):
+        wave = _fetch_page_rows(form_session, ordered_urls[start:start + wave_size])
+        pages.extend(wave)
+        fetched = [rows for _, rows, _ in wave if rows]
+        if any(len(rows) > 1 and _status_order(rows) != order for rows in fetched):
+            if sorted_pages:
+                print("A result page is not sorted by status number, fetching all remaining pages")
+            sorted_pages = False
+        if sorted_pages and any(_is_stale_page(rows, watermark_status_no) for rows in fetched):
+            break
+    
+    print(f"Incremental scrape fetched {len(pages)} of {len(page_urls)} additional pages")
+    pages.sort(key=lambda page: RRCFormSession.page_offset(page[0]) or 0)
+    return pages
+
+def _texas_midnight_utc(day):
+    """Start of a Texas calendar day as a naive UTC datetime"""
+    midnight = datetime.combine(day, datetime.min.time())
+    if TEXAS_TZ:
+        return TEXAS_TZ.localize(midnight).astimezone(pytz.utc).replace(tzinfo=None)
+    return midnight
+
+def _advance_watermark(scrape_date, rows):
+    """Record the newest status number ingested for a date after a complete run"""
+    watermark = ScrapeWatermark.query.filter_by(scrape_date=scrape_date).first()
+    if not watermark:
+        watermark = ScrapeWatermark(scrape_date=scrape_date)
+        db.session.add(watermark)
+    
+    numbered_rows = [row for row in rows if row['status_no'] is not None]
+    if numbered_rows:
+        newest = max(numbered_rows, key=lambda row: row['status_no'])
+        if watermark.last_status_no is None or newest['status_no'] > watermark.last_status_no:
+            watermark.last_status_no = newest['status_no']
+            watermark.last_status_date = newest['status_date']
+    watermark.last_run_at = datetime.utcnow()
+    
+    # Only today and yesterday are ever queried; older watermarks are kept for a week as a record of recent runs
+    ScrapeWatermark.query.filter(ScrapeWatermark.scrape_date < scrape_date - timedelta(days=WATERMARK_RETENTION_DAYS)).delete()
+    db.session.commit()
+
+def _scrape_result_pages(form_session, results_url, html, today, engine_name, watermark_status_no=None, encoding=None):
+    """Read the results pages (all of them, or only those above the watermark) and store them in offset order.
+    
+    html is the first results page as text, or bytes in the given encoding.
+    """
+    first_rows = read_permit_rows(html, encoding) or []
+    
+    page_urls = RRCFormSession.expand_page_urls(RRCFormSession.page_urls(html, results_url, encoding))
+    print(f"Found {len(page_urls)} additional result pages, fetching with {PAGE_FETCH_WORKERS} workers")
+    
+    if watermark_status_no is None:
+        pages = _fetch_page_rows(form_session, page_urls)
+    else:
+        pages = _fetch_pages_above_watermark(form_session, first_rows, page_urls, watermark_status_no)
+    
+    total_permits = []
+    all_rows = []
+    complete = True
+    for page_number, (page_url, rows, error) in enumerate([(results_url, first_rows, None)] + pages, start=1):
+        if error is not None:
+            print(f"Error scraping page {page_number} ({page_url}): {error}")
+            complete = False
+            continue
+        all_rows.extend(rows)
+        page_permits = store_permit_rows(rows, today)
+        total_permits.extend(page_permits)
+        print(f"Found {len(page_permits)} permits on page {page_number}")
+    
+    # A page that failed may hold rows below the newest one seen; don't skip past it next run
+    if complete:
+        _advance_watermark(today, all_rows)
+    
+    print(f"✅ Found {len(total_permits)} new permits across {len(pages) + 1} pages via {engine_name}")
+    return total_permits
+
+def _scrape_with_http(today, date_str, watermark_status_no=None):
+    """Scrape one submitted date with plain HTTP requests; returns the new permits"""
+    print(f"Using HTTP form session to scrape RRC for date: {date_str}")
+    form_session = RRCFormSession().load()
+    results_url, html, encoding = form_session.submit(date_str, date_str)
+    print(f"Results page: {results_url}")
+    
+    return _scrape_result_pages(form_session, results_url, html, today, 'HTTP', watermark_status_no, encoding)
+
+def _scrape_with_selenium(today, date_str, watermark_status_no=None):
+    """Scrape one submitted date by driving a pooled headless Chrome; returns the new permits"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    
+    print(f"Using Selenium to scrape RRC for date: {date_str}")
+    
+    with chrome_driver_pool.checkout() as pooled:
+        driver = pooled.driver
+        
+        # Navigate to the RRC search page
+        print(f"Navigating to: {RRC_SEARCH_URL}")
+        pooled.get(RRC_SEARCH_URL)
+        
+        # Wait for page to load and check if we're on the right page
+        WebDriverWait(driver, 15).until(
+            EC.presence_of_element_located((By.TAG_NAME, "form"))
+        )
+        
+        print(f"Page loaded successfully. Current URL: {driver.current_url}")
+        
+        # Fill the submitted date range
+        for field_name in (RRCFormSession.DATE_FROM_FIELD, RRCFormSession.DATE_TO_FIELD):
+            field = driver.find_element(By.NAME, field_name)
+            field.clear()
+            field.send_keys(date_str)
+            print(f"✅ Filled {field_name}: {date_str}")
+        
+        # Find the correct submit button (name='submit' with value='Submit')
+        search_button = None
+        for button in driver.find_elements(By.CSS_SELECTOR, "input[type='submit']"):
+            if (button.get_attribute('name') == RRCFormSession.SUBMIT_NAME
+                    and button.get_attribute('value') == RRCFormSession.SUBMIT_VALUE):
+                search_button = button
+                break
+        
+        if not search_button:
+            raise Exception("Could not find submit button with name='submit' and value='Submit'")
+        
+        print("✅ Found Submit button (name='submit', value='Submit'), clicking...")
+        search_button.click()
+        
+        # Wait for results page to load
+        WebDriverWait(driver, 20).until(
+            lambda driver: driver.current_url != RRC_SEARCH_URL
+        )
+        
+        print(f"After search, current URL: {driver.current_url}")
+        
+        # Check if we got redirected to login
+        if 'login' in driver.current_url.lower():
+            raise RuntimeError("Redirected to login page - this shouldn't happen with public form")
+        
+        results_url = driver.current_url
+        html = driver.page_source
+        cookies = driver.get_cookies()
+    
+    # Hand the browser session to the HTTP fetcher so result pages load concurrently
+    form_session = RRCFormSession().adopt_cookies(cookies)
+    return _scrape_result_pages(form_session, results_url, html, today, 'Selenium', watermark_status_no)
+
+def _scrape_engines():
+    """Scrape engines in the order they should be tried"""
+    if SCRAPE_ENGINE == 'selenium':
+        return [('selenium', _scrape_with_selenium), ('http', _scrape_with_http)]
+    
+    engines = [('http', _scrape_with_http)]
+    if SELENIUM_FALLBACK:
+        engines.append(('selenium', _scrape_with_selenium))
+    return engines
+
+def _scrape_dates(texas_now):
+    """Texas dates to query this run.
+    
+    Normally just today; right after midnight yesterday is queried once more so
+    filings submitted after its last run are not lost in the rollover.
+    """
+    today = texas_now.date()
+    yesterday = today - timedelta(days=1)
+    
+    watermark = ScrapeWatermark.query.filter_by(scrape_date=yesterday).first()
+    if watermark and (watermark.last_run_at is None or watermark.last_run_at < _texas_midnight_utc(today)):
+        print(f"Catching up on {yesterday.strftime('%m/%d/%Y')} filings submitted after its last run")
+        return [yesterday, today]
+    return [today]
+
+def _scrape_date(scrape_date):
+    """Run the scrape engines for one submitted date; returns (new permits or None if every engine failed, errors)"""
+    date_str = scrape_date.strftime('%m/%d/%Y')
+    
+    watermark_status_no = None
+    if SCRAPE_MODE == 'incremental':
+        watermark = ScrapeWatermark.query.filter_by(scrape_date=scrape_date).first()
+        if watermark and watermark.last_status_no is not None:
+            watermark_status_no = watermark.last_status_no
+            print(f"Incremental scrape for {date_str} above status #{watermark_status_no}")
+    
+    errors = []
+    for engine_name, engine in _scrape_engines():
+        try:
+            return engine(scrape_date, date_str, watermark_status_no), errors
+        except ImportError as e:
+            print(f"{engine_name} engine not available: {e}")
+            errors.append(f"{engine_name}: {e}")
+        except Exception as e:
+            print(f"{engine_name} engine failed: {e}")
+            import traceback
+            print(f"{engine_name} error details: {traceback.format_exc()}")
+            errors.append(f"{engine_name}: {e}")
+    
+    return None, errors
+
+def scrape_rrc_permits():
+    """Scrape new permits from the RRC public query form.
+    
+    The browserless HTTP engine is the default; headless Chrome is only used
+    when RRC_SCRAPE_ENGINE=selenium or, as a fallback, with RRC_SELENIUM_FALLBACK=true.
+    In the default incremental mode (RRC_SCRAPE_MODE) only result pages newer
+    than the date's ScrapeWatermark are fetched.
+    """
+    global scraping_status
+    
+    scraping_status['is_running'] = True
+    scraping_status['error'] = None
+    scraping_status['last_run'] = datetime.now(TEXAS_TZ)
+    event_broadcaster.publish('status', format_scraping_status())
+    
+    try:
+        print("Starting RRC permit scraping...")
+        
+        with app.app_context():
+            # Get today's date in Texas timezone
+            if TEXAS_TZ:
+                texas_now = datetime.now(TEXAS_TZ)
+            else:
+                texas_now = datetime.utcnow()
+            today = texas_now.date()
+            print(f"Scraping for Texas date: {today.strftime('%m/%d/%Y')} (Texas time: {texas_now.strftime('%I:%M:%S %p')})")
+            
+            new_count = 0
+            errors = []
+            for scrape_date in _scrape_dates(texas_now):
+                permits, date_errors = _scrape_date(scrape_date)
+                if permits is None:
+                    print(f"All scrape engines failed for {scrape_date.strftime('%m/%d/%Y')}")
+                    errors.extend(date_errors)
+                    continue
+                new_count += len(permits)
+            
+            scraping_status['last_count'] = new_count
+            scraping_status['error'] = '; '.join(errors) or None
+            
+    except Exception as e:
+        print(f"Error scraping RRC permits: {e}")
+        import traceback
+        traceback.print_exc()
+        scraping_status['error'] = str(e)
+    finally:
+        scraping_status['is_running'] = False
+        event_broadcaster.publish('status', format_scraping_status())
+
+@lru_cache(maxsize=4096)
 def normalize_county_name(county_name):
     """Normalize county name to match TEXAS_COUNTIES format"""
     if not county_name:
         return ''
     
-    # Remove "County" suffix if present
-    county_name = county_name.replace(' COUNTY', '').replace(' County', '').replace(' county', '')
+    # Uppercase, collapse whitespace and remove the "County" suffix
+    county_name = ' '.join(county_name.upper().split()).replace(' COUNTY', '').strip()
     
-    # Convert to uppercase
-    county_name = county_name.upper().strip()
+    # Exact, alias or compacted-spelling match against the Texas counties
+    texas_county = _COUNTY_LOOKUP.get(county_name) or _COUNTY_LOOKUP.get(_compact_county_key(county_name))
+    if texas_county:
+        return texas_county
     
-    # Check if it matches any Texas county
-    for texas_county in TEXAS_COUNTIES:
-        if county_name == texas_county:
-            return texas_county
-    
-    # If no exact match, return the cleaned name
+    # If no match, return the cleaned name
     return county_name
 
-def parse_rrc_results(soup, today):
-    """Parse RRC results page and extract permit data"""
-    try:
-        # Look for results table
-        tables = soup.find_all('table')
-        print(f"Found {len(tables)} tables on page")
-        
-        results_table = None
-        max_rows = 0
+def existing_permit_keys(rows, chunk_size=500):
+    """(api_number, lease_name, well_number) keys from rows that are already stored"""
+    api_numbers = sorted({row['api_number'] for row in rows})
+    keys = set()
+    for start in range(0, len(api_numbers), chunk_size):
+        chunk = api_numbers[start:start + chunk_size]
+        keys.update(
+            tuple(key) for key in db.session.query(
+                Permit.api_number, Permit.lease_name, Permit.well_number
+            ).filter(Permit.api_number.in_(chunk))
+        )
+    return keys
+
+# Delta sync
+PERMIT_CHANGES_PAGE_SIZE = int(os.getenv('PERMIT_CHANGES_PAGE_SIZE', '1000'))
+PERMIT_CHANGE_RETENTION_DAYS = int(os.getenv('PERMIT_CHANGE_RETENTION_DAYS', '7'))
+
+def record_permit_changes(action, permit_ids):
+    """Add change-log rows to the current transaction; the caller commits"""
+    if permit_ids:
+        db.session.execute(db.insert(PermitChange), [
+            {'permit_id': permit_id, 'action': action, 'created_at': datetime.utcnow()}
+            for permit_id in permit_ids
+        ])
+
+def latest_permit_change():
+    return db.session.query(db.func.max(PermitChange.id)).scalar() or 0
+
+def prune_permit_changes():
+    """Drop change-log rows past the retention window; clients behind it get a reset"""
+    cutoff = datetime.utcnow() - timedelta(days=PERMIT_CHANGE_RETENTION_DAYS)
+    removed = PermitChange.query.filter(PermitChange.created_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    if removed:
+        print(f"Pruned {removed} permit change log entries")
+
+def insert_new_permits(rows, today, chunk_size=500):
+    """Bulk insert scraped rows, skipping ones that already exist; returns the new Permit objects.
+    
+    On SQLite and Postgres this is INSERT ... ON CONFLICT DO NOTHING against
+    ux_permits_natural_key; other databases fall back to a set-based lookup.
+    """
+    if not rows:
+        return []
+    
+    dialect = db.engine.dialect.name
+    if dialect not in ('sqlite', 'postgresql'):
+        existing_keys = existing_permit_keys(rows)
+        new_permits = []
+        for row in rows:
+            key = (row['api_number'], row['lease_name'], row['well_number'])
+            if key in existing_keys:
+                continue
+            existing_keys.add(key)  # Also drops repeats within the page
+            new_permits.append(Permit(date_issued=today, **row))
+        db.session.add_all(new_permits)
+        db.session.flush()
+        record_permit_changes('insert', [permit.id for permit in new_permits])
+        db.session.commit()
+        return new_permits
+    
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    
+    new_ids = []
+    for start in range(0, len(rows), chunk_size):
+        values = [dict(row, date_issued=today) for row in rows[start:start + chunk_size]]
+        stmt = insert(Permit).values(values).on_conflict_do_nothing(
+            index_elements=['api_number', 'lease_name', 'well_number']
+        ).returning(Permit.id)
+        new_ids.extend(db.session.execute(stmt).scalars())
+    record_permit_changes('insert', new_ids)
+    db.session.commit()
+    
+    if not new_ids:
+        return []
+    return Permit.query.filter(Permit.id.in_(new_ids)).order_by(Permit.id).all()
+
+# Header cells that identify the RRC results table
+RESULTS_HEADER_SIGNATURE = ('status date', 'api no', 'operator')
+
+# Column positions used when the header row can't be read
+DEFAULT_RESULTS_COLUMNS = {
+    'status_date': 0,
+    'status_no': 1,
+    'api_number': 2,
+    'operator': 3,
+    'lease_name': 4,
+    'well_number': 5,
+    'county': 7
+}
+
+# Where the results table was found last time (per parser backend), reused as the fast path on the next page
+_results_table_cache = {}
+
+class SoupParserBackend:
+    """Pure-Python BeautifulSoup backend; always available.
+    
+    Every backend takes the page as text, or as bytes plus the charset the
+    response declared (None lets the parser sniff it).
+    """
+    name = 'html.parser'
+    
+    def _document(self, html, encoding):
+        if isinstance(html, bytes):
+            return BeautifulSoup(html, 'html.parser', from_encoding=encoding)
+        return BeautifulSoup(html, 'html.parser')
+    
+    def tables(self, html, encoding=None):
+        return self._document(html, encoding).find_all('table')
+    
+    def links(self, html, encoding=None):
+        return [link['href'] for link in self._document(html, encoding).find_all('a', href=True)]
+    
+    def rows(self, table):
+        return table.find_all('tr')
+    
+    def has_nested_table(self, row):
+        return row.find('table') is not None
+    
+    def cell_texts(self, row):
+        return [cell.get_text(strip=True) for cell in row.find_all(['td', 'th'])]
+    
+    def first_href(self, row):
+        link = row.find('a', href=True)
+        return link['href'] if link else None
+
+class LxmlParserBackend:
+    """libxml2-based backend using lxml.html"""
+    name = 'lxml'
+    
+    def _document(self, html, encoding):
+        import lxml.html
+        if isinstance(html, bytes):
+            # Without an explicit encoding lxml falls back to the page's meta charset
+            parser = lxml.html.HTMLParser(encoding=encoding) if encoding else None
+            return lxml.html.fromstring(html, parser=parser)
+        # Already-decoded text is parsed as is, so its meta charset can't re-decode it
+        return lxml.html.fromstring(html)
+    
+    def tables(self, html, encoding=None):
+        return self._document(html, encoding).xpath('//table')
+    
+    def links(self, html, encoding=None):
+        return self._document(html, encoding).xpath('//a/@href')
+    
+    def rows(self, table):
+        return table.xpath('.//tr')
+    
+    def has_nested_table(self, row):
+        return bool(row.xpath('.//table'))
+    
+    def cell_texts(self, row):
+        # Same joining rules as BeautifulSoup's get_text(strip=True)
+        return [''.join(text.strip() for text in cell.itertext()) for cell in row.xpath('.//td|.//th')]
+    
+    def first_href(self, row):
+        hrefs = row.xpath('.//a/@href')
+        return hrefs[0] if hrefs else None
+
+class SelectolaxParserBackend:
+    """Lexbor-based backend using selectolax"""
+    name = 'selectolax'
+    
+    def _document(self, html, encoding):
+        from selectolax.lexbor import LexborHTMLParser
+        if isinstance(html, bytes) and encoding:
+            html = html.decode(encoding, errors='replace')
+        return LexborHTMLParser(html)
+    
+    def tables(self, html, encoding=None):
+        return self._document(html, encoding).css('table')
+    
+    def links(self, html, encoding=None):
+        return [link.attributes.get('href') for link in self._document(html, encoding).css('a[href]')]
+    
+    def rows(self, table):
+        return table.css('tr')
+    
+    def has_nested_table(self, row):
+        return row.css_first('table') is not None
+    
+    def cell_texts(self, row):
+        return [cell.text(deep=True, separator='', strip=True) for cell in row.css('td, th')]
+    
+    def first_href(self, row):
+        link = row.css_first('a[href]')
+        return link.attributes.get('href') if link else None
+
+PARSER_BACKENDS = {
+    'selectolax': SelectolaxParserBackend,
+    'lxml': LxmlParserBackend,
+    'html.parser': SoupParserBackend
+}
+
+def _select_parser_backend(name):
+    """Instantiate the configured parser backend; 'auto' picks the fastest one installed"""
+    candidates = list(PARSER_BACKENDS) if name == 'auto' else [name, 'html.parser']
+    for candidate in candidates:
+        backend_class = PARSER_BACKENDS.get(candidate)
+        if backend_class is None:
+            print(f"⚠️ Unknown parser backend '{candidate}'")
+            continue
+        try:
+            backend_class().tables('<table><tr><td></td></tr></table>')
+        except ImportError:
+            continue
+        print(f"✅ Using {candidate} parser backend for RRC result pages")
+        return backend_class()
+    return SoupParserBackend()
+
+results_parser = _select_parser_backend(os.getenv('RRC_PARSER_BACKEND', 'auto').lower())
+
+def _normalize_header(text):
+    """Lowercase a header cell and drop punctuation, e.g. 'API No.' -> 'api no'"""
+    for char in '.#:':
+        text = text.replace(char, ' ')
+    return ' '.join(text.lower().split())
+
+def _results_header(parser, rows, max_rows=3):
+    """(row position, normalized header texts) if one of the table's first rows is the results header"""
+    for position, row in enumerate(rows[:max_rows]):
+        # Layout tables wrap the results table; their rows contain whole nested tables
+        if parser.has_nested_table(row):
+            return None
+        texts = [_normalize_header(text) for text in parser.cell_texts(row)]
+        if all(any(text.startswith(signature) for text in texts) for signature in RESULTS_HEADER_SIGNATURE):
+            return position, texts
+    return None
+
+def _results_columns(header_texts):
+    """Map permit fields to column positions from the results header row"""
+    columns = {}
+    for position, text in enumerate(header_texts):
+        if text == 'status date':
+            field = 'status_date'
+        elif text == 'status':
+            field = 'status_no'
+        elif text.startswith('api'):
+            field = 'api_number'
+        elif text.startswith('operator'):
+            field = 'operator'
+        elif text.startswith('lease'):
+            field = 'lease_name'
+        elif text.startswith('well'):
+            field = 'well_number'
+        elif text.startswith('county'):
+            field = 'county'
+        else:
+            continue
+        columns.setdefault(field, position)
+    return dict(DEFAULT_RESULTS_COLUMNS, **columns)
+
+def extract_results_rows(html, parser=None, encoding=None):
+    """Find the results table by its header signature and read its data rows in one pass.
+    
+    Returns (column map, [(cell texts, first href), ...]) or None when the page
+    has no results table. The table's position on the page is cached, so later
+    pages check that table first.
+    """
+    parser = parser or results_parser
+    tables = parser.tables(html, encoding)
+    
+    located = None
+    cached_index = _results_table_cache.get(parser.name)
+    if cached_index is not None and cached_index < len(tables):
+        rows = parser.rows(tables[cached_index])
+        header = _results_header(parser, rows)
+        if header:
+            located = rows, header
+    
+    if located is None:
+        for index, table in enumerate(tables):
+            rows = parser.rows(table)
+            header = _results_header(parser, rows)
+            if header:
+                _results_table_cache[parser.name] = index
+                print(f"Located results table at position {index} of {len(tables)}")
+                located = rows, header
+                break
+    
+    if located is None:
+        return None
+    
+    rows, (header_position, header_texts) = located
+    return _results_columns(header_texts), [
+        (parser.cell_texts(row), parser.first_href(row))
+        for row in rows[header_position + 1:]
+    ]
+
+PERMIT_ROW_FIELDS = ('county', 'operator', 'lease_name', 'well_number', 'api_number', 'rrc_link')
+
+def _parse_status_no(text):
+    """RRC status number as an int (None when the cell isn't numeric)"""
+    digits = ''.join(char for char in text if char.isdigit())
+    return int(digits) if digits else None
+
+def read_permit_rows(html, encoding=None):
+    """Read permit rows from an RRC results page without touching the database.
+    
+    Each row carries the Permit columns plus the RRC status_no/status_date used
+    for incremental scraping. Returns None when the page has no results table.
+    html is text, or bytes in the given encoding.
+    """
+    extracted = extract_results_rows(html, encoding=encoding)
+    if not extracted:
+        return None
+    
+    columns, data_rows = extracted
+    print(f"Processing {len(data_rows)} data rows")
+    
+    page_rows = []
+    
+    for i, (cell_texts, href) in enumerate(data_rows):
+        if len(cell_texts) < 5:
+            continue
         
-        for i, table in enumerate(tables):
-            rows = table.find_all('tr')
-            row_count = len(rows)
-            print(f"Table {i}: rows={row_count}")
-            
-            if row_count > 0:
-                first_row_cells = [cell.get_text(strip=True) for cell in rows[0].find_all(['td', 'th'])]
-                print(f"  First row: {first_row_cells}")
-            
-            # Look for table with most rows (likely results)
-            if row_count > max_rows:
-                max_rows = row_count
-                results_table = table
+        print(f"Row {i+1}: {cell_texts}")
         
-        if results_table and max_rows > 1:
-            print(f"Using table with {max_rows} rows")
-            
-            rows = results_table.find_all('tr')
-            data_rows = rows[1:] if len(rows) > 1 else rows  # Skip header
+        try:
+            # Columns come from the header row (Status Date, Status #, API No.,
+            # Operator Name/Number, Lease Name, Well #, Dist., County, ...)
+            status_date, status_no, api_number, operator, lease_name, well_number, county_text = (
+                cell_texts[columns[field]] if len(cell_texts) > columns[field] else ''
+                for field in ('status_date', 'status_no', 'api_number', 'operator', 'lease_name', 'well_number', 'county')
+            )
             
-            print(f"Processing {len(data_rows)} data rows")
+            county = ''
+            if county_text:
+                county = normalize_county_name(county_text)
+            
+            # If the county column is empty, try the columns after the well number
+            if not county:
+                print(f"  No county found in column {columns['county']}, checking other columns")
+                for cell_text in cell_texts[columns['well_number'] + 1:]:
+                    if cell_text:
+                        normalized_county = normalize_county_name(cell_text)
+                        if normalized_county in TEXAS_COUNTY_SET:
+                            county = normalized_county
+                            print(f"  Found county: {county}")
+                            break
             
-            new_permits = []
+            # If still no county found, set to UNKNOWN
+            if not county:
+                print(f"  No county found in any column, setting to UNKNOWN")
+                county = 'UNKNOWN'
             
-            for i, row in enumerate(data_rows):
-                cells = row.find_all(['td', 'th'])
-                if len(cells) < 5:
-                    continue
-                
-                cell_texts = [cell.get_text(strip=True) for cell in cells]
-                print(f"Row {i+1}: {cell_texts}")
-                
-                try:
-                    # Extract data based on RRC table structure from logs:
-                    # Status Date, Status #, API No., Operator Name/Number, Lease Name, Well #, Dist., County, etc.
-                    # From logs: Column 6 = Dist., Column 7 = County
-                    
-                    api_number = cells[2].get_text(strip=True) if len(cells) > 2 else ''
-                    operator = cells[3].get_text(strip=True) if len(cells) > 3 else ''
-                    lease_name = cells[4].get_text(strip=True) if len(cells) > 4 else ''
-                    well_number = cells[5].get_text(strip=True) if len(cells) > 5 else ''
-                    
-                    # County is in column 7 (index 7) based on the logs
-                    county = ''
-                    if len(cells) > 7:
-                        county_text = cells[7].get_text(strip=True)
-                        print(f"  Column 7 (County): '{county_text}'")
-                        if county_text:
-                            county = normalize_county_name(county_text)
-                            print(f"  Found county: {county}")
-                    
-                    # If no county found in column 7, try other columns
-                    if not county:
-                        print(f"  No county found in column 7, checking other columns")
-                        for i, cell in enumerate(cells[6:]):
-                            cell_text = cell.get_text(strip=True)
-                            print(f"  Column {i+6}: '{cell_text}'")
-                            if cell_text:
-                                normalized_county = normalize_county_name(cell_text)
-                                if normalized_county and normalized_county in TEXAS_COUNTIES:
-                                    county = normalized_county
-                                    print(f"  Found county: {county}")
-                                    break
-                    
-                    # If still no county found, set to UNKNOWN
-                    if not county:
-                        print(f"  No county found in any column, setting to UNKNOWN")
-                        county = 'UNKNOWN'
-                    
-                    # Skip header rows or invalid data
-                    if not operator or 'api' in api_number.lower() or 'status' in api_number.lower():
-                        continue
-                    
-                    # Extract RRC link from the table row
-                    rrc_link = ""
-                    link_element = row.find('a', href=True)
-                    if link_element:
-                        href = link_element['href']
-                        if href.startswith('/'):
-                            rrc_link = f"https://webapps.rrc.state.tx.us{href}"
-                        elif href.startswith('http'):
-                            rrc_link = href
-                        else:
-                            rrc_link = f"https://webapps.rrc.state.tx.us/DP/{href}"
-                        print(f"Found RRC link: {rrc_link}")
-                    else:
-                        # Fallback to generic link if no specific link found
-                        rrc_link = f"https://webapps.rrc.state.tx.us/DP/drillDownQueryAction.do?name={lease_name.replace(' ', '%20')}&fromPublicQuery=Y"
-                        print(f"Using fallback RRC link: {rrc_link}")
-                    
-                    # Check if permit already exists
-                    existing_permit = Permit.query.filter_by(
-                        api_number=api_number,
-                        lease_name=lease_name,
-                        well_number=well_number
-                    ).first()
-                    
-                    if not existing_permit:
-                        permit = Permit(
-                            county=county,
-                            operator=operator,
-                            lease_name=lease_name,
-                            well_number=well_number,
-                            api_number=api_number,
-                            date_issued=today,
-                            rrc_link=rrc_link
-                        )
-                        db.session.add(permit)
-                        new_permits.append(permit)
-                        print(f"Added new permit: {operator} - {lease_name} - {well_number}")
-                
-                except Exception as e:
-                    print(f"Error processing row {i+1}: {e}")
-                    continue
+            # Skip header rows or invalid data
+            if not operator or 'api' in api_number.lower() or 'status' in api_number.lower():
+                continue
             
-            # Commit new permits
-            if new_permits:
-                db.session.commit()
-                print(f"Successfully added {len(new_permits)} new permits")
-                
-                # Send push notifications for new permits
-                send_notifications_for_new_permits(new_permits)
-                
-                # Debug: Check total permits in database
-                total_permits = Permit.query.count()
-                print(f"Total permits in database: {total_permits}")
-                
-                return new_permits
+            # Extract RRC link from the table row
+            rrc_link = ""
+            if href:
+                if href.startswith('/'):
+                    rrc_link = f"https://webapps.rrc.state.tx.us{href}"
+                elif href.startswith('http'):
+                    rrc_link = href
+                else:
+                    rrc_link = f"https://webapps.rrc.state.tx.us/DP/{href}"
+                print(f"Found RRC link: {rrc_link}")
             else:
-                print("No new permits found")
-                return []
-        else:
+                # Fallback to generic link if no specific link found
+                rrc_link = f"https://webapps.rrc.state.tx.us/DP/drillDownQueryAction.do?name={lease_name.replace(' ', '%20')}&fromPublicQuery=Y"
+                print(f"Using fallback RRC link: {rrc_link}")
+            
+            page_rows.append({
+                'county': county,
+                'operator': operator,
+                'lease_name': lease_name,
+                'well_number': well_number,
+                'api_number': api_number,
+                'rrc_link': rrc_link,
+                'status_no': _parse_status_no(status_no),
+                'status_date': status_date
+            })
+        
+        except Exception as e:
+            print(f"Error processing row {i+1}: {e}")
+            continue
+    
+    return page_rows
+
+def store_permit_rows(rows, today):
+    """Store scraped rows, notify subscribers about the new ones and return them"""
+    # Insert the whole page at once, letting the natural-key index drop known permits
+    new_permits = insert_new_permits([{field: row[field] for field in PERMIT_ROW_FIELDS} for row in rows], today)
+    
+    if new_permits:
+        print(f"Successfully added {len(new_permits)} new permits")
+        data_version.bump()
+        event_broadcaster.publish('permits', {'version': latest_permit_change()})
+        
+        # Send push notifications for new permits
+        send_notifications_for_new_permits(new_permits)
+    else:
+        print("No new permits found")
+    
+    return new_permits
+
+def parse_rrc_results(html, today):
+    """Parse an RRC results page (HTML text) and store the new permits"""
+    try:
+        rows = read_permit_rows(html)
+        if rows is None:
             print("No results table found or table has no data")
             return []
+        return store_permit_rows(rows, today)
             
     except Exception as e:
         print(f"Error parsing RRC results: {e}")
@@ -991,1974 +2387,642 @@ def parse_rrc_results(soup, today):
         traceback.print_exc()
         return []
 
-def generate_html():
-    """Generate the complete HTML page"""
-    # Get permits from database
-    permits = Permit.query.order_by(Permit.created_at.desc()).all()
-    print(f"DEBUG: Total permits in database: {len(permits)}")
+# Index page paging
+INDEX_PAGE_SIZE = int(os.getenv('INDEX_PAGE_SIZE', '100'))
+INDEX_MAX_PAGE_SIZE = int(os.getenv('INDEX_MAX_PAGE_SIZE', '500'))
+INDEX_STREAMING = os.getenv('INDEX_STREAMING', 'true').lower() == 'true'  # Stream the index page as it renders
+INDEX_STREAM_BUFFER = int(os.getenv('INDEX_STREAM_BUFFER', '16384'))  # Bytes per streamed chunk
+INDEX_YIELD_PER = 200  # Rows fetched per round trip while streaming permit cards
+
+# /api/permits paging
+API_PERMITS_PAGE_SIZE = int(os.getenv('API_PERMITS_PAGE_SIZE', '500'))
+API_PERMITS_MAX_PAGE_SIZE = int(os.getenv('API_PERMITS_MAX_PAGE_SIZE', '5000'))
+
+# Exports
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))  # Rows per DB round trip and per streamed chunk
+EXPORT_COLUMNAR_BATCH_SIZE = int(os.getenv('EXPORT_COLUMNAR_BATCH_SIZE', '10000'))  # Rows per Arrow batch / Parquet row group
+
+# ORDER BY clauses for the sort dropdown; id breaks ties so pages never overlap
+PERMIT_SORTS = {
+    'newest': (Permit.created_at.desc(), Permit.id.desc()),
+    'oldest': (Permit.created_at.asc(), Permit.id.asc()),
+    'county': (Permit.county.asc(), Permit.created_at.desc(), Permit.id.desc()),
+    'operator': (Permit.operator.asc(), Permit.created_at.desc(), Permit.id.desc()),
+}
+
+def _positive_int(value, default, maximum=None):
+    """Parse a query-string integer, falling back to default when missing or invalid"""
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return default
+    if number < 1:
+        return default
+    return min(number, maximum) if maximum else number
+
+def _contains_pattern(term):
+    """LIKE pattern matching term anywhere, with LIKE wildcards in term escaped"""
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+def search_permits(query, search_term):
+    """Case-insensitive substring match on operator or lease name"""
+    if not search_term:
+        return query
+    pattern = _contains_pattern(search_term)
+    return query.filter(db.or_(
+        Permit.operator.ilike(pattern, escape='\\'),
+        Permit.lease_name.ilike(pattern, escape='\\')
+    ))
+
+# Serializable permit columns, in output order
+PERMIT_API_FIELDS = ('id', 'county', 'operator', 'lease_name', 'well_number',
+                     'api_number', 'date_issued', 'rrc_link', 'created_at')
+
+def _arg_list(args, name):
+    """Values of a repeatable, comma-separable query parameter"""
+    return [value.strip() for raw in args.getlist(name) for value in raw.split(',') if value.strip()]
+
+def _parse_date_arg(args, name):
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a date (YYYY-MM-DD)")
+
+def _parse_datetime_arg(args, name):
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO 8601 datetime")
+    # created_at is stored as naive UTC
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+# Query parameters read by filter_permits()
+PERMIT_FILTER_ARGS = ('county', 'operator', 'date_from', 'date_to', 'since', 'exclude_county', 'exclude_id')
+
+def filter_permits(query, args):
+    """Apply the permit filters shared by the data endpoints; raises ValueError on bad input.
     
-    # Get selected counties from session
-    selected_counties = session.get('selected_counties', [])
+    county      repeatable or comma separated county names
+    operator    case-insensitive substring of the operator
+    date_from   first date issued (YYYY-MM-DD), inclusive
+    date_to     last date issued (YYYY-MM-DD), inclusive
+    since       only permits added after this time (ISO 8601, UTC if no offset)
+    exclude_county  counties to leave out, same format as county
+    exclude_id      permit ids to leave out, e.g. the ones dismissed on a device
+    """
+    counties = {normalize_county_name(county) or county.upper() for county in _arg_list(args, 'county')}
+    if counties:
+        query = query.filter(Permit.county.in_(sorted(counties)))
+    excluded_counties = {normalize_county_name(county) or county.upper() for county in _arg_list(args, 'exclude_county')}
+    if excluded_counties:
+        query = query.filter(Permit.county.notin_(sorted(excluded_counties)))
     
-    # Apply filters
-    search_term = request.args.get('search', '')
-    sort_by = request.args.get('sort', 'newest')
+    try:
+        excluded_ids = {int(value) for value in _arg_list(args, 'exclude_id')}
+    except ValueError:
+        raise ValueError("exclude_id must be permit ids")
+    if excluded_ids:
+        query = query.filter(Permit.id.notin_(sorted(excluded_ids)))
     
-    print(f"DEBUG: Filters - search: '{search_term}', sort: '{sort_by}'")
-    
-    filtered_permits = permits
-    
-    if search_term:
-        search_lower = search_term.lower()
-        filtered_permits = [p for p in filtered_permits if 
-                          search_lower in p.operator.lower() or 
-                          search_lower in p.lease_name.lower()]
-    
-    print(f"DEBUG: After filtering: {len(filtered_permits)} permits")
-    
-    if sort_by == 'newest':
-        filtered_permits.sort(key=lambda x: x.created_at, reverse=True)
-    elif sort_by == 'oldest':
-        filtered_permits.sort(key=lambda x: x.created_at)
-    elif sort_by == 'county':
-        filtered_permits.sort(key=lambda x: x.county)
-    elif sort_by == 'operator':
-        filtered_permits.sort(key=lambda x: x.operator)
-    
-    # Get unique counties for dropdown
-    counties = sorted(list(set([p.county for p in permits if p.county])))
-    
-    html = f"""
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1, viewport-fit=cover">
-        <title>Permit Tracker</title>
-        <link rel="manifest" href="/manifest.webmanifest">
-        <meta name="apple-mobile-web-app-capable" content="yes">
-        <meta name="apple-mobile-web-app-status-bar-style" content="black-translucent">
-        <meta name="apple-mobile-web-app-title" content="Permit Tracker">
-        <meta name="mobile-web-app-capable" content="yes">
-        <meta name="theme-color" content="#667eea">
-        <link rel="icon" type="image/x-icon" href="/favicon.ico">
-        <link rel="icon" type="image/png" sizes="512x512" href="/static/icon-512.png">
-        <link rel="icon" type="image/png" sizes="192x192" href="/static/icon-192.png">
-        <link rel="icon" type="image/png" sizes="32x32" href="/static/favicon-32x32.png">
-        <link rel="icon" type="image/png" sizes="16x16" href="/static/favicon-16x16.png">
-        <link rel="apple-touch-icon" href="/static/apple-touch-icon.png">
-        <link rel="apple-touch-icon" sizes="120x120" href="/static/apple-touch-icon-120x120.png">
-        <style>
-            /* Import premium fonts */
-            @import url('https://fonts.googleapis.com/css2?family=SF+Pro+Display:wght@300;400;500;600;700&family=SF+Pro+Text:wght@300;400;500;600&display=swap');
-            
-            :root {{
-                --bg-primary: linear-gradient(135deg, #f8fafc 0%, #e2e8f0 100%);
-                --bg-secondary: rgba(255, 255, 255, 0.9);
-                --bg-card: rgba(255, 255, 255, 0.8);
-                --text-primary: #1a202c;
-                --text-secondary: #64748b;
-                --border-color: rgba(255, 255, 255, 0.3);
-                --shadow: 0 8px 32px rgba(0, 0, 0, 0.1);
-                --shadow-hover: 0 20px 40px rgba(0, 0, 0, 0.15);
-            }}
-            
-            [data-theme="dark"] {{
-                --bg-primary: linear-gradient(135deg, #0f172a 0%, #1e293b 100%);
-                --bg-secondary: rgba(30, 41, 59, 0.9);
-                --bg-card: rgba(30, 41, 59, 0.8);
-                --text-primary: #f1f5f9;
-                --text-secondary: #94a3b8;
-                --border-color: rgba(255, 255, 255, 0.1);
-                --shadow: 0 8px 32px rgba(0, 0, 0, 0.3);
-                --shadow-hover: 0 20px 40px rgba(0, 0, 0, 0.4);
-            }}
-            
-            * {{
-                margin: 0;
-                padding: 0;
-                box-sizing: border-box;
-            }}
-            
-            body {{
-                font-family: 'SF Pro Text', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-                background: var(--bg-primary);
-                color: var(--text-primary);
-                line-height: 1.6;
-                font-size: 16px;
-                font-weight: 400;
-                -webkit-font-smoothing: antialiased;
-                -moz-osx-font-smoothing: grayscale;
-                min-height: 100vh;
-                transition: all 0.3s ease;
-            }}
-            
-            .container {{
-                max-width: 1200px;
-                margin: 0 auto;
-                padding: 2rem;
-            }}
-            
-            .header {{
-                text-align: center;
-                margin-bottom: 3rem;
-                padding: 2rem 0;
-            }}
-            
-            .header h1 {{
-                font-family: 'SF Pro Display', -apple-system, BlinkMacSystemFont, sans-serif;
-                font-size: 3.5rem;
-                font-weight: 700;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-                margin-bottom: 0.5rem;
-                letter-spacing: -0.02em;
-            }}
-            
-            .header p {{
-                font-size: 1.25rem;
-                color: var(--text-secondary);
-                font-weight: 400;
-                letter-spacing: 0.01em;
-            }}
-            
-            .theme-toggle {{
-                position: fixed;
-                top: 2rem;
-                right: 2rem;
-                background: var(--bg-card);
-                backdrop-filter: blur(20px);
-                border: 1px solid var(--border-color);
-                border-radius: 50px;
-                padding: 0.75rem;
-                cursor: pointer;
-                transition: all 0.3s ease;
-                box-shadow: var(--shadow);
-                z-index: 1000;
-            }}
-            
-            .theme-toggle:hover {{
-                transform: scale(1.1);
-                box-shadow: var(--shadow-hover);
-            }}
-            
-            .theme-toggle svg {{
-                width: 24px;
-                height: 24px;
-                color: var(--text-primary);
-            }}
-            
-            .controls {{
-                background: var(--bg-card);
-                backdrop-filter: blur(20px);
-                border-radius: 24px;
-                padding: 2rem;
-                margin-bottom: 2rem;
-                box-shadow: var(--shadow);
-                border: 1px solid var(--border-color);
-            }}
-            
-            .filters-section {{
-                margin: 1.5rem 0;
-                padding: 1.5rem;
-                background: var(--bg-secondary);
-                border-radius: 16px;
-                border: 1px solid var(--border-color);
-            }}
-            
-            .filters-heading {{
-                font-family: 'SF Pro Display', -apple-system, BlinkMacSystemFont, sans-serif;
-                font-size: 1.25rem;
-                font-weight: 600;
-                color: var(--text-primary);
-                margin-bottom: 1rem;
-                letter-spacing: -0.01em;
-            }}
-            
-            .filters-actions {{
-                display: flex;
-                gap: 1rem;
-                justify-content: flex-start;
-            }}
-            
-            .controls-spacer {{
-                height: 20px;
-            }}
-            
-            .export-notify {{
-                display: flex;
-                gap: 1rem;
-                justify-content: flex-start;
-            }}
-            
-            .control-row {{
-                display: flex;
-                gap: 1.5rem;
-                margin-bottom: 1.5rem;
-                align-items: center;
-            }}
-            
-            .control-group {{
-                display: flex;
-                flex-direction: column;
-                gap: 0.5rem;
-            }}
-            
-            .control-group label {{
-                font-size: 0.875rem;
-                font-weight: 500;
-                color: var(--text-secondary);
-                letter-spacing: 0.025em;
-            }}
-            
-            .control-group select,
-            .control-group input {{
-                padding: 0.75rem 1rem;
-                border: 2px solid var(--border-color);
-                border-radius: 12px;
-                font-size: 1rem;
-                font-weight: 400;
-                background: var(--bg-secondary);
-                color: var(--text-primary);
-                transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-                cursor: pointer;
-            }}
-            
-            .control-group input {{
-                cursor: text;
-            }}
-            
-            .control-group select:focus,
-            .control-group input:focus {{
-                outline: none;
-                border-color: #667eea;
-                box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
-            }}
-            
-            .buttons {{
-                display: flex;
-                gap: 1rem;
-                flex-wrap: wrap;
-            }}
-            
-            .btn {{
-                padding: 0.875rem 1.5rem;
-                border: none;
-                border-radius: 12px;
-                font-size: 1rem;
-                font-weight: 500;
-                cursor: pointer;
-                transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-                text-decoration: none;
-                display: inline-flex;
-                align-items: center;
-                gap: 0.5rem;
-                letter-spacing: 0.025em;
-                position: relative;
-                overflow: hidden;
-            }}
-            
-            .btn::before {{
-                content: '';
-                position: absolute;
-                top: 0;
-                left: -100%;
-                width: 100%;
-                height: 100%;
-                background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.2), transparent);
-                transition: left 0.5s;
-            }}
-            
-            .btn:hover::before {{
-                left: 100%;
-            }}
-            
-            .btn-primary {{
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);
-            }}
-            
-            .btn-primary:hover {{
-                transform: translateY(-2px);
-                box-shadow: 0 8px 25px rgba(102, 126, 234, 0.4);
-            }}
-            
-            .btn-success {{
-                background: linear-gradient(135deg, #10b981 0%, #059669 100%);
-                color: white;
-                box-shadow: 0 4px 15px rgba(16, 185, 129, 0.3);
-            }}
-            
-            .btn-success:hover {{
-                transform: translateY(-2px);
-                box-shadow: 0 8px 25px rgba(16, 185, 129, 0.4);
-            }}
-            
-            .btn-info {{
-                background: linear-gradient(135deg, #06b6d4 0%, #0891b2 100%);
-                color: white;
-                box-shadow: 0 4px 15px rgba(6, 182, 212, 0.3);
-            }}
-            
-            .btn-info:hover {{
-                transform: translateY(-2px);
-                box-shadow: 0 8px 25px rgba(6, 182, 212, 0.4);
-            }}
-            
-            .btn-warning {{
-                background: linear-gradient(135deg, #f59e0b 0%, #d97706 100%);
-                color: white;
-                box-shadow: 0 4px 15px rgba(245, 158, 11, 0.3);
-            }}
-            
-            .btn-warning:hover {{
-                transform: translateY(-2px);
-                box-shadow: 0 8px 25px rgba(245, 158, 11, 0.4);
-            }}
-            
-            .status {{
-                background: var(--bg-card);
-                backdrop-filter: blur(20px);
-                border-radius: 24px;
-                padding: 2rem;
-                margin-bottom: 2rem;
-                box-shadow: var(--shadow);
-                border: 1px solid var(--border-color);
-            }}
-            
-            .status h3 {{
-                font-family: 'SF Pro Display', -apple-system, BlinkMacSystemFont, sans-serif;
-                font-size: 1.5rem;
-                font-weight: 600;
-                color: var(--text-primary);
-                margin-bottom: 1.5rem;
-                letter-spacing: -0.01em;
-            }}
-            
-            .status-item {{
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                padding: 1rem 0;
-                border-bottom: 1px solid var(--border-color);
-            }}
-            
-            .status-item:last-child {{
-                border-bottom: none;
-            }}
-            
-            .status-label {{
-                font-size: 1rem;
-                font-weight: 500;
-                color: var(--text-secondary);
-            }}
-            
-            .status-value {{
-                font-size: 1rem;
-                font-weight: 600;
-                color: var(--text-primary);
-            }}
-            
-            #permits-container {{
-                margin-top: 2rem;
-            }}
-            
-            .county-section {{
-                margin-bottom: 3rem;
-            }}
-            
-            .county-header {{
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                margin-bottom: 1.5rem;
-                padding-bottom: 1rem;
-                border-bottom: 2px solid var(--border-color);
-            }}
-            
-            .county-title {{
-                font-family: 'SF Pro Display', -apple-system, BlinkMacSystemFont, sans-serif;
-                font-size: 1.75rem;
-                font-weight: 600;
-                color: var(--text-primary);
-                margin: 0;
-                letter-spacing: -0.01em;
-            }}
-            
-            .county-menu {{
-                display: flex;
-                gap: 0.5rem;
-            }}
-            
-            .permits-grid {{
-                display: grid;
-                grid-template-columns: repeat(auto-fill, minmax(350px, 1fr));
-                gap: 1.5rem;
-            }}
-            
-            .county-empty-state {{
-                text-align: center;
-                padding: 3rem 2rem;
-                color: var(--text-secondary);
-                background: var(--bg-card);
-                backdrop-filter: blur(20px);
-                border-radius: 20px;
-                box-shadow: var(--shadow);
-                border: 1px solid var(--border-color);
-                margin-top: 1rem;
-            }}
-            
-            .county-empty-state h3 {{
-                font-family: 'SF Pro Display', -apple-system, BlinkMacSystemFont, sans-serif;
-                font-size: 1.25rem;
-                font-weight: 600;
-                color: var(--text-primary);
-                margin-bottom: 0.5rem;
-            }}
-            
-            .county-empty-state p {{
-                font-size: 1rem;
-                color: var(--text-secondary);
-            }}
-            
-            .hidden-section {{
-                margin-bottom: 2rem;
-                padding: 1.5rem;
-                background: var(--bg-secondary);
-                border-radius: 12px;
-                border: 1px solid var(--border-color);
-            }}
-            
-            .hidden-section h4 {{
-                font-family: 'SF Pro Display', -apple-system, BlinkMacSystemFont, sans-serif;
-                font-size: 1.25rem;
-                font-weight: 600;
-                color: var(--text-primary);
-                margin-bottom: 1rem;
-            }}
-            
-            .hidden-item {{
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                padding: 0.75rem;
-                margin-bottom: 0.5rem;
-                background: var(--bg-card);
-                border-radius: 8px;
-                border: 1px solid var(--border-color);
-            }}
-            
-            .hidden-item:last-child {{
-                margin-bottom: 0;
-            }}
-            
-            .hidden-item-name {{
-                font-weight: 500;
-                color: var(--text-primary);
-            }}
-            
-            .hidden-item-actions {{
-                display: flex;
-                gap: 0.5rem;
-            }}
-            
-            .permit-card {{
-                background: var(--bg-card);
-                backdrop-filter: blur(20px);
-                border-radius: 20px;
-                padding: 1.5rem;
-                box-shadow: var(--shadow);
-                border: 1px solid var(--border-color);
-                transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-                position: relative;
-                overflow: hidden;
-            }}
-            
-            .permit-card::before {{
-                content: '';
-                position: absolute;
-                top: 0;
-                left: 0;
-                right: 0;
-                height: 4px;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            }}
-            
-            .permit-card:hover {{
-                transform: translateY(-8px) scale(1.02);
-                box-shadow: var(--shadow-hover);
-            }}
-            
-            .permit-header {{
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                margin-bottom: 1rem;
-            }}
-            
-            .permit-county {{
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                padding: 0.5rem 1rem;
-                border-radius: 20px;
-                font-size: 0.875rem;
-                font-weight: 600;
-                text-transform: uppercase;
-                letter-spacing: 0.05em;
-            }}
-            
-            .permit-date {{
-                color: var(--text-secondary);
-                font-size: 0.875rem;
-                font-weight: 500;
-            }}
-            
-            .permit-info h3 {{
-                font-family: 'SF Pro Display', -apple-system, BlinkMacSystemFont, sans-serif;
-                font-size: 1.25rem;
-                font-weight: 600;
-                color: var(--text-primary);
-                margin-bottom: 1rem;
-                letter-spacing: -0.01em;
-            }}
-            
-            .permit-detail {{
-                margin-bottom: 0.75rem;
-                display: flex;
-                align-items: center;
-            }}
-            
-            .permit-detail strong {{
-                min-width: 80px;
-                color: var(--text-secondary);
-                font-size: 0.875rem;
-                font-weight: 500;
-            }}
-            
-            .permit-detail span {{
-                color: var(--text-primary);
-                font-size: 0.875rem;
-                font-weight: 400;
-            }}
-            
-            .permit-actions {{
-                display: flex;
-                gap: 0.75rem;
-                margin-top: 1rem;
-            }}
-            
-            .btn-sm {{
-                padding: 0.5rem 1rem;
-                font-size: 0.875rem;
-            }}
-            
-            .btn-outline-primary {{
-                background: transparent;
-                color: #667eea;
-                border: 2px solid #667eea;
-            }}
-            
-            .btn-outline-primary:hover {{
-                background: #667eea;
-                color: white;
-            }}
-            
-            .btn-outline-danger {{
-                background: transparent;
-                color: #ef4444;
-                border: 2px solid #ef4444;
-            }}
-            
-            .btn-outline-danger:hover {{
-                background: #ef4444;
-                color: white;
-            }}
-            
-            .no-permits {{
-                text-align: center;
-                padding: 4rem 2rem;
-                color: var(--text-secondary);
-                background: var(--bg-card);
-                backdrop-filter: blur(20px);
-                border-radius: 24px;
-                box-shadow: var(--shadow);
-                border: 1px solid var(--border-color);
-            }}
-            
-            .no-permits h3 {{
-                font-family: 'SF Pro Display', -apple-system, BlinkMacSystemFont, sans-serif;
-                font-size: 1.5rem;
-                font-weight: 600;
-                color: var(--text-primary);
-                margin-bottom: 0.5rem;
-            }}
-            
-            .no-permits p {{
-                font-size: 1rem;
-                color: var(--text-secondary);
-            }}
-            
-            /* County Selector Modal */
-            .county-selector {{
-                position: fixed;
-                top: 0;
-                left: 0;
-                width: 100%;
-                height: 100%;
-                background: rgba(0, 0, 0, 0.5);
-                backdrop-filter: blur(10px);
-                display: none;
-                justify-content: center;
-                align-items: center;
-                z-index: 1000;
-                padding: 2rem;
-            }}
-            
-            .county-modal {{
-                background: var(--bg-card);
-                backdrop-filter: blur(20px);
-                border-radius: 24px;
-                padding: 2rem;
-                max-width: 600px;
-                width: 100%;
-                max-height: 80vh;
-                overflow-y: auto;
-                box-shadow: var(--shadow-hover);
-                border: 1px solid var(--border-color);
-            }}
-            
-            .county-modal h3 {{
-                font-family: 'SF Pro Display', -apple-system, BlinkMacSystemFont, sans-serif;
-                font-size: 1.5rem;
-                font-weight: 600;
-                color: var(--text-primary);
-                margin-bottom: 1.5rem;
-                text-align: center;
-                letter-spacing: -0.01em;
-            }}
-            
-            .county-search-container {{
-                margin-bottom: 1.5rem;
-            }}
-            
-            .county-search-input {{
-                width: 100%;
-                padding: 0.875rem 1rem;
-                border: 2px solid var(--border-color);
-                border-radius: 12px;
-                font-size: 1rem;
-                font-weight: 400;
-                background: var(--bg-secondary);
-                color: var(--text-primary);
-                transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-            }}
-            
-            .county-search-input:focus {{
-                outline: none;
-                border-color: #667eea;
-                box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
-            }}
-            
-            .modal-actions {{
-                display: flex;
-                gap: 1rem;
-                margin-bottom: 1.5rem;
-                justify-content: center;
-            }}
-            
-            .county-actions {{
-                display: flex;
-                gap: 1rem;
-                margin-bottom: 1.5rem;
-                justify-content: center;
-            }}
-            
-            .county-grid {{
-                display: grid;
-                grid-template-columns: repeat(auto-fill, minmax(150px, 1fr));
-                gap: 0.75rem;
-                max-height: 300px;
-                overflow-y: auto;
-                padding: 1rem;
-                background: var(--bg-secondary);
-                border-radius: 12px;
-            }}
-            
-            .county-item {{
-                display: flex;
-                align-items: center;
-                gap: 0.5rem;
-                padding: 0.5rem;
-                border-radius: 8px;
-                transition: all 0.2s ease;
-            }}
-            
-            .county-item:hover {{
-                background: rgba(102, 126, 234, 0.1);
-            }}
-            
-            .county-item input[type="checkbox"] {{
-                width: 18px;
-                height: 18px;
-                accent-color: #667eea;
-            }}
-            
-            .county-item label {{
-                font-size: 0.875rem;
-                font-weight: 500;
-                color: var(--text-primary);
-                cursor: pointer;
-                flex: 1;
-            }}
-            
-            /* Responsive Design */
-            @media (max-width: 768px) {{
-                .container {{
-                    padding: 1rem;
-                }}
-                
-                .header h1 {{
-                    font-size: 2.5rem;
-                }}
-                
-                .controls, .status {{
-                    padding: 1.5rem;
-                }}
-                
-                .control-row {{
-                    flex-direction: column;
-                    gap: 1rem;
-                }}
-                
-                .filters-actions {{
-                    flex-direction: column;
-                }}
-                
-                .export-notify {{
-                    flex-direction: column;
-                }}
-                
-                .permits-grid {{
-                    grid-template-columns: 1fr;
-                }}
-                
-                .county-modal {{
-                    margin: 1rem;
-                    max-height: 90vh;
-                }}
-                
-                .county-grid {{
-                    grid-template-columns: repeat(auto-fill, minmax(120px, 1fr));
-                }}
-                
-                .theme-toggle {{
-                    top: 3rem;
-                    right: 1rem;
-                }}
-            }}
-            
-            /* Smooth animations */
-            @keyframes fadeIn {{
-                from {{ opacity: 0; transform: translateY(20px); }}
-                to {{ opacity: 1; transform: translateY(0); }}
-            }}
-            
-            .permit-card {{
-                animation: fadeIn 0.6s cubic-bezier(0.4, 0, 0.2, 1);
-            }}
-            
-            .controls, .status {{
-                animation: fadeIn 0.8s cubic-bezier(0.4, 0, 0.2, 1);
-            }}
-            
-            .header {{
-                animation: fadeIn 1s cubic-bezier(0.4, 0, 0.2, 1);
-            }}
-            
-            /* Mobile Compact Layout */
-            @media (max-width: 430px) {{
-                /* Debug: Add a visible border to confirm CSS is loading */
-                body {{
-                    border: 2px solid red !important;
-                }}
-                
-                /* Typography scale: keep inputs >=16px to avoid iOS zoom */
-                body {{ 
-                    font-size: 15px !important; 
-                    line-height: 1.35 !important; 
-                }}
-                h1 {{ 
-                    font-size: clamp(18px, 5vw, 22px) !important; 
-                    margin: 8px 0 !important; 
-                }}
-                h2 {{ 
-                    font-size: clamp(16px, 4.2vw, 20px) !important; 
-                    margin: 6px 0 !important; 
-                }}
-                h3 {{ 
-                    font-size: clamp(15px, 3.8vw, 18px) !important; 
-                    margin: 6px 0 !important; 
-                }}
-
-                /* Top controls stack: tighten gaps/padding */
-                .controls {{
-                    gap: 8px !important;
-                    padding: 1rem !important;
-                }}
-                .control-row {{ 
-                    margin: 4px 0 !important; 
-                }}
-
-                /* Buttons: smaller text/padding but keep 44px target */
-                .btn, button, [role="button"] {{
-                    font-size: 14px !important;
-                    padding: 8px 12px !important;
-                    min-height: 44px !important;
-                    line-height: 1.1 !important;
-                }}
-
-                /* Inputs/selects: keep font-size >= 16px (no zoom on iOS) */
-                input, select, textarea {{
-                    font-size: 16px !important;
-                    padding: 8px 10px !important;
-                    min-height: 44px !important;
-                }}
-
-                /* Cards: reduce padding, radius, gaps */
-                .permit-card, [data-permit-id] {{
-                    padding: 10px 12px !important;
-                    border-radius: 10px !important;
-                    margin: 8px 0 !important;
-                }}
-                .permit-header {{
-                    gap: 6px !important;
-                    margin-bottom: 0.75rem !important;
-                }}
-
-                /* County sections: tighter header and spacing */
-                .county-header {{
-                    padding: 8px 4px !important;
-                    margin-bottom: 6px !important;
-                }}
-
-                /* Badges/chips smaller */
-                .permit-county {{
-                    padding: 4px 8px !important;
-                    font-size: 12px !important;
-                }}
-
-                /* Header adjustments */
-                .header {{
-                    margin-bottom: 1rem !important;
-                    padding: 0.5rem 0 !important;
-                    margin-top: 3rem !important;
-                }}
-
-                /* Status section adjustments */
-                .status {{
-                    padding: 0.75rem !important;
-                    margin-bottom: 0.75rem !important;
-                }}
-
-                /* Container adjustments */
-                .container {{
-                    padding: 1rem !important;
-                }}
-
-                /* More aggressive spacing reduction */
-                .county-section {{
-                    margin-bottom: 1.5rem !important;
-                }}
-
-                .permit-info h3 {{
-                    margin-bottom: 0.5rem !important;
-                }}
-
-                .permit-detail {{
-                    margin-bottom: 0.5rem !important;
-                }}
-
-                .permit-actions {{
-                    margin-top: 0.75rem !important;
-                    gap: 0.5rem !important;
-                }}
-
-                /* Filters section */
-                .filters-section {{
-                    margin: 1rem 0 !important;
-                    padding: 1rem !important;
-                }}
-
-                .filters-heading {{
-                    margin-bottom: 0.75rem !important;
-                }}
-
-                .filters-actions {{
-                    gap: 0.75rem !important;
-                }}
-
-                .controls-spacer {{
-                    height: 12px !important;
-                }}
-
-                .export-notify {{
-                    gap: 0.75rem !important;
-                }}
-
-                /* Grid adjustments */
-                .permits-grid {{
-                    gap: 0.75rem !important;
-                }}
-
-                /* Theme toggle adjustments */
-                .theme-toggle {{
-                    top: 3rem !important;
-                    right: 1rem !important;
-                    padding: 0.5rem !important;
-                }}
-
-                /* Avoid accidental horizontal scroll */
-                body {{ 
-                    overflow-x: hidden !important; 
-                }}
-            }}
-
-            /* Ultra small devices */
-            @media (max-width: 360px) {{
-                body {{ 
-                    font-size: 14px !important; 
-                }}
-                .btn, button {{ 
-                    padding: 8px 10px !important; 
-                }}
-                .permit-card, [data-permit-id] {{ 
-                    padding: 8px 10px !important; 
-                }}
-                .controls {{
-                    padding: 0.75rem !important;
-                }}
-                .header {{
-                    margin-bottom: 1rem !important;
-                    padding: 0.5rem 0 !important;
-                    margin-top: 3rem !important;
-                }}
-                .container {{
-                    padding: 0.75rem !important;
-                }}
-            }}
-        </style>
-    </head>
-    <body>
-        <!-- Theme Toggle Button -->
-        <div class="theme-toggle" onclick="toggleTheme()">
-            <svg id="theme-icon" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
-                <circle cx="12" cy="12" r="5"/>
-                <path d="M12 1v2M12 21v2M4.22 4.22l1.42 1.42M18.36 18.36l1.42 1.42M1 12h2M21 12h2M4.22 19.78l1.42-1.42M18.36 5.64l1.42-1.42"/>
-            </svg>
+    operator = args.get('operator', '').strip()
+    if operator:
+        query = query.filter(Permit.operator.ilike(_contains_pattern(operator), escape='\\'))
+    
+    date_from = _parse_date_arg(args, 'date_from')
+    if date_from:
+        query = query.filter(Permit.date_issued >= date_from)
+    date_to = _parse_date_arg(args, 'date_to')
+    if date_to:
+        query = query.filter(Permit.date_issued <= date_to)
+    
+    since = _parse_datetime_arg(args, 'since')
+    if since:
+        query = query.filter(Permit.created_at > since)
+    
+    return query
+
+def _parse_fields(value):
+    """Columns requested with ?fields=, in PERMIT_API_FIELDS order; all of them by default"""
+    if not value:
+        return PERMIT_API_FIELDS
+    requested = {field.strip() for field in value.split(',') if field.strip()}
+    unknown = requested - set(PERMIT_API_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(field for field in PERMIT_API_FIELDS if field in requested)
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+def encode_permit_cursor(created_at, permit_id):
+    return f"{created_at.isoformat()},{permit_id}"
+
+def permit_keyset_filter(position, ascending=False):
+    """Rows after (created_at, id) in the given direction.
+    
+    Spelled out rather than as a row-value comparison so the datetime is bound
+    through the column type (SQLite compares stored timestamp strings).
+    """
+    created_at, permit_id = position
+    if ascending:
+        return db.or_(Permit.created_at > created_at,
+                      db.and_(Permit.created_at == created_at, Permit.id > permit_id))
+    return db.or_(Permit.created_at < created_at,
+                  db.and_(Permit.created_at == created_at, Permit.id < permit_id))
+
+def decode_permit_cursor(cursor):
+    try:
+        created_at, permit_id = cursor.rsplit(',', 1)
+        return datetime.fromisoformat(created_at), int(permit_id)
+    except ValueError:
+        raise ValueError("after must be a cursor of the form <created_at>,<id>")
+
+# Cookies identifying the device's saved view; the version changes whenever the view does
+DEVICE_VIEW_COOKIE = 'device_id'
+DEVICE_VIEW_VERSION_COOKIE = 'view_version'
+DEVICE_VIEW_COOKIE_MAX_AGE = 5 * 365 * 24 * 3600
+
+def device_view_args(prefs):
+    """filter_permits() arguments for a device's view filter and dismissals"""
+    args = MultiDict()
+    for county in prefs.get('viewFilterCounties', []):
+        args.add('county', county)
+    for county in prefs.get('dismissedCountySet', []):
+        args.add('exclude_county', county)
+    for permit_id in prefs.get('dismissedPermitSet', []):
+        if str(permit_id).isdigit():
+            args.add('exclude_id', str(permit_id))
+    return args
+
+def requesting_device_view():
+    """Saved view prefs of the device making the request, or None if it has not saved any"""
+    device_id = request.cookies.get(DEVICE_VIEW_COOKIE)
+    if not device_id:
+        return None
+    view = DeviceView.query.filter_by(device_id=device_id).first()
+    if view is None:
+        return None
+    try:
+        return json.loads(view.prefs_json or '{}')
+    except ValueError:
+        return {}
+
+def _device_view_fingerprint():
+    return (request.cookies.get(DEVICE_VIEW_COOKIE), request.cookies.get(DEVICE_VIEW_VERSION_COOKIE))
+
+def _page_url(page):
+    """Link to another page of the index, keeping the current filters"""
+    args = request.args.to_dict()
+    args['page'] = page
+    if page == 1:
+        args.pop('page')
+    return '/?' + urlencode(args) if args else '/'
+
+# Static shell of the index page lives in static/app.css and static/app.js. Their URLs
+# carry a hash of the file contents, so browsers can cache them until the next deploy
+def _asset_version(filename):
+    with open(os.path.join(app.static_folder, filename), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+STATIC_ASSET_VERSIONS = {filename: _asset_version(filename) for filename in ('app.css', 'app.js')}
+
+def static_asset_url(filename):
+    return url_for('static', filename=filename, v=STATIC_ASSET_VERSIONS[filename])
+
+# Compiled once at import; autoescaped since they are not loaded from .html files.
+# The head needs no queries, so a streamed page can send it before the body's context is built.
+INDEX_HEAD_TEMPLATE = app.jinja_env.from_string("""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1, viewport-fit=cover">
+    <title>Permit Tracker</title>
+    <link rel="manifest" href="/manifest.webmanifest">
+    <meta name="apple-mobile-web-app-capable" content="yes">
+    <meta name="apple-mobile-web-app-status-bar-style" content="black-translucent">
+    <meta name="apple-mobile-web-app-title" content="Permit Tracker">
+    <meta name="mobile-web-app-capable" content="yes">
+    <meta name="theme-color" content="#667eea">
+    <link rel="icon" type="image/x-icon" href="/favicon.ico">
+    <link rel="icon" type="image/png" sizes="512x512" href="/static/icon-512.png">
+    <link rel="icon" type="image/png" sizes="192x192" href="/static/icon-192.png">
+    <link rel="icon" type="image/png" sizes="32x32" href="/static/favicon-32x32.png">
+    <link rel="icon" type="image/png" sizes="16x16" href="/static/favicon-16x16.png">
+    <link rel="apple-touch-icon" href="/static/apple-touch-icon.png">
+    <link rel="apple-touch-icon" sizes="120x120" href="/static/apple-touch-icon-120x120.png">
+    <link rel="stylesheet" href="{{ css_url }}">
+</head>
+""")
+
+INDEX_TEMPLATE = app.jinja_env.from_string("""<body>
+    <!-- Theme Toggle Button -->
+    <div class="theme-toggle" onclick="toggleTheme()">
+        <svg id="theme-icon" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
+            <circle cx="12" cy="12" r="5"/>
+            <path d="M12 1v2M12 21v2M4.22 4.22l1.42 1.42M18.36 18.36l1.42 1.42M1 12h2M21 12h2M4.22 19.78l1.42-1.42M18.36 5.64l1.42-1.42"/>
+        </svg>
+    </div>
+
+    <div class="container">
+        <div class="header">
+            <h1>Permit Tracker</h1>
         </div>
-        
-        <div class="container">
-            <div class="header">
-                <h1>Permit Tracker</h1>
-            </div>
-            
-            <div class="controls">
-                <!-- 1) Sort By -->
-                <div class="control-row">
-                    <div class="control-group">
-                        <label for="sort">Sort By:</label>
-                        <select id="sort" name="sort">
-                            <option value="newest" {"selected" if sort_by == "newest" else ""}>Most Recent</option>
-                            <option value="oldest" {"selected" if sort_by == "oldest" else ""}>Oldest First</option>
-                            <option value="county" {"selected" if sort_by == "county" else ""}>County</option>
-                            <option value="operator" {"selected" if sort_by == "operator" else ""}>Operator</option>
-                        </select>
-                    </div>
+
+        <div class="controls">
+            <!-- 1) Sort By -->
+            <div class="control-row">
+                <div class="control-group">
+                    <label for="sort">Sort By:</label>
+                    <select id="sort" name="sort">
+                        <option value="newest" {{ 'selected' if sort_by == 'newest' }}>Most Recent</option>
+                        <option value="oldest" {{ 'selected' if sort_by == 'oldest' }}>Oldest First</option>
+                        <option value="county" {{ 'selected' if sort_by == 'county' }}>County</option>
+                        <option value="operator" {{ 'selected' if sort_by == 'operator' }}>Operator</option>
+                    </select>
                 </div>
-                
-                <!-- 2) Counties to Monitor (was Select Counties) -->
+            </div>
+
+            <!-- 2) Counties to Monitor (was Select Counties) -->
+            <div class="control-row">
+                <button class="btn btn-info" onclick="openCountySelector()">
+                    📍 Counties to Monitor
+                </button>
+            </div>
+
+            <!-- 3) Update Permits -->
+            <div class="control-row">
+                <button class="btn btn-success" onclick="startScraping()">
+                    🔄 Update Permits
+                </button>
+            </div>
+
+            <!-- 4) Filters section -->
+            <section class="filters-section">
+                <h2 class="filters-heading">Filters</h2>
+
+                <!-- 5) Filter Counties (was View Counties) -->
                 <div class="control-row">
-                    <button class="btn btn-info" onclick="openCountySelector()">
-                        📍 Counties to Monitor
+                    <button class="btn btn-outline-info" onclick="openViewCountiesSelector()">
+                        👁️ Filter Counties
                     </button>
                 </div>
-                
-                <!-- 3) Update Permits -->
+
+                <!-- 6) Search with label above input -->
                 <div class="control-row">
-                    <button class="btn btn-success" onclick="startScraping()">
-                        🔄 Update Permits
-                    </button>
-                </div>
-                
-                <!-- 4) Filters section -->
-                <section class="filters-section">
-                    <h2 class="filters-heading">Filters</h2>
-                    
-                    <!-- 5) Filter Counties (was View Counties) -->
-                    <div class="control-row">
-                        <button class="btn btn-outline-info" onclick="openViewCountiesSelector()">
-                            👁️ Filter Counties
-                        </button>
-                    </div>
-                    
-                    <!-- 6) Search with label above input -->
-                    <div class="control-row">
-                        <div class="control-group">
-                            <label for="search">Search:</label>
-                            <input type="text" id="search" name="search" placeholder="Search operator or lease name..." value="{search_term}">
-                        </div>
-                    </div>
-                    
-                    <!-- 7) Apply / Clear under search -->
-                    <div class="control-row filters-actions">
-                        <button class="btn btn-primary" onclick="applyFilters()">
-                            🔍 Apply Filters
-                        </button>
-                        <button class="btn btn-outline-primary" onclick="clearFilters()">
-                            🗑️ Clear Filters
-                        </button>
+                    <div class="control-group">
+                        <label for="search">Search:</label>
+                        <input type="text" id="search" name="search" placeholder="Search operator or lease name..." value="{{ search_term }}">
                     </div>
-                </section>
-                
-                <!-- 8) Spacer then Export/Notifications -->
-                <div class="controls-spacer"></div>
-                <div class="control-row export-notify">
-                    <button class="btn btn-warning" onclick="exportCSV()">
-                        📊 Export CSV
-                    </button>
-                    <button class="btn btn-info" onclick="toggleNotifications()" id="notificationBtn">
-                        🔔 Enable Notifications
+                </div>
+
+                <!-- 7) Apply / Clear under search -->
+                <div class="control-row filters-actions">
+                    <button class="btn btn-primary" onclick="applyFilters()">
+                        🔍 Apply Filters
                     </button>
-                    <button class="btn btn-outline-secondary" onclick="sendTestNotification()" id="testNotificationBtn" style="display: none;">
-                        🧪 Test Notification
+                    <button class="btn btn-outline-primary" onclick="clearFilters()">
+                        🗑️ Clear Filters
                     </button>
                 </div>
+            </section>
+
+            <!-- 8) Spacer then Export/Notifications -->
+            <div class="controls-spacer"></div>
+            <div class="control-row export-notify">
+                <button class="btn btn-warning" onclick="exportCSV()">
+                    📊 Export CSV
+                </button>
+                <button class="btn btn-info" onclick="toggleNotifications()" id="notificationBtn">
+                    🔔 Enable Notifications
+                </button>
+                <button class="btn btn-outline-secondary" onclick="sendTestNotification()" id="testNotificationBtn" style="display: none;">
+                    🧪 Test Notification
+                </button>
             </div>
-            
-            <div class="status">
-                <h3>📊 Status</h3>
-                <div class="status-item">
-                    <span class="status-label">Update Status:</span>
-                    <span class="status-value" id="scraping-status">
-                        {scraping_status['is_running'] and 'Updating...' or 'Completed'}
-                    </span>
-                </div>
-                <div class="status-item">
-                    <span class="status-label">Last Run:</span>
-                    <span class="status-value" id="last-run">
-                        {scraping_status['last_run'].strftime('%m/%d/%Y %I:%M:%S %p %Z') if scraping_status['last_run'] else 'Never'}
-                    </span>
-                </div>
-                <div class="status-item">
-                    <span class="status-label">Last Count:</span>
-                    <span class="status-value" id="last-count">
-                        {scraping_status['last_count']} permits
-                    </span>
-                </div>
-                <div class="status-item">
-                    <span class="status-label">Monitoring:</span>
-                    <span class="status-value" id="monitoring-count">
-                        <span id="monitoring-count-text">Loading...</span>
-                    </span>
-                </div>
-                <div class="status-item">
-                    <span class="status-label">Total Permits:</span>
-                    <span class="status-value">
-                        {len(filtered_permits)} permits
-                    </span>
-                </div>
-                <div class="status-item">
-                    <span class="status-label">Manage Hidden:</span>
-                    <span class="status-value">
-                        <a href="#" onclick="openManageHidden()" style="color: #667eea; text-decoration: none;">Restore dismissed items</a>
-                    </span>
-                </div>
+        </div>
+
+        <div class="status">
+            <h3>📊 Status</h3>
+            <div class="status-item">
+                <span class="status-label">Update Status:</span>
+                <span class="status-value" id="scraping-status">
+                    {{ 'Updating...' if scraping_status['is_running'] else 'Completed' }}
+                </span>
             </div>
-            
-            <div id="permits-container">
-                {''.join([
-                    f'''
-                    <div class="county-section" data-county="{county}">
-                        <div class="county-header">
-                            <h2 class="county-title">{county}</h2>
-                            <div class="county-menu">
-                                <button class="btn btn-outline-secondary btn-sm" onclick="dismissCounty('{county}')">
-                                    ⋯ Dismiss County
-                                </button>
-                            </div>
+            <div class="status-item">
+                <span class="status-label">Last Run:</span>
+                <span class="status-value" id="last-run">
+                    {{ scraping_status['last_run'].strftime('%m/%d/%Y %I:%M:%S %p %Z') if scraping_status['last_run'] else 'Never' }}
+                </span>
+            </div>
+            <div class="status-item">
+                <span class="status-label">Last Count:</span>
+                <span class="status-value" id="last-count">
+                    {{ scraping_status['last_count'] }} permits
+                </span>
+            </div>
+            <div class="status-item">
+                <span class="status-label">Monitoring:</span>
+                <span class="status-value" id="monitoring-count">
+                    <span id="monitoring-count-text">Loading...</span>
+                </span>
+            </div>
+            <div class="status-item">
+                <span class="status-label">Total Permits:</span>
+                <span class="status-value" id="total-permits" data-count="{{ total_permits }}">
+                    {{ total_permits }} permits
+                </span>
+            </div>
+            <div class="status-item">
+                <span class="status-label">Manage Hidden:</span>
+                <span class="status-value">
+                    <a href="#" onclick="openManageHidden()" style="color: #667eea; text-decoration: none;">Restore dismissed items</a>
+                </span>
+            </div>
+        </div>
+
+        <div id="permits-container" data-version="{{ changes_version }}" data-live="{{ 'true' if live else 'false' }}" data-view-synced="{{ 'true' if view_synced else 'false' }}">
+            {% for county, county_permits in permit_groups %}
+                <div class="county-section" data-county="{{ county }}">
+                    <div class="county-header">
+                        <h2 class="county-title">{{ county }}</h2>
+                        <div class="county-menu">
+                            <button class="btn btn-outline-secondary btn-sm" onclick="dismissCounty('{{ county }}')">
+                                ⋯ Dismiss County
+                            </button>
                         </div>
-                        <div class="permits-grid">
-                            {''.join([
-                                f'''
-                                <div class="permit-card" data-permit-id="{permit.id}">
-                                    <div class="permit-header">
-                                        <span class="permit-county">{permit.county}</span>
-                                        <span class="permit-date">{permit.date_issued.strftime('%m/%d/%Y')}</span>
+                    </div>
+                    <div class="permits-grid">
+                        {% for permit in county_permits %}
+                            <div class="permit-card" data-permit-id="{{ permit.id }}">
+                                <div class="permit-header">
+                                    <span class="permit-county">{{ permit.county }}</span>
+                                    <span class="permit-date">{{ permit.date_issued.strftime('%m/%d/%Y') }}</span>
+                                </div>
+                                <div class="permit-info">
+                                    <h3 class="truncate-2">{{ permit.lease_name }}</h3>
+                                    <div class="permit-detail">
+                                        <strong>Operator:</strong>
+                                        <span class="truncate-1">{{ permit.operator }}</span>
                                     </div>
-                                    <div class="permit-info">
-                                        <h3 class="truncate-2">{permit.lease_name}</h3>
-                                        <div class="permit-detail">
-                                            <strong>Operator:</strong>
-                                            <span class="truncate-1">{permit.operator}</span>
-                                        </div>
-                                        <div class="permit-detail">
-                                            <strong>Well #:</strong>
-                                            <span>{permit.well_number}</span>
-                                        </div>
-                                        <div class="permit-detail">
-                                            <strong>API #:</strong>
-                                            <span>{permit.api_number}</span>
-                                        </div>
+                                    <div class="permit-detail">
+                                        <strong>Well #:</strong>
+                                        <span>{{ permit.well_number }}</span>
                                     </div>
-                                    <div class="permit-actions">
-                                        <a href="{permit.rrc_link}" target="_blank" class="btn btn-outline-primary btn-sm">
-                                            🔗 Open Permit
-                                        </a>
-                                        <button class="btn btn-outline-danger btn-sm" onclick="dismissPermit({permit.id})">
-                                            ❌ Dismiss
-                                        </button>
+                                    <div class="permit-detail">
+                                        <strong>API #:</strong>
+                                        <span>{{ permit.api_number }}</span>
                                     </div>
                                 </div>
-                                ''' for permit in [p for p in filtered_permits if p.county == county]
-                            ])}
-                        </div>
-                        <div class="county-empty-state" style="display: none;">
-                            <h3>📋 No new permits</h3>
-                            <p>No new permits in {county}.</p>
-                        </div>
-                    </div>
-                    ''' for county in sorted(set(p.county for p in filtered_permits))
-                ])}
-            </div>
-            
-            <!-- County Selector Modal -->
-            <div id="county-selector" class="county-selector">
-                <div class="county-modal">
-                    <h3>Counties to Monitor</h3>
-                    <div class="county-search-container">
-                        <input type="text" id="countySearch" class="county-search-input" placeholder="Search counties...">
-                    </div>
-                    <div class="county-actions">
-                        <button class="btn btn-outline-primary btn-sm" onclick="selectAll()">Select All</button>
-                        <button class="btn btn-outline-secondary btn-sm" onclick="deselectAll()">Deselect All</button>
+                                <div class="permit-actions">
+                                    <a href="{{ permit.rrc_link }}" target="_blank" class="btn btn-outline-primary btn-sm">
+                                        🔗 Open Permit
+                                    </a>
+                                    <button class="btn btn-outline-danger btn-sm" onclick="dismissPermit({{ permit.id }})">
+                                        ❌ Dismiss
+                                    </button>
+                                </div>
+                            </div>
+                        {% endfor %}
                     </div>
-                    <div class="county-grid">
-                        {''.join([f'''
-                        <div class="county-item" data-county="{county}">
-                            <input type="checkbox" id="county_{county}" value="{county}">
-                            <label for="county_{county}">{county}</label>
-                        </div>
-                        ''' for county in sorted(TEXAS_COUNTIES)])}
+                    <div class="county-empty-state" style="display: none;">
+                        <h3>📋 No new permits</h3>
+                        <p>No new permits in {{ county }}.</p>
                     </div>
-                    <div class="modal-actions">
-                        <button class="btn btn-primary" onclick="saveSelectedCounties()">Save Selection</button>
-                        <button class="btn btn-outline-secondary" onclick="closeCountySelector()">Cancel</button>
+                </div>
+            {% endfor %}
+        </div>
+        {% if page_count > 1 %}
+        <nav class="pager">
+            {% if page > 1 %}<a class="btn btn-outline-primary btn-sm" href="{{ page_url(page - 1) }}">← Previous</a>{% endif %}
+            <span class="pager-status">Page {{ page }} of {{ page_count }}</span>
+            {% if page < page_count %}<a class="btn btn-outline-primary btn-sm" href="{{ page_url(page + 1) }}">Next →</a>{% endif %}
+        </nav>
+        {% endif %}
+
+        <!-- County Selector Modal -->
+        <div id="county-selector" class="county-selector">
+            <div class="county-modal">
+                <h3>Counties to Monitor</h3>
+                <div class="county-search-container">
+                    <input type="text" id="countySearch" class="county-search-input" placeholder="Search counties...">
+                </div>
+                <div class="county-actions">
+                    <button class="btn btn-outline-primary btn-sm" onclick="selectAll()">Select All</button>
+                    <button class="btn btn-outline-secondary btn-sm" onclick="deselectAll()">Deselect All</button>
+                </div>
+                <div class="county-grid">
+                    {% for county in texas_counties %}
+                    <div class="county-item" data-county="{{ county }}">
+                        <input type="checkbox" id="county_{{ county }}" value="{{ county }}">
+                        <label for="county_{{ county }}">{{ county }}</label>
                     </div>
+                    {% endfor %}
+                </div>
+                <div class="modal-actions">
+                    <button class="btn btn-primary" onclick="saveSelectedCounties()">Save Selection</button>
+                    <button class="btn btn-outline-secondary" onclick="closeCountySelector()">Cancel</button>
                 </div>
             </div>
-            
-            <!-- View Counties Selector Modal -->
-            <div id="view-counties-selector" class="county-selector">
-                <div class="county-modal">
-                    <h3>Filter Counties</h3>
-                    <div class="county-search-container">
-                        <input type="text" id="viewCountySearch" class="county-search-input" placeholder="Search counties...">
-                    </div>
-                    <div class="county-actions">
-                        <button class="btn btn-outline-primary btn-sm" onclick="selectAllView()">Select All</button>
-                        <button class="btn btn-outline-secondary btn-sm" onclick="deselectAllView()">Deselect All</button>
-                        <button class="btn btn-outline-warning btn-sm" onclick="clearViewFilter()">Clear Filter</button>
-                    </div>
-                    <div class="county-grid">
-                        {''.join([f'''
-                        <div class="county-item" data-county="{county}">
-                            <input type="checkbox" id="view_county_{county}" value="{county}">
-                            <label for="view_county_{county}">{county}</label>
-                        </div>
-                        ''' for county in sorted(set(p.county for p in filtered_permits))])}
-                    </div>
-                    <div class="modal-actions">
-                        <button class="btn btn-primary" onclick="saveViewCounties()">Apply Filter</button>
-                        <button class="btn btn-outline-secondary" onclick="closeViewCountiesSelector()">Cancel</button>
+        </div>
+
+        <!-- View Counties Selector Modal -->
+        <div id="view-counties-selector" class="county-selector">
+            <div class="county-modal">
+                <h3>Filter Counties</h3>
+                <div class="county-search-container">
+                    <input type="text" id="viewCountySearch" class="county-search-input" placeholder="Search counties...">
+                </div>
+                <div class="county-actions">
+                    <button class="btn btn-outline-primary btn-sm" onclick="selectAllView()">Select All</button>
+                    <button class="btn btn-outline-secondary btn-sm" onclick="deselectAllView()">Deselect All</button>
+                    <button class="btn btn-outline-warning btn-sm" onclick="clearViewFilter()">Clear Filter</button>
+                </div>
+                <div class="county-grid">
+                    {% for county in counties %}
+                    <div class="county-item" data-county="{{ county }}">
+                        <input type="checkbox" id="view_county_{{ county }}" value="{{ county }}">
+                        <label for="view_county_{{ county }}">{{ county }}</label>
                     </div>
+                    {% endfor %}
+                </div>
+                <div class="modal-actions">
+                    <button class="btn btn-primary" onclick="saveViewCounties()">Apply Filter</button>
+                    <button class="btn btn-outline-secondary" onclick="closeViewCountiesSelector()">Cancel</button>
                 </div>
             </div>
-            
-            <!-- Manage Hidden Modal -->
-            <div id="manage-hidden-modal" class="county-selector">
-                <div class="county-modal">
-                    <h3>Manage Hidden Items</h3>
-                    <div class="hidden-section">
-                        <h4>Dismissed Counties</h4>
-                        <div id="dismissed-counties-list"></div>
-                    </div>
-                    <div class="hidden-section">
-                        <h4>Dismissed Permits</h4>
-                        <div id="dismissed-permits-list"></div>
-                    </div>
-                    <div class="modal-actions">
-                        <button class="btn btn-success" onclick="restoreAllDismissed()">Restore All</button>
-                        <button class="btn btn-outline-secondary" onclick="closeManageHidden()">Close</button>
-                    </div>
+        </div>
+
+        <!-- Manage Hidden Modal -->
+        <div id="manage-hidden-modal" class="county-selector">
+            <div class="county-modal">
+                <h3>Manage Hidden Items</h3>
+                <div class="hidden-section">
+                    <h4>Dismissed Counties</h4>
+                    <div id="dismissed-counties-list"></div>
+                </div>
+                <div class="hidden-section">
+                    <h4>Dismissed Permits</h4>
+                    <div id="dismissed-permits-list"></div>
+                </div>
+                <div class="modal-actions">
+                    <button class="btn btn-success" onclick="restoreAllDismissed()">Restore All</button>
+                    <button class="btn btn-outline-secondary" onclick="closeManageHidden()">Close</button>
                 </div>
             </div>
-            
-            <script>
-            // Utility functions for localStorage
-            function getSet(key) {{
-                try {{
-                    const data = localStorage.getItem(key);
-                    return data ? new Set(JSON.parse(data)) : new Set();
-                }} catch {{
-                    return new Set();
-                }}
-            }}
-            
-            function saveSet(key, set) {{
-                try {{
-                    localStorage.setItem(key, JSON.stringify(Array.from(set)));
-                }} catch (e) {{
-                    console.error('Error saving to localStorage:', e);
-                }}
-            }}
-            
-            function toggleArrayValue(key, value) {{
-                const set = getSet(key);
-                if (set.has(value)) {{
-                    set.delete(value);
-                }} else {{
-                    set.add(value);
-                }}
-                saveSet(key, set);
-            }}
-            
-            function initializeStorage() {{
-                // Initialize default values if not set
-                if (!localStorage.getItem('monitorCounties')) {{
-                    saveSet('monitorCounties', new Set());
-                }}
-                if (!localStorage.getItem('dismissedCountySet')) {{
-                    saveSet('dismissedCountySet', new Set());
-                }}
-                if (!localStorage.getItem('dismissedPermitSet')) {{
-                    saveSet('dismissedPermitSet', new Set());
-                }}
-                if (!localStorage.getItem('viewFilterCounties')) {{
-                    saveSet('viewFilterCounties', new Set());
-                }}
-            }}
-            
-            function applyFilters() {{
-                const search = document.getElementById('search').value;
-                const sort = document.getElementById('sort').value;
-                const url = new URL(window.location);
-                url.searchParams.set('search', search);
-                url.searchParams.set('sort', sort);
-                window.location.href = url.toString();
-            }}
-            
-            function clearFilters() {{
-                document.getElementById('search').value = '';
-                document.getElementById('sort').value = 'newest';
-                applyFilters();
-            }}
-            
-            function openViewCountiesSelector() {{
-                document.getElementById('view-counties-selector').style.display = 'flex';
-                loadViewCounties();
-            }}
-            
-            function closeViewCountiesSelector() {{
-                document.getElementById('view-counties-selector').style.display = 'none';
-            }}
-            
-            function loadViewCounties() {{
-                const viewCounties = getSet('viewFilterCounties');
-                const checkboxes = document.querySelectorAll('#view-counties-selector input[type="checkbox"]');
-                checkboxes.forEach(checkbox => {{
-                    checkbox.checked = viewCounties.has(checkbox.value);
-                }});
-            }}
-            
-            function saveViewCounties() {{
-                const checkboxes = document.querySelectorAll('#view-counties-selector input[type="checkbox"]:checked');
-                const selectedCounties = Array.from(checkboxes).map(cb => cb.value);
-                saveSet('viewFilterCounties', new Set(selectedCounties));
-                applyViewFilters();
-                closeViewCountiesSelector();
-            }}
-            
-            function selectAllView() {{
-                const checkboxes = document.querySelectorAll('#view-counties-selector input[type="checkbox"]');
-                checkboxes.forEach(checkbox => checkbox.checked = true);
-            }}
-            
-            function deselectAllView() {{
-                const checkboxes = document.querySelectorAll('#view-counties-selector input[type="checkbox"]');
-                checkboxes.forEach(checkbox => checkbox.checked = false);
-            }}
-            
-            function clearViewFilter() {{
-                saveSet('viewFilterCounties', new Set());
-                applyViewFilters();
-                closeViewCountiesSelector();
-            }}
-            
-            function applyViewFilters() {{
-                const viewCounties = getSet('viewFilterCounties');
-                const dismissedCounties = getSet('dismissedCountySet');
-                const dismissedPermits = getSet('dismissedPermitSet');
-                
-                // Hide/show county sections
-                document.querySelectorAll('.county-section').forEach(section => {{
-                    const county = section.getAttribute('data-county');
-                    const isDismissed = dismissedCounties.has(county);
-                    const isFilteredOut = viewCounties.size > 0 && !viewCounties.has(county);
-                    
-                    if (isDismissed || isFilteredOut) {{
-                        section.style.display = 'none';
-                    }} else {{
-                        section.style.display = 'block';
-                    }}
-                }});
-                
-                // Hide dismissed permits
-                document.querySelectorAll('.permit-card').forEach(card => {{
-                    const permitId = card.getAttribute('data-permit-id');
-                    if (dismissedPermits.has(permitId)) {{
-                        card.style.display = 'none';
-                    }} else {{
-                        card.style.display = 'block';
-                    }}
-                }});
-                
-                // Show empty states for counties with no visible permits
-                document.querySelectorAll('.county-section').forEach(section => {{
-                    if (section.style.display !== 'none') {{
-                        const visiblePermits = section.querySelectorAll('.permit-card:not([style*="display: none"])');
-                        const emptyState = section.querySelector('.county-empty-state');
-                        
-                        if (visiblePermits.length === 0) {{
-                            emptyState.style.display = 'block';
-                        }} else {{
-                            emptyState.style.display = 'none';
-                        }}
-                    }}
-                }});
-            }}
-            
-            // Dismissal functionality
-            function dismissPermit(permitId) {{
-                console.log('Dismissing permit:', permitId);
-                if (confirm('Are you sure you want to dismiss this permit?')) {{
-                    toggleArrayValue('dismissedPermitSet', permitId.toString());
-                    document.querySelector(`[data-permit-id="${{permitId}}"]`).style.display = 'none';
-                    applyViewFilters();
-                    console.log('Permit dismissed, current dismissed permits:', getSet('dismissedPermitSet'));
-                    
-                    // Sync preferences with server
-                    updatePreferencesOnServer();
-                }}
-            }}
-            
-            function dismissCounty(county) {{
-                console.log('Dismissing county:', county);
-                if (confirm(`Are you sure you want to dismiss all permits in ${{county}} county?`)) {{
-                    toggleArrayValue('dismissedCountySet', county);
-                    document.querySelector(`[data-county="${{county}}"]`).style.display = 'none';
-                    console.log('County dismissed, current dismissed counties:', getSet('dismissedCountySet'));
-                    
-                    // Sync preferences with server
-                    updatePreferencesOnServer();
-                }}
-            }}
-            
-            // Manage Hidden functionality
-            function openManageHidden() {{
-                document.getElementById('manage-hidden-modal').style.display = 'flex';
-                loadHiddenItems();
-            }}
-            
-            function closeManageHidden() {{
-                document.getElementById('manage-hidden-modal').style.display = 'none';
-            }}
-            
-            function loadHiddenItems() {{
-                const dismissedCounties = getSet('dismissedCountySet');
-                const dismissedPermits = getSet('dismissedPermitSet');
-                
-                console.log('Dismissed counties:', dismissedCounties);
-                console.log('Dismissed permits:', dismissedPermits);
-                
-                // Load dismissed counties
-                const countiesList = document.getElementById('dismissed-counties-list');
-                countiesList.innerHTML = '';
-                
-                if (dismissedCounties.size === 0) {{
-                    countiesList.innerHTML = '<p style="color: var(--text-secondary); font-style: italic;">No dismissed counties</p>';
-                }} else {{
-                    dismissedCounties.forEach(county => {{
-                        const item = document.createElement('div');
-                        item.className = 'hidden-item';
-                        item.innerHTML = `
-                            <span class="hidden-item-name">${{county}}</span>
-                            <div class="hidden-item-actions">
-                                <button class="btn btn-outline-success btn-sm" onclick="restoreCounty('${{county}}')">Restore</button>
-                            </div>
-                        `;
-                        countiesList.appendChild(item);
-                    }});
-                }}
-                
-                // Load dismissed permits
-                const permitsList = document.getElementById('dismissed-permits-list');
-                permitsList.innerHTML = '';
-                
-                if (dismissedPermits.size === 0) {{
-                    permitsList.innerHTML = '<p style="color: var(--text-secondary); font-style: italic;">No dismissed permits</p>';
-                }} else {{
-                    permitsList.innerHTML = `<p style="color: var(--text-secondary); margin-bottom: 1rem;">${{dismissedPermits.size}} dismissed permits</p>`;
-                    permitsList.innerHTML += `<button class="btn btn-outline-success btn-sm" onclick="restoreAllPermits()">Restore All Permits</button>`;
-                }}
-            }}
-            
-            function restoreCounty(county) {{
-                const dismissedCounties = getSet('dismissedCountySet');
-                dismissedCounties.delete(county);
-                saveSet('dismissedCountySet', dismissedCounties);
-                loadHiddenItems();
-                applyViewFilters();
-            }}
-            
-            function restoreAllPermits() {{
-                if (confirm('Are you sure you want to restore all dismissed permits?')) {{
-                    saveSet('dismissedPermitSet', new Set());
-                    loadHiddenItems();
-                    applyViewFilters();
-                }}
-            }}
-            
-            function restoreAllDismissed() {{
-                if (confirm('Are you sure you want to restore all dismissed items?')) {{
-                    saveSet('dismissedCountySet', new Set());
-                    saveSet('dismissedPermitSet', new Set());
-                    loadHiddenItems();
-                    applyViewFilters();
-                }}
-            }}
-            
-            function startScraping() {{
-                if (document.getElementById('scraping-status').textContent === 'Updating...') {{
-                    alert('Update is already in progress!');
-                    return;
-                }}
-                
-                document.getElementById('scraping-status').textContent = 'Updating...';
-                
-                fetch('/api/scrape', {{
-                    method: 'POST',
-                    headers: {{
-                        'Content-Type': 'application/json',
-                    }}
-                }})
-                .then(response => response.json())
-                .then(data => {{
-                    alert('Update Started! Check back in 30 seconds.');
-                    setTimeout(() => {{
-                        location.reload();
-                    }}, 35000);
-                }})
-                .catch(error => {{
-                    console.error('Error:', error);
-                    alert('Error starting update process');
-                    document.getElementById('scraping-status').textContent = 'Error';
-                }});
-            }}
-            
-            function openCountySelector() {{
-                document.getElementById('county-selector').style.display = 'flex';
-                loadMonitoringCounties();
-            }}
-            
-            function loadMonitoringCounties() {{
-                const monitorCounties = getSet('monitorCounties');
-                const checkboxes = document.querySelectorAll('#county-selector input[type="checkbox"]');
-                checkboxes.forEach(checkbox => {{
-                    checkbox.checked = monitorCounties.has(checkbox.value);
-                }});
-            }}
-            
-            function closeCountySelector() {{
-                document.getElementById('county-selector').style.display = 'none';
-            }}
-            
-            function selectAll() {{
-                const checkboxes = document.querySelectorAll('#county-selector input[type="checkbox"]');
-                checkboxes.forEach(checkbox => checkbox.checked = true);
-            }}
-            
-            function deselectAll() {{
-                const checkboxes = document.querySelectorAll('#county-selector input[type="checkbox"]');
-                checkboxes.forEach(checkbox => checkbox.checked = false);
-            }}
-            
-            // County search functionality
-            document.addEventListener('DOMContentLoaded', function() {{
-                const searchInput = document.getElementById('countySearch');
-                if (searchInput) {{
-                    searchInput.addEventListener('input', function() {{
-                        const searchTerm = this.value.toLowerCase();
-                        const countyItems = document.querySelectorAll('.county-item');
-                        
-                        countyItems.forEach(item => {{
-                            const countyName = item.getAttribute('data-county');
-                            if (countyName.includes(searchTerm)) {{
-                                item.style.display = 'block';
-                            }} else {{
-                                item.style.display = 'none';
-                            }}
-                        }});
-                    }});
-                }}
-            }});
-            
-            function saveSelectedCounties() {{
-                const checkboxes = document.querySelectorAll('#county-selector input[type="checkbox"]:checked');
-                const selectedCounties = Array.from(checkboxes).map(cb => cb.value);
-                
-                // Save to localStorage for monitoring counties
-                saveSet('monitorCounties', new Set(selectedCounties));
-                updateMonitoringCount();
-                
-                // Sync preferences with server
-                updatePreferencesOnServer();
-                
-                alert('Monitoring counties saved!');
-                closeCountySelector();
-            }}
-            
-            function exportCSV() {{
-                const exportVisible = confirm('Export visible permits only? (Cancel for all permits)');
-                const url = exportVisible ? '/export/csv?visible=true' : '/export/csv';
-                window.location.href = url;
-            }}
-            
-            
-            // Auto-refresh status every 10 seconds
-            setInterval(() => {{
-                fetch('/api/status')
-                .then(response => response.json())
-                .then(data => {{
-                    document.getElementById('scraping-status').textContent = data.is_running ? 'Updating...' : 'Completed';
-                    
-                    // Format the last run time properly (already formatted on server with timezone)
-                    if (data.last_run) {{
-                        document.getElementById('last-run').textContent = data.last_run;
-                    }} else {{
-                        document.getElementById('last-run').textContent = 'Never';
-                    }}
-                    
-                    document.getElementById('last-count').textContent = data.last_count + ' permits';
-                }})
-                .catch(error => console.error('Error updating status:', error));
-            }}, 10000);
-            
-            // Theme toggle functionality
-            function toggleTheme() {{
-                const body = document.body;
-                const themeIcon = document.getElementById('theme-icon');
-                const currentTheme = body.getAttribute('data-theme');
-                
-                if (currentTheme === 'dark') {{
-                    body.setAttribute('data-theme', 'light');
-                    themeIcon.innerHTML = '<circle cx="12" cy="12" r="5"/><path d="M12 1v2M12 21v2M4.22 4.22l1.42 1.42M18.36 18.36l1.42 1.42M1 12h2M21 12h2M4.22 19.78l1.42-1.42M18.36 5.64l1.42-1.42"/>';
-                    localStorage.setItem('theme', 'light');
-                }} else {{
-                    body.setAttribute('data-theme', 'dark');
-                    themeIcon.innerHTML = '<path d="M21 12.79A9 9 0 1 1 11.21 3 7 7 0 0 0 21 12.79z"/>';
-                    localStorage.setItem('theme', 'dark');
-                }}
-            }}
-            
-            // Load saved theme on page load
-            document.addEventListener('DOMContentLoaded', function() {{
-                const savedTheme = localStorage.getItem('theme') || 'light';
-                const body = document.body;
-                const themeIcon = document.getElementById('theme-icon');
-                
-                body.setAttribute('data-theme', savedTheme);
-                
-                if (savedTheme === 'dark') {{
-                    themeIcon.innerHTML = '<path d="M21 12.79A9 9 0 1 1 11.21 3 7 7 0 0 0 21 12.79z"/>';
-                }}
-                
-                // Initialize localStorage
-                initializeStorage();
-                
-                // Update monitoring count display
-                updateMonitoringCount();
-                
-                // Apply view filters on page load
-                applyViewFilters();
-                
-                // Initialize push notifications
-                initializePushNotifications();
-            }});
-            
-            function updateMonitoringCount() {{
-                const monitorCounties = getSet('monitorCounties');
-                const countText = monitorCounties.size === 0 ? 'All counties' : `${{monitorCounties.size}} counties`;
-                document.getElementById('monitoring-count-text').textContent = countText;
-            }}
-            
-            // Device management
-            function getOrCreateDeviceId() {{
-                let deviceId = localStorage.getItem('deviceId');
-                if (!deviceId) {{
-                    deviceId = 'device_' + Math.random().toString(36).substr(2, 9) + '_' + Date.now();
-                    localStorage.setItem('deviceId', deviceId);
-                }}
-                return deviceId;
-            }}
-            
-            // iOS detection
-            function isIOS() {{
-                return /iPad|iPhone|iPod/.test(navigator.userAgent);
-            }}
-            
-            function isStandalone() {{
-                return window.navigator.standalone === true;
-            }}
-            
-            function showIOSBanner() {{
-                if (isIOS() && !isStandalone()) {{
-                    const banner = document.createElement('div');
-                    banner.id = 'ios-banner';
-                    banner.style.cssText = `
-                        position: fixed;
-                        top: 0;
-                        left: 0;
-                        right: 0;
-                        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                        color: white;
-                        padding: 12px;
-                        text-align: center;
-                        font-size: 14px;
-                        z-index: 10000;
-                        box-shadow: 0 2px 10px rgba(0,0,0,0.2);
-                    `;
-                    banner.innerHTML = `
-                        📱 Add to Home Screen to receive notifications
-                        <button onclick="this.parentElement.remove()" style="margin-left: 10px; background: rgba(255,255,255,0.2); border: none; color: white; padding: 4px 8px; border-radius: 4px;">✕</button>
-                    `;
-                    document.body.appendChild(banner);
-                    
-                    // Adjust body padding to account for banner
-                    document.body.style.paddingTop = '60px';
-                }}
-            }}
-            
-            // Push notification functions
-            let isSubscribed = false;
-            // Service worker registration is handled in subscribeUser()
-            
-            function urlBase64ToUint8Array(base64String) {{
-                const padding = '='.repeat((4 - base64String.length % 4) % 4);
-                const base64 = (base64String + padding)
-                    .replace(/-/g, '+')
-                    .replace(/_/g, '/');
-                
-                const rawData = window.atob(base64);
-                const outputArray = new Uint8Array(rawData.length);
-                
-                for (let i = 0; i < rawData.length; ++i) {{
-                    outputArray[i] = rawData.charCodeAt(i);
-                }}
-                return outputArray;
-            }}
-            
-            function arrayBufferToBase64(buffer) {{
-                const bytes = new Uint8Array(buffer);
-                let binary = '';
-                for (let i = 0; i < bytes.byteLength; i++) {{
-                    binary += String.fromCharCode(bytes[i]);
-                }}
-                return window.btoa(binary);
-            }}
-            
-            function updateSubscriptionOnServer(subscription, keys) {{
-                console.log('Sending subscription to server:', subscription);
-                console.log('Keys being sent:', keys);
-                
-                const deviceId = getOrCreateDeviceId();
-                const preferences = {{
-                    monitorCounties: Array.from(getSet('monitorCounties')),
-                    dismissedCountySet: Array.from(getSet('dismissedCountySet')),
-                    dismissedPermitSet: Array.from(getSet('dismissedPermitSet')),
-                    viewFilterCounties: Array.from(getSet('viewFilterCounties'))
-                }};
-                
-                const payload = {{
-                    deviceId: deviceId,
-                    endpoint: subscription.endpoint,
-                    keys: keys,
-                    preferences: preferences
-                }};
-                
-                console.log('Payload being sent:', payload);
-                console.log('Payload keys:', payload.keys);
-                
-                return fetch('/api/push/subscribe', {{
-                    method: 'POST',
-                    headers: {{
-                        'Content-Type': 'application/json',
-                    }},
-                    body: JSON.stringify(payload)
-                }});
-            }}
-            
-            function updatePreferencesOnServer() {{
-                const deviceId = getOrCreateDeviceId();
-                const preferences = {{
-                    monitorCounties: Array.from(getSet('monitorCounties')),
-                    dismissedCountySet: Array.from(getSet('dismissedCountySet')),
-                    dismissedPermitSet: Array.from(getSet('dismissedPermitSet')),
-                    viewFilterCounties: Array.from(getSet('viewFilterCounties'))
-                }};
-                
-                return fetch('/api/push/prefs', {{
-                    method: 'POST',
-                    headers: {{
-                        'Content-Type': 'application/json',
-                    }},
-                    body: JSON.stringify({{
-                        deviceId: deviceId,
-                        preferences: preferences
-                    }})
-                }});
-            }}
-            
-            async function unsubscribeUser() {{
-                try {{
-                    // Get the service worker registration
-                    const registration = await navigator.serviceWorker.ready;
-                    const subscription = await registration.pushManager.getSubscription();
-                    
-                    if (subscription) {{
-                        await subscription.unsubscribe();
-                        
-                        // Send unsubscribe request to server
-                        await fetch('/api/push/unsubscribe', {{
-                            method: 'POST',
-                            headers: {{
-                                'Content-Type': 'application/json',
-                            }},
-                            body: JSON.stringify({{
-                                endpoint: subscription.endpoint
-                            }})
-                        }});
-                    }}
-                    
-                    console.log('User is unsubscribed.');
-                    isSubscribed = false;
-                    updateBtn();
-                    
-                }} catch (error) {{
-                    console.log('Error unsubscribing', error);
-                }}
-            }}
-            
-            async function subscribeUser() {{
-                console.log('Attempting to subscribe user...');
-                
-                try {{
-                    // Check if service worker and push are supported
-                    if (!('serviceWorker' in navigator) || !('PushManager' in window)) {{
-                        alert('Push notifications not supported in this browser');
-                        return;
-                    }}
-                    
-                    // 1) Register service worker at root path
-                    let reg;
-                    try {{
-                        reg = await navigator.serviceWorker.register('/sw.js', {{ scope: '/' }});
-                        await navigator.serviceWorker.ready; // ensure active
-                        console.log('Service worker registered and ready');
-                    }} catch (e) {{
-                        console.error('SW register failed', e);
-                        alert('Could not register service worker.');
-                        return;
-                    }}
-                    
-                    // 2) Ask permission
-                    const perm = await Notification.requestPermission();
-                    if (perm !== 'granted') {{
-                        alert('Notifications not allowed');
-                        return;
-                    }}
-                    
-                    // 3) Get public key
-                    const response = await fetch('/api/vapid-public-key');
-                    const data = await response.json();
-                    if (!data.publicKey) {{
-                        alert('Public key missing on server');
-                        return;
-                    }}
-                    console.log('Received public key from server');
-                    
-                    // 4) Subscribe using the ready service worker
-                    const ready = await navigator.serviceWorker.ready;
-                    const subscription = await ready.pushManager.subscribe({{
-                        userVisibleOnly: true,
-                        applicationServerKey: urlBase64ToUint8Array(data.publicKey)
-                    }});
-                    
-                    console.log('User is subscribed:', subscription);
-                    
-                    // Extract keys using getKey() method
-                    const p256dh = subscription.getKey('p256dh');
-                    const auth = subscription.getKey('auth');
-                    
-                    console.log('p256dh key:', p256dh);
-                    console.log('auth key:', auth);
-                    
-                    // Convert ArrayBuffer to base64 string
-                    const p256dhBase64 = p256dh ? arrayBufferToBase64(p256dh) : '';
-                    const authBase64 = auth ? arrayBufferToBase64(auth) : '';
-                    
-                    console.log('p256dh base64:', p256dhBase64);
-                    console.log('auth base64:', authBase64);
-                    
-                    // Create keys object
-                    const keys = {{
-                        p256dh: p256dhBase64,
-                        auth: authBase64
-                    }};
-                    
-                    console.log('Keys object:', keys);
-                    
-                    // 5) Send subscription to server
-                    const serverResponse = await updateSubscriptionOnServer(subscription, keys);
-                    console.log('Server response:', serverResponse);
-                    
-                    if (serverResponse.ok) {{
-                        isSubscribed = true;
-                        updateBtn();
-                        console.log('Successfully subscribed!');
-                        alert('Notifications enabled on this device.');
-                    }} else {{
-                        console.error('Server subscription failed:', serverResponse);
-                        throw new Error('Server subscription failed');
-                    }}
-                    
-                }} catch (err) {{
-                    console.log('Failed to subscribe the user:', err);
-                    alert('Failed to enable notifications. Please try again.');
-                }}
-            }}
-            
-            function updateBtn() {{
-                const btn = document.getElementById('notificationBtn');
-                const testBtn = document.getElementById('testNotificationBtn');
-                
-                if (isSubscribed) {{
-                    btn.textContent = '🔕 Disable Notifications';
-                    btn.onclick = unsubscribeUser;
-                    // Show test button in debug mode
-                    if (testBtn) {{
-                        testBtn.style.display = 'inline-flex';
-                    }}
-                }} else {{
-                    btn.textContent = '🔔 Enable Notifications';
-                    btn.onclick = subscribeUser;
-                    // Hide test button when not subscribed
-                    if (testBtn) {{
-                        testBtn.style.display = 'none';
-                    }}
-                }}
-            }}
-            
-            async function toggleNotifications() {{
-                if (isSubscribed) {{
-                    unsubscribeUser();
-                }} else {{
-                    await subscribeUser();
-                }}
-            }}
-            
-            function sendTestNotification() {{
-                const deviceId = getOrCreateDeviceId();
-                
-                fetch('/api/push/test', {{
-                    method: 'POST',
-                    headers: {{
-                        'Content-Type': 'application/json',
-                    }},
-                    body: JSON.stringify({{ deviceId: deviceId }})
-                }})
-                .then(response => response.json())
-                .then(data => {{
-                    if (data.success) {{
-                        alert('Test notification sent!');
-                    }} else {{
-                        alert('Failed to send test notification: ' + data.error);
-                    }}
-                }})
-                .catch(error => {{
-                    console.error('Error sending test notification:', error);
-                    alert('Error sending test notification');
-                }});
-            }}
-            
-            function initializePushNotifications() {{
-                // Show iOS banner if needed
-                showIOSBanner();
-                
-                // Always show the notification button initially
-                const btn = document.getElementById('notificationBtn');
-                if (btn) {{
-                    btn.style.display = 'inline-flex';
-                    btn.style.visibility = 'visible';
-                    console.log('Notification button made visible');
-                }} else {{
-                    console.error('Notification button not found!');
-                }}
-                
-                // Check if push notifications are available on the server
-                fetch('/api/vapid-public-key')
-                .then(response => {{
-                    if (!response.ok) {{
-                        console.warn('Push notifications not available on server, but showing button anyway');
-                        // Don't hide the button - let user try anyway
-                        return;
-                    }}
-                    
-                    if ('serviceWorker' in navigator && 'PushManager' in window) {{
-                        console.log('Service Worker and Push is supported');
-                        // Service worker will be registered when user clicks Enable Notifications
-                    }} else {{
-                        console.warn('Push messaging is not supported, but showing button anyway');
-                        // Don't hide the button - let user try anyway
-                    }}
-                }})
-                .catch(function(error) {{
-                    console.warn('Failed to check push notification availability, but showing button anyway:', error);
-                    // Don't hide the button - let user try anyway
-                }});
-            }}
-        </script>
-    </body>
-    </html>
+        </div>
+
+        <script src="{{ js_url }}"></script>
+</body>
+</html>
+""")
+
+INDEX_COUNTY_OPTIONS = sorted(TEXAS_COUNTIES)
+
+def _index_context():
+    """Template variables for the index page; permit cards are read lazily from a cursor"""
+    # Apply filters
+    search_term = request.args.get('search', '')
+    sort_by = request.args.get('sort', 'newest')
+    if sort_by not in PERMIT_SORTS:
+        sort_by = 'newest'
+    limit = _positive_int(request.args.get('limit'), INDEX_PAGE_SIZE, INDEX_MAX_PAGE_SIZE)
+    page = _positive_int(request.args.get('page'), 1)
+    
+    print(f"DEBUG: Filters - search: '{search_term}', sort: '{sort_by}', page: {page}, limit: {limit}")
+    
+    # Read the change version first so deltas fetched later cover anything added meanwhile
+    changes_version = latest_permit_change()
+    
+    # Search, the device's view filter and dismissals, sort and paging all run in SQL;
+    # only one page of permits is loaded
+    view_prefs = requesting_device_view()
+    matching = filter_permits(search_permits(Permit.query, search_term), device_view_args(view_prefs or {}))
+    total_permits = matching.count()
+    page_count = max(1, -(-total_permits // limit))
+    page = min(page, page_count)
+    page_ids = matching.order_by(*PERMIT_SORTS[sort_by]).offset((page - 1) * limit).limit(limit) \
+        .with_entities(Permit.id).subquery()
+    
+    print(f"DEBUG: Page {page}/{page_count} of {total_permits} matching permits")
+    
+    # The page's permits ordered by county (then the chosen sort), grouped as they stream off the cursor
+    page_permits = Permit.query.filter(Permit.id.in_(db.select(page_ids.c.id))) \
+        .order_by(Permit.county, *PERMIT_SORTS[sort_by]).yield_per(INDEX_YIELD_PER)
+    permit_groups = groupby(page_permits, key=attrgetter('county'))
+    
+    # Get unique counties for the filter dropdown; every county in the table, whatever the search
+    counties = [county for (county,) in db.session.query(Permit.county)
+                .filter(Permit.county != '').distinct().order_by(Permit.county)]
+    
+    return dict(
+        js_url=static_asset_url('app.js'),
+        sort_by=sort_by,
+        search_term=search_term,
+        scraping_status=scraping_status,
+        total_permits=total_permits,
+        permit_groups=permit_groups,
+        page=page,
+        page_count=page_count,
+        page_url=_page_url,
+        texas_counties=INDEX_COUNTY_OPTIONS,
+        counties=counties,
+        changes_version=changes_version,
+        view_synced=view_prefs is not None,
+        # New permits are only patched into the unfiltered first page of the default view
+        live=page == 1 and not search_term and sort_by == 'newest'
+    )
+
+def _index_head():
+    return INDEX_HEAD_TEMPLATE.render(css_url=static_asset_url('app.css'))
+
+def generate_html():
+    """Render the complete index page; CSS and JS are served separately as cacheable assets"""
+    return _index_head() + INDEX_TEMPLATE.render(**_index_context())
+
+def stream_html(buffer_size=None):
+    """Yield the index page as it renders.
+    
+    The head goes out before any query runs, so the browser can fetch the
+    stylesheet while the counts and permits load; the county sections follow
+    in buffer_size chunks.
+    """
+    yield _index_head()
+    
+    buffer_size = buffer_size or INDEX_STREAM_BUFFER
+    chunks = []
+    pending = 0
+    for chunk in INDEX_TEMPLATE.generate(**_index_context()):
+        chunks.append(chunk)
+        pending += len(chunk)
+        if pending >= buffer_size:
+            yield ''.join(chunks)
+            chunks = []
+            pending = 0
+    if chunks:
+        yield ''.join(chunks)
+
+def _status_fingerprint():
+    return json.dumps(scraping_status, default=str, sort_keys=True)
+
+def conditional_get(*key_parts, last_modified=None):
+    """Answer a GET with 304 Not Modified, before running the view, when nothing it depends on changed.
+    
+    key_parts are callables returning what the response depends on besides the
+    URL; they are hashed into a strong ETag. last_modified returns the
+    Last-Modified time for endpoints that only depend on the permit data. It is
+    neither sent nor honoured while its second is still running (a write later
+    in that second would leave it unchanged); the ETag covers those requests.
     """
-    return html
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            parts = [request.full_path] + [str(part()) for part in key_parts]
+            etag = hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()[:32]
+            modified_at = last_modified() if last_modified else None
+            if modified_at and modified_at >= DataVersion.current_second():
+                modified_at = None
+            
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            else:
+                not_modified = bool(modified_at and request.if_modified_since and modified_at <= request.if_modified_since)
+            
+            if not_modified:
+                resp = app.response_class(status=304)
+            else:
+                resp = app.make_response(view(*args, **kwargs))
+                if resp.status_code != 200:
+                    return resp
+            resp.set_etag(etag)
+            if modified_at:
+                resp.last_modified = modified_at
+            # Always revalidate; a matching ETag costs a 304 with no DB or render work
+            resp.headers['Cache-Control'] = 'no-cache'
+            return resp
+        return wrapper
+    return decorator
 
 # Routes
 @app.route('/')
+@conditional_get(lambda: data_version.version, _status_fingerprint, _device_view_fingerprint)
 def index():
-    return generate_html()
+    if INDEX_STREAMING:
+        resp = app.response_class(stream_with_context(stream_html()), mimetype='text/html')
+    else:
+        resp = app.make_response(generate_html())
+    # The device's saved view (named by its cookies) decides which permits are listed
+    resp.vary.add('Cookie')
+    return resp
 
 @app.route('/api/scrape', methods=['POST'])
 def api_scrape():
@@ -2973,28 +3037,153 @@ def api_scrape():
     return jsonify({'message': 'Update started'})
 
 @app.route('/api/status')
+@conditional_get(_status_fingerprint)
 def api_status():
-    # Format the datetime for JSON serialization
-    status_copy = scraping_status.copy()
-    if status_copy['last_run']:
-        # Format with timezone for display
-        status_copy['last_run'] = status_copy['last_run'].strftime('%m/%d/%Y %I:%M:%S %p %Z')
-    return jsonify(status_copy)
+    return jsonify(format_scraping_status())
+
+@app.route('/api/events')
+def api_events():
+    """Server-Sent Events: 'status' on scrape start/finish, 'permits' when the change log moves.
+    
+    Both are sent once on connect so a reconnecting client catches up. When
+    every stream slot is taken the client gets a 503 and falls back to polling
+    /api/status.
+    """
+    initial = [
+        f"event: status\ndata: {json.dumps(format_scraping_status())}\n\n",
+        f"event: permits\ndata: {json.dumps({'version': latest_permit_change()})}\n\n"
+    ]
+    events = event_broadcaster.subscribe()
+    if events is None:
+        return jsonify({'error': 'Too many event streams'}), 503
+    
+    resp = app.response_class(event_broadcaster.stream(events, initial), mimetype='text/event-stream')
+    # A client that drops before the first chunk closes a generator that never started, skipping its finally
+    resp.call_on_close(lambda: event_broadcaster.unsubscribe(events))
+    resp.headers['Cache-Control'] = 'no-cache'
+    resp.headers['X-Accel-Buffering'] = 'no'  # Don't let a proxy hold events back
+    return resp
 
 @app.route('/api/permits')
+@conditional_get(lambda: data_version.version, last_modified=lambda: data_version.modified_at)
 def api_permits():
-    permits = Permit.query.order_by(Permit.created_at.desc()).all()
-    return jsonify([{
-        'id': p.id,
-        'county': p.county,
-        'operator': p.operator,
-        'lease_name': p.lease_name,
-        'well_number': p.well_number,
-        'api_number': p.api_number,
-        'date_issued': p.date_issued.isoformat(),
-        'rrc_link': p.rrc_link,
-        'created_at': p.created_at.isoformat()
-    } for p in permits])
+    """Permits as a JSON array, newest first.
+    
+    Without ?limit= or ?after= every matching permit is returned, as before
+    paging existed. With either, one keyset page is returned: pass the
+    X-Next-Cursor header of a response as ?after= to get the next page (also
+    given as a Link rel="next" header). ?limit= sets the page size,
+    ?order=asc walks oldest first, ?fields= picks columns, and the filter_permits()
+    parameters narrow the rows; ?since= gives a delta sync.
+    """
+    paged = 'limit' in request.args or 'after' in request.args
+    try:
+        fields = _parse_fields(request.args.get('fields'))
+        query = filter_permits(Permit.query, request.args)
+        limit = _positive_int(request.args.get('limit'), API_PERMITS_PAGE_SIZE, API_PERMITS_MAX_PAGE_SIZE)
+        ascending = request.args.get('order', 'desc').lower() == 'asc'
+        after = request.args.get('after')
+        if after:
+            query = query.filter(permit_keyset_filter(decode_permit_cursor(after), ascending))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Select only the requested columns, plus the keyset columns
+    columns = [getattr(Permit, field) for field in fields]
+    columns += [column for column in (Permit.created_at, Permit.id) if column.key not in fields]
+    ordering = (Permit.created_at.asc(), Permit.id.asc()) if ascending else (Permit.created_at.desc(), Permit.id.desc())
+    query = query.with_entities(*columns).order_by(*ordering)
+    if not paged:
+        return jsonify([{field: _json_value(getattr(row, field)) for field in fields} for row in query])
+    rows = query.limit(limit + 1).all()
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    resp = jsonify([{field: _json_value(getattr(row, field)) for field in fields} for row in rows])
+    if has_more:
+        next_cursor = encode_permit_cursor(rows[-1].created_at, rows[-1].id)
+        args = request.args.to_dict(flat=False)
+        args['after'] = [next_cursor]
+        resp.headers['X-Next-Cursor'] = next_cursor
+        resp.headers['Link'] = f'<{request.path}?{urlencode(args, doseq=True)}>; rel="next"'
+    return resp
+
+@app.route('/api/permits/changes')
+@conditional_get(lambda: data_version.version)
+def api_permit_changes():
+    """Permit inserts and deletes after a change version, for patching the page in place.
+    
+    Returns {"version", "inserted": [permit, ...], "deleted": [id, ...], "more"};
+    call again with since=version while more is true. "reset": true means the
+    log no longer reaches back to since and the client should reload.
+    """
+    since = request.args.get('since', type=int)
+    if since is None or since < 0:
+        return jsonify({'error': 'since must be a change version'}), 400
+    limit = _positive_int(request.args.get('limit'), PERMIT_CHANGES_PAGE_SIZE, PERMIT_CHANGES_PAGE_SIZE)
+    
+    oldest, latest = db.session.query(db.func.min(PermitChange.id), db.func.max(PermitChange.id)).one()
+    latest = latest or 0
+    if since > latest or (oldest is not None and since < oldest - 1):
+        return jsonify({'version': latest, 'reset': True})
+    
+    changes = PermitChange.query.filter(PermitChange.id > since).order_by(PermitChange.id).limit(limit + 1).all()
+    more = len(changes) > limit
+    changes = changes[:limit]
+    
+    # Only the final state of each permit in this window matters
+    final_action = {}
+    for change in changes:
+        final_action[change.permit_id] = change.action
+    inserted_ids = [permit_id for permit_id, action in final_action.items() if action == 'insert']
+    deleted_ids = [permit_id for permit_id, action in final_action.items() if action == 'delete']
+    
+    fields = ('id', 'county', 'operator', 'lease_name', 'well_number', 'api_number', 'date_issued', 'rrc_link')
+    inserted = []
+    if inserted_ids:
+        rows = Permit.query.with_entities(*[getattr(Permit, field) for field in fields]) \
+            .filter(Permit.id.in_(inserted_ids)).order_by(Permit.created_at, Permit.id).all()
+        inserted = [{field: _json_value(getattr(row, field)) for field in fields} for row in rows]
+    
+    return jsonify({
+        'version': changes[-1].id if changes else since,
+        'inserted': inserted,
+        'deleted': deleted_ids,
+        'more': more
+    })
+
+@app.route('/api/view', methods=['POST'])
+def api_device_view():
+    """Save a device's view filter and dismissals; the index page applies them when paging"""
+    data = request.get_json(silent=True)
+    if not data or not data.get('deviceId'):
+        return jsonify({'error': 'Missing deviceId'}), 400
+    
+    preferences = data.get('preferences') or {}
+    prefs = {
+        key: [str(value) for value in preferences.get(key, [])]
+        for key in ('viewFilterCounties', 'dismissedCountySet', 'dismissedPermitSet')
+    }
+    prefs_json = json.dumps(prefs, sort_keys=True)
+    
+    try:
+        device_id = str(data['deviceId'])[:100]
+        view = DeviceView.query.filter_by(device_id=device_id).first()
+        if view is None:
+            view = DeviceView(device_id=device_id)
+            db.session.add(view)
+        view.prefs_json = prefs_json
+        db.session.commit()
+    except Exception as e:
+        print(f"Error saving device view: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to save view'}), 500
+    
+    resp = jsonify({'success': True})
+    version = hashlib.sha256(prefs_json.encode('utf-8')).hexdigest()[:16]
+    for name, value in ((DEVICE_VIEW_COOKIE, device_id), (DEVICE_VIEW_VERSION_COOKIE, version)):
+        resp.set_cookie(name, value, max_age=DEVICE_VIEW_COOKIE_MAX_AGE, samesite='Lax')
+    return resp
 
 @app.route('/api/counties')
 def api_counties():
@@ -3082,6 +3271,7 @@ def api_push_subscribe():
             print(f"DEBUG: Created new subscription with keys")
         
         db.session.commit()
+        push_routing_index.update((existing or subscription).id, prefs_json)
         
         print(f"Device subscription {'updated' if existing else 'created'} for device {device_id}")
         return jsonify({'success': True, 'message': 'Subscribed to notifications'})
@@ -3105,6 +3295,7 @@ def api_push_unsubscribe():
         if subscription:
             db.session.delete(subscription)
             db.session.commit()
+            push_routing_index.remove(subscription.id)
             print(f"Device unsubscribed: {subscription.device_id}")
             return jsonify({'success': True, 'message': 'Unsubscribed from notifications'})
         else:
@@ -3132,6 +3323,7 @@ def api_push_prefs():
             subscription.prefs_json = prefs_json
             subscription.updated_at = datetime.utcnow()
             db.session.commit()
+            push_routing_index.update(subscription.id, prefs_json)
             print(f"Updated preferences for device {device_id}")
             return jsonify({'success': True, 'message': 'Preferences updated'})
         else:
@@ -3210,6 +3402,15 @@ def api_vapid_public_key():
     # Always return the VAPID public key, even if pywebpush isn't available
     return jsonify({'publicKey': VAPID_PUBLIC_KEY})
 
+@app.after_request
+def cache_fingerprinted_assets(resp):
+    """Fingerprinted assets never change under the same URL, so cache them for a year"""
+    if request.endpoint == 'static' and resp.status_code in (200, 304):
+        filename = (request.view_args or {}).get('filename')
+        if filename in STATIC_ASSET_VERSIONS and request.args.get('v') == STATIC_ASSET_VERSIONS[filename]:
+            resp.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return resp
+
 @app.route('/static/mobile-compact.css')
 def serve_mobile_css():
     """Serve the mobile compact CSS"""
@@ -3541,7 +3742,10 @@ def api_dismiss_permit(permit_id):
         permit = Permit.query.get(permit_id)
         if permit:
             db.session.delete(permit)
+            record_permit_changes('delete', [permit.id])
             db.session.commit()
+            data_version.bump()
+            event_broadcaster.publish('permits', {'version': latest_permit_change()})
             return jsonify({'success': True, 'message': 'Permit dismissed successfully'})
         else:
             return jsonify({'success': False, 'error': 'Permit not found'}), 404
@@ -3575,43 +3779,181 @@ def api_debug_push():
         'pywebpush_available': PUSH_NOTIFICATIONS_AVAILABLE
     })
 
-@app.route('/export/csv')
-def export_csv():
-    visible_only = request.args.get('visible', 'false').lower() == 'true'
+# CSV export columns: (header, Permit column)
+PERMIT_CSV_COLUMNS = (
+    ('County', Permit.county),
+    ('Operator', Permit.operator),
+    ('Lease Name', Permit.lease_name),
+    ('Well Number', Permit.well_number),
+    ('API Number', Permit.api_number),
+    ('Date Issued', Permit.date_issued),
+    ('RRC Link', Permit.rrc_link),
+)
+
+def iter_permit_batches(query, columns, batch_size):
+    """Lists of up to batch_size rows of columns, newest first, read from the DB cursor a batch at a time"""
+    rows = iter(query.with_entities(*columns).order_by(*PERMIT_SORTS['newest']).yield_per(batch_size))
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def iter_permit_csv(query, fields=None):
+    """CSV text for query, newest first, in chunks of EXPORT_BATCH_SIZE rows.
+    
+    Each chunk is handed to the response as soon as it is written, so memory
+    stays flat however many permits are exported.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for header, _ in PERMIT_CSV_COLUMNS])
+    
+    for batch in iter_permit_batches(query, [column for _, column in PERMIT_CSV_COLUMNS], EXPORT_BATCH_SIZE):
+        for row in batch:
+            writer.writerow([
+                row.county,
+                row.operator,
+                row.lease_name,
+                row.well_number,
+                row.api_number,
+                row.date_issued.strftime('%Y-%m-%d'),
+                row.rrc_link
+            ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+def iter_permit_ndjson(query, fields):
+    """One JSON object per line, the same shape as /api/permits, EXPORT_BATCH_SIZE rows per chunk"""
+    columns = [getattr(Permit, field) for field in fields]
+    for batch in iter_permit_batches(query, columns, EXPORT_BATCH_SIZE):
+        yield ''.join(
+            json.dumps({field: _json_value(value) for field, value in zip(fields, row)}) + '\n'
+            for row in batch
+        )
+
+# Columns stored as dictionary indices in columnar exports; both repeat heavily
+PERMIT_ARROW_DICTIONARY_FIELDS = ('county', 'operator')
+
+def permit_arrow_schema(fields):
+    types = {
+        'id': pa.int64(),
+        'county': pa.dictionary(pa.int32(), pa.string()),
+        'operator': pa.dictionary(pa.int32(), pa.string()),
+        'lease_name': pa.string(),
+        'well_number': pa.string(),
+        'api_number': pa.string(),
+        'date_issued': pa.date32(),
+        'rrc_link': pa.string(),
+        'created_at': pa.timestamp('us', tz='UTC'),  # Stored as naive UTC
+    }
+    return pa.schema([(field, types[field]) for field in fields])
+
+class _ChunkSink:
+    """Write-only file object that hands what pyarrow wrote so far to a streaming response"""
+    
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+    
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+    
+    def tell(self):
+        return self.position
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        self.closed = True
+    
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def iter_permit_arrow(query, fields, parquet=False):
+    """Arrow IPC stream (or Parquet) bytes for query, one record batch per EXPORT_COLUMNAR_BATCH_SIZE rows.
     
-    if visible_only:
-        # For visible-only export, we need to get the client-side filters
-        # This is a simplified version - in a real app you'd pass the filters as parameters
-        permits = Permit.query.order_by(Permit.created_at.desc()).all()
-        # Note: Full client-side filtering would require passing dismissed IDs as parameters
-        # For now, we'll export all permits and let the client handle filtering
+    County and operator dictionaries grow across batches, so the IPC stream only
+    sends the new values with each batch (dictionary deltas) and memory is
+    bounded by the batch size plus the distinct names.
+    """
+    schema = permit_arrow_schema(fields)
+    sink = _ChunkSink()
+    if parquet:
+        writer = pq.ParquetWriter(sink, schema)
     else:
-        permits = Permit.query.order_by(Permit.created_at.desc()).all()
-    
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(['County', 'Operator', 'Lease Name', 'Well Number', 'API Number', 'Date Issued', 'RRC Link'])
-    
-    for permit in permits:
-        writer.writerow([
-            permit.county,
-            permit.operator,
-            permit.lease_name,
-            permit.well_number,
-            permit.api_number,
-            permit.date_issued.strftime('%Y-%m-%d'),
-            permit.rrc_link
-        ])
+        writer = pa.ipc.new_stream(sink, schema, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+    dictionaries = {field: {} for field in fields if field in PERMIT_ARROW_DICTIONARY_FIELDS}
+    
+    columns = [getattr(Permit, field) for field in fields]
+    for batch in iter_permit_batches(query, columns, EXPORT_COLUMNAR_BATCH_SIZE):
+        arrays = []
+        for position, field in enumerate(fields):
+            values = [row[position] for row in batch]
+            if field in dictionaries:
+                codes = dictionaries[field]
+                indices = pa.array([None if value is None else codes.setdefault(value, len(codes)) for value in values], pa.int32())
+                arrays.append(pa.DictionaryArray.from_arrays(indices, pa.array(list(codes), pa.string())))
+            else:
+                arrays.append(pa.array(values, schema.field(field).type))
+        writer.write_batch(pa.record_batch(arrays, schema=schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+# Export formats: generator(query, fields), mimetype, file extension, needs pyarrow
+EXPORT_FORMATS = {
+    'csv': (iter_permit_csv, 'text/csv', 'csv', False),
+    'ndjson': (iter_permit_ndjson, 'application/x-ndjson', 'ndjson', False),
+    'arrow': (iter_permit_arrow, 'application/vnd.apache.arrow.stream', 'arrows', True),
+    'parquet': (lambda query, fields: iter_permit_arrow(query, fields, parquet=True), 'application/vnd.apache.parquet', 'parquet', True),
+}
+
+@app.route('/export/<export_format>')
+@conditional_get(lambda: data_version.version, _device_view_fingerprint, last_modified=lambda: data_version.modified_at)
+def export_permits(export_format):
+    """Stream permits as csv, ndjson, arrow (IPC stream) or parquet; takes the filter_permits() parameters.
     
-    output.seek(0)
+    ndjson, arrow and parquet also take ?fields= like /api/permits; csv keeps
+    its fixed spreadsheet columns. ?search= matches like the index page, and
+    ?visible=true adds the requesting device's saved view filter and
+    dismissals (see /api/view), so the page's "visible only" export never has
+    to put dismissed ids in the URL.
+    """
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"Unknown export format. Use one of: {', '.join(EXPORT_FORMATS)}"}), 404
+    generate, mimetype, extension, needs_pyarrow = EXPORT_FORMATS[export_format]
+    if needs_pyarrow and not PYARROW_AVAILABLE:
+        return jsonify({'error': f'{export_format} export requires pyarrow'}), 501
     
-    filename_suffix = '_visible' if visible_only else '_all'
-    return send_file(
-        io.BytesIO(output.getvalue().encode()),
-        mimetype='text/csv',
-        as_attachment=True,
-        download_name=f'rrc_permits_{datetime.now().strftime("%Y%m%d")}{filename_suffix}.csv'
-    )
+    filters = MultiDict([
+        (name, value) for name, value in request.args.items(multi=True)
+        if name in PERMIT_FILTER_ARGS and value.strip()
+    ])
+    if request.args.get('visible', 'false').lower() == 'true':
+        filters.update(device_view_args(requesting_device_view() or {}))
+    search_term = request.args.get('search', '').strip()
+    
+    try:
+        fields = _parse_fields(request.args.get('fields'))
+        query = filter_permits(search_permits(Permit.query, search_term), filters)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    filename_suffix = '_visible' if filters or search_term else '_all'
+    resp = app.response_class(stream_with_context(generate(query, fields)), mimetype=mimetype)
+    resp.headers['Content-Disposition'] = f'attachment; filename=rrc_permits_{datetime.now().strftime("%Y%m%d")}{filename_suffix}.{extension}'
+    resp.vary.add('Cookie')
+    return resp
 
 # Automatic scraping scheduler
 def start_scraping_scheduler():
@@ -3622,6 +3964,8 @@ def start_scraping_scheduler():
                 print(f"Starting automatic scrape at {datetime.now()}")
                 scrape_rrc_permits()
                 print(f"Automatic scrape completed at {datetime.now()}")
+                with app.app_context():
+                    prune_permit_changes()
             except Exception as e:
                 print(f"Error in automatic scrape: {e}")
                 import traceback
@@ -3630,25 +3974,93 @@ def start_scraping_scheduler():
             # Wait 5 minutes (300 seconds) before next scrape
             time.sleep(300)
     
+    # The scheduler is what sends notifications, so it also keeps seen_permits trimmed
+    seen_permit_cache.start_sweeper()
+    
     # Start the scheduler in a background thread
     scheduler_thread = threading.Thread(target=scrape_periodically)
     scheduler_thread.daemon = True
     scheduler_thread.start()
     print("Automatic scraping scheduler started (every 5 minutes)")
 
+def migrate_database():
+    """Upgrade tables created by earlier releases; create_all() only creates missing tables"""
+    inspector = db.inspect(db.engine)
+    
+    if 'permits' in inspector.get_table_names():
+        index_names = {index['name'] for index in inspector.get_indexes('permits')}
+        for index in Permit.__table__.indexes:
+            if index.name != 'ux_permits_natural_key' and index.name not in index_names:
+                index.create(db.engine)
+                print(f"Created {index.name} index")
+        if 'ux_permits_natural_key' not in index_names:
+            # Keep the oldest copy of each permit so the unique index can be built; the change log
+            # records the removals so clients syncing deltas drop their stale cards
+            duplicate_ids = list(db.session.execute(db.text(
+                "SELECT id FROM permits WHERE id NOT IN ("
+                "SELECT MIN(id) FROM permits GROUP BY api_number, lease_name, well_number)"
+            )).scalars())
+            for start in range(0, len(duplicate_ids), 500):
+                Permit.query.filter(Permit.id.in_(duplicate_ids[start:start + 500])).delete(synchronize_session=False)
+            record_permit_changes('delete', duplicate_ids)
+            db.session.commit()
+            for index in Permit.__table__.indexes:
+                index.create(db.engine, checkfirst=True)
+            print(f"Created ux_permits_natural_key index (removed {len(duplicate_ids)} duplicate permits)")
+        
+        # Older rows may lack created_at, which keyset cursors need; date them by when they were issued
+        undated = Permit.query.filter(Permit.created_at.is_(None)).all()
+        for permit in undated:
+            permit.created_at = datetime.combine(permit.date_issued, datetime.min.time())
+        if undated:
+            db.session.commit()
+            print(f"Backfilled created_at on {len(undated)} permits")
+    
+    if 'device_subscriptions' in inspector.get_table_names():
+        columns = {column['name'] for column in inspector.get_columns('device_subscriptions')}
+        if 'backoff_until' not in columns:
+            db.session.execute(db.text("ALTER TABLE device_subscriptions ADD COLUMN backoff_until TIMESTAMP"))
+            db.session.commit()
+            print("Added device_subscriptions.backoff_until column")
+    
+    if db.engine.dialect.name == 'sqlite' and 'permit_changes' in inspector.get_table_names():
+        table_sql = db.session.execute(db.text(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'permit_changes'"
+        )).scalar() or ''
+        if 'AUTOINCREMENT' not in table_sql.upper():
+            # Rebuild with AUTOINCREMENT, keeping the ids clients already hold
+            old_indexes = [index['name'] for index in inspector.get_indexes('permit_changes')]
+            db.session.execute(db.text("ALTER TABLE permit_changes RENAME TO permit_changes_old"))
+            for index_name in old_indexes:
+                db.session.execute(db.text(f'DROP INDEX IF EXISTS "{index_name}"'))
+            db.session.commit()
+            PermitChange.__table__.create(db.engine)
+            db.session.execute(db.text(
+                "INSERT INTO permit_changes (id, permit_id, action, created_at) "
+                "SELECT id, permit_id, action, created_at FROM permit_changes_old"
+            ))
+            db.session.execute(db.text("DROP TABLE permit_changes_old"))
+            db.session.commit()
+            print("Rebuilt permit_changes with AUTOINCREMENT ids")
+
 # Initialize database when the module is imported (works with Gunicorn)
 with app.app_context():
     try:
         db.create_all()
+        migrate_database()
         print("Database initialized successfully")
         
+        # Warm the notification dedupe cache
+        seen_permit_cache.warm()
+        
         # Test database connection
         result = db.session.execute(db.text("SELECT name FROM sqlite_master WHERE type='table'"))
         tables = [row[0] for row in result]
         print(f"Database tables: {tables}")
         
         # Start automatic scraping scheduler
-        start_scraping_scheduler()
+        if os.getenv('SCRAPE_SCHEDULER', 'true').lower() == 'true':
+            start_scraping_scheduler()
         
     except Exception as e:
         print(f"Database initialization error: {e}")
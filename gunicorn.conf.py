@@ -0,0 +1,21 @@
+# Gunicorn settings shared by every deploy target (Procfile, Dockerfile, Railway, nixpacks)
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+
+# One process: the scraper, caches and live event streams all live in it
+workers = 1
+
+# gthread runs each request, including every open /api/events stream, on one of
+# WEB_THREADS OS threads, so CPU-bound work (page parsing, exports) never stalls
+# the others. Each open stream holds a thread while idle; EVENTS_MAX_STREAMS
+# defaults to WEB_THREADS - 2 so ordinary requests always find one free.
+#
+# WEB_WORKER_CLASS=gevent serves streams as greenlets (a socket each instead of
+# a thread) for deployments with many open tabs, but parsing and exports then
+# run on the same event loop and hold up every stream and request while they run.
+worker_class = os.getenv('WEB_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('WEB_THREADS', '32'))  # gthread
+worker_connections = int(os.getenv('WEB_WORKER_CONNECTIONS', '1000'))  # gevent
+
+timeout = 120
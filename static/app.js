@@ -0,0 +1,995 @@
+// Utility functions for localStorage
+function getSet(key) {
+    try {
+        const data = localStorage.getItem(key);
+        return data ? new Set(JSON.parse(data)) : new Set();
+    } catch {
+        return new Set();
+    }
+}
+
+function saveSet(key, set) {
+    try {
+        localStorage.setItem(key, JSON.stringify(Array.from(set)));
+    } catch (e) {
+        console.error('Error saving to localStorage:', e);
+    }
+}
+
+function toggleArrayValue(key, value) {
+    const set = getSet(key);
+    if (set.has(value)) {
+        set.delete(value);
+    } else {
+        set.add(value);
+    }
+    saveSet(key, set);
+}
+
+function initializeStorage() {
+    // Initialize default values if not set
+    if (!localStorage.getItem('monitorCounties')) {
+        saveSet('monitorCounties', new Set());
+    }
+    if (!localStorage.getItem('dismissedCountySet')) {
+        saveSet('dismissedCountySet', new Set());
+    }
+    if (!localStorage.getItem('dismissedPermitSet')) {
+        saveSet('dismissedPermitSet', new Set());
+    }
+    if (!localStorage.getItem('viewFilterCounties')) {
+        saveSet('viewFilterCounties', new Set());
+    }
+}
+
+function applyFilters() {
+    const search = document.getElementById('search').value;
+    const sort = document.getElementById('sort').value;
+    const url = new URL(window.location);
+    url.searchParams.set('search', search);
+    url.searchParams.set('sort', sort);
+    url.searchParams.delete('page');
+    window.location.href = url.toString();
+}
+
+function clearFilters() {
+    document.getElementById('search').value = '';
+    document.getElementById('sort').value = 'newest';
+    applyFilters();
+}
+
+function openViewCountiesSelector() {
+    document.getElementById('view-counties-selector').style.display = 'flex';
+    loadViewCounties();
+}
+
+function closeViewCountiesSelector() {
+    document.getElementById('view-counties-selector').style.display = 'none';
+}
+
+function loadViewCounties() {
+    const viewCounties = getSet('viewFilterCounties');
+    const checkboxes = document.querySelectorAll('#view-counties-selector input[type="checkbox"]');
+    checkboxes.forEach(checkbox => {
+        checkbox.checked = viewCounties.has(checkbox.value);
+    });
+}
+
+function saveViewCounties() {
+    const checkboxes = document.querySelectorAll('#view-counties-selector input[type="checkbox"]:checked');
+    const selectedCounties = Array.from(checkboxes).map(cb => cb.value);
+    saveSet('viewFilterCounties', new Set(selectedCounties));
+    applyViewFilters();
+    closeViewCountiesSelector();
+    reloadWithSavedView();
+}
+
+function selectAllView() {
+    const checkboxes = document.querySelectorAll('#view-counties-selector input[type="checkbox"]');
+    checkboxes.forEach(checkbox => checkbox.checked = true);
+}
+
+function deselectAllView() {
+    const checkboxes = document.querySelectorAll('#view-counties-selector input[type="checkbox"]');
+    checkboxes.forEach(checkbox => checkbox.checked = false);
+}
+
+function clearViewFilter() {
+    saveSet('viewFilterCounties', new Set());
+    applyViewFilters();
+    closeViewCountiesSelector();
+    reloadWithSavedView();
+}
+
+function applyViewFilters() {
+    const viewCounties = getSet('viewFilterCounties');
+    const dismissedCounties = getSet('dismissedCountySet');
+    const dismissedPermits = getSet('dismissedPermitSet');
+
+    // Hide/show county sections
+    document.querySelectorAll('.county-section').forEach(section => {
+        const county = section.getAttribute('data-county');
+        const isDismissed = dismissedCounties.has(county);
+        const isFilteredOut = viewCounties.size > 0 && !viewCounties.has(county);
+
+        if (isDismissed || isFilteredOut) {
+            section.style.display = 'none';
+        } else {
+            section.style.display = 'block';
+        }
+    });
+
+    // Hide dismissed permits
+    document.querySelectorAll('.permit-card').forEach(card => {
+        const permitId = card.getAttribute('data-permit-id');
+        if (dismissedPermits.has(permitId)) {
+            card.style.display = 'none';
+        } else {
+            card.style.display = 'block';
+        }
+    });
+
+    // Show empty states for counties with no visible permits
+    document.querySelectorAll('.county-section').forEach(section => {
+        if (section.style.display !== 'none') {
+            const visiblePermits = section.querySelectorAll('.permit-card:not([style*="display: none"])');
+            const emptyState = section.querySelector('.county-empty-state');
+
+            if (visiblePermits.length === 0) {
+                emptyState.style.display = 'block';
+            } else {
+                emptyState.style.display = 'none';
+            }
+        }
+    });
+}
+
+// Dismissal functionality
+function dismissPermit(permitId) {
+    console.log('Dismissing permit:', permitId);
+    if (confirm('Are you sure you want to dismiss this permit?')) {
+        toggleArrayValue('dismissedPermitSet', permitId.toString());
+        document.querySelector(`[data-permit-id="${permitId}"]`).style.display = 'none';
+        applyViewFilters();
+        adjustTotalPermits(-1);
+        console.log('Permit dismissed, current dismissed permits:', getSet('dismissedPermitSet'));
+
+        // Sync preferences with server
+        updatePreferencesOnServer();
+        saveViewOnServer();
+    }
+}
+
+function dismissCounty(county) {
+    console.log('Dismissing county:', county);
+    if (confirm(`Are you sure you want to dismiss all permits in ${county} county?`)) {
+        toggleArrayValue('dismissedCountySet', county);
+        document.querySelector(`[data-county="${county}"]`).style.display = 'none';
+        console.log('County dismissed, current dismissed counties:', getSet('dismissedCountySet'));
+
+        // Sync preferences with server
+        updatePreferencesOnServer();
+        reloadWithSavedView();
+    }
+}
+
+// Manage Hidden functionality
+function openManageHidden() {
+    document.getElementById('manage-hidden-modal').style.display = 'flex';
+    loadHiddenItems();
+}
+
+function closeManageHidden() {
+    document.getElementById('manage-hidden-modal').style.display = 'none';
+}
+
+function loadHiddenItems() {
+    const dismissedCounties = getSet('dismissedCountySet');
+    const dismissedPermits = getSet('dismissedPermitSet');
+
+    console.log('Dismissed counties:', dismissedCounties);
+    console.log('Dismissed permits:', dismissedPermits);
+
+    // Load dismissed counties
+    const countiesList = document.getElementById('dismissed-counties-list');
+    countiesList.innerHTML = '';
+
+    if (dismissedCounties.size === 0) {
+        countiesList.innerHTML = '<p style="color: var(--text-secondary); font-style: italic;">No dismissed counties</p>';
+    } else {
+        dismissedCounties.forEach(county => {
+            const item = document.createElement('div');
+            item.className = 'hidden-item';
+            item.innerHTML = `
+                <span class="hidden-item-name">${county}</span>
+                <div class="hidden-item-actions">
+                    <button class="btn btn-outline-success btn-sm" onclick="restoreCounty('${county}')">Restore</button>
+                </div>
+            `;
+            countiesList.appendChild(item);
+        });
+    }
+
+    // Load dismissed permits
+    const permitsList = document.getElementById('dismissed-permits-list');
+    permitsList.innerHTML = '';
+
+    if (dismissedPermits.size === 0) {
+        permitsList.innerHTML = '<p style="color: var(--text-secondary); font-style: italic;">No dismissed permits</p>';
+    } else {
+        permitsList.innerHTML = `<p style="color: var(--text-secondary); margin-bottom: 1rem;">${dismissedPermits.size} dismissed permits</p>`;
+        permitsList.innerHTML += `<button class="btn btn-outline-success btn-sm" onclick="restoreAllPermits()">Restore All Permits</button>`;
+    }
+}
+
+function restoreCounty(county) {
+    const dismissedCounties = getSet('dismissedCountySet');
+    dismissedCounties.delete(county);
+    saveSet('dismissedCountySet', dismissedCounties);
+    loadHiddenItems();
+    applyViewFilters();
+    reloadWithSavedView();
+}
+
+function restoreAllPermits() {
+    if (confirm('Are you sure you want to restore all dismissed permits?')) {
+        saveSet('dismissedPermitSet', new Set());
+        loadHiddenItems();
+        applyViewFilters();
+        reloadWithSavedView();
+    }
+}
+
+function restoreAllDismissed() {
+    if (confirm('Are you sure you want to restore all dismissed items?')) {
+        saveSet('dismissedCountySet', new Set());
+        saveSet('dismissedPermitSet', new Set());
+        loadHiddenItems();
+        applyViewFilters();
+        reloadWithSavedView();
+    }
+}
+
+// The server pages and counts permits with this device's view filter and dismissals
+function saveViewOnServer() {
+    return fetch('/api/view', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            deviceId: getOrCreateDeviceId(),
+            preferences: {
+                viewFilterCounties: Array.from(getSet('viewFilterCounties')),
+                dismissedCountySet: Array.from(getSet('dismissedCountySet')),
+                dismissedPermitSet: Array.from(getSet('dismissedPermitSet'))
+            }
+        })
+    })
+    .catch(error => console.error('Error saving view:', error));
+}
+
+function reloadWithSavedView() {
+    saveViewOnServer().then(() => location.reload());
+}
+
+// First visit since the server learned about views: hand it the filters kept in this browser
+function syncViewWithServer() {
+    const container = document.getElementById('permits-container');
+    if (!container || container.getAttribute('data-view-synced') === 'true') {
+        return;
+    }
+    const hasView = ['viewFilterCounties', 'dismissedCountySet', 'dismissedPermitSet']
+        .some(key => getSet(key).size > 0);
+    if (hasView) {
+        reloadWithSavedView();
+    }
+}
+
+function startScraping() {
+    if (document.getElementById('scraping-status').textContent === 'Updating...') {
+        alert('Update is already in progress!');
+        return;
+    }
+
+    document.getElementById('scraping-status').textContent = 'Updating...';
+
+    fetch('/api/scrape', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        alert('Update Started! New permits will appear when it finishes.');
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        alert('Error starting update process');
+        document.getElementById('scraping-status').textContent = 'Error';
+    });
+}
+
+function openCountySelector() {
+    document.getElementById('county-selector').style.display = 'flex';
+    loadMonitoringCounties();
+}
+
+function loadMonitoringCounties() {
+    const monitorCounties = getSet('monitorCounties');
+    const checkboxes = document.querySelectorAll('#county-selector input[type="checkbox"]');
+    checkboxes.forEach(checkbox => {
+        checkbox.checked = monitorCounties.has(checkbox.value);
+    });
+}
+
+function closeCountySelector() {
+    document.getElementById('county-selector').style.display = 'none';
+}
+
+function selectAll() {
+    const checkboxes = document.querySelectorAll('#county-selector input[type="checkbox"]');
+    checkboxes.forEach(checkbox => checkbox.checked = true);
+}
+
+function deselectAll() {
+    const checkboxes = document.querySelectorAll('#county-selector input[type="checkbox"]');
+    checkboxes.forEach(checkbox => checkbox.checked = false);
+}
+
+// County search functionality
+document.addEventListener('DOMContentLoaded', function() {
+    const searchInput = document.getElementById('countySearch');
+    if (searchInput) {
+        searchInput.addEventListener('input', function() {
+            const searchTerm = this.value.toLowerCase();
+            const countyItems = document.querySelectorAll('.county-item');
+
+            countyItems.forEach(item => {
+                const countyName = item.getAttribute('data-county');
+                if (countyName.includes(searchTerm)) {
+                    item.style.display = 'block';
+                } else {
+                    item.style.display = 'none';
+                }
+            });
+        });
+    }
+});
+
+function saveSelectedCounties() {
+    const checkboxes = document.querySelectorAll('#county-selector input[type="checkbox"]:checked');
+    const selectedCounties = Array.from(checkboxes).map(cb => cb.value);
+
+    // Save to localStorage for monitoring counties
+    saveSet('monitorCounties', new Set(selectedCounties));
+    updateMonitoringCount();
+
+    // Sync preferences with server
+    updatePreferencesOnServer();
+
+    alert('Monitoring counties saved!');
+    closeCountySelector();
+}
+
+function exportCSV() {
+    const exportVisible = confirm('Export visible permits only? (Cancel for all permits)');
+    if (!exportVisible) {
+        window.location.href = '/export/csv';
+        return;
+    }
+
+    // The server applies this device's saved view filter and dismissals, so only the search goes in the URL
+    const params = new URLSearchParams({ visible: 'true' });
+    const search = new URL(window.location).searchParams.get('search');
+    if (search) {
+        params.set('search', search);
+    }
+    saveViewOnServer().then(() => {
+        window.location.href = '/export/csv?' + params.toString();
+    });
+}
+
+
+// Delta sync: patch new and removed permits into the page instead of reloading it
+function escapeHtml(value) {
+    return String(value == null ? '' : value)
+        .replace(/&/g, '&amp;')
+        .replace(/</g, '&lt;')
+        .replace(/>/g, '&gt;')
+        .replace(/"/g, '&quot;')
+        .replace(/'/g, '&#39;');
+}
+
+function formatIssuedDate(isoDate) {
+    const [year, month, day] = isoDate.split('-');
+    return `${month}/${day}/${year}`;
+}
+
+function permitCardHtml(permit) {
+    return `
+        <div class="permit-card" data-permit-id="${permit.id}">
+            <div class="permit-header">
+                <span class="permit-county">${escapeHtml(permit.county)}</span>
+                <span class="permit-date">${formatIssuedDate(permit.date_issued)}</span>
+            </div>
+            <div class="permit-info">
+                <h3 class="truncate-2">${escapeHtml(permit.lease_name)}</h3>
+                <div class="permit-detail">
+                    <strong>Operator:</strong>
+                    <span class="truncate-1">${escapeHtml(permit.operator)}</span>
+                </div>
+                <div class="permit-detail">
+                    <strong>Well #:</strong>
+                    <span>${escapeHtml(permit.well_number)}</span>
+                </div>
+                <div class="permit-detail">
+                    <strong>API #:</strong>
+                    <span>${escapeHtml(permit.api_number)}</span>
+                </div>
+            </div>
+            <div class="permit-actions">
+                <a href="${escapeHtml(permit.rrc_link)}" target="_blank" class="btn btn-outline-primary btn-sm">
+                    🔗 Open Permit
+                </a>
+                <button class="btn btn-outline-danger btn-sm" onclick="dismissPermit(${permit.id})">
+                    ❌ Dismiss
+                </button>
+            </div>
+        </div>`;
+}
+
+function countySection(container, county) {
+    const sections = Array.from(container.querySelectorAll('.county-section'));
+    const existing = sections.find(section => section.getAttribute('data-county') === county);
+    if (existing) {
+        return existing;
+    }
+
+    const section = document.createElement('div');
+    section.className = 'county-section';
+    section.setAttribute('data-county', county);
+    section.innerHTML = `
+        <div class="county-header">
+            <h2 class="county-title">${escapeHtml(county)}</h2>
+            <div class="county-menu">
+                <button class="btn btn-outline-secondary btn-sm">
+                    ⋯ Dismiss County
+                </button>
+            </div>
+        </div>
+        <div class="permits-grid"></div>
+        <div class="county-empty-state" style="display: none;">
+            <h3>📋 No new permits</h3>
+            <p>No new permits in ${escapeHtml(county)}.</p>
+        </div>`;
+    section.querySelector('.county-menu button').addEventListener('click', () => dismissCounty(county));
+
+    // Keep sections in county order
+    const next = sections.find(other => other.getAttribute('data-county') > county);
+    container.insertBefore(section, next || null);
+    return section;
+}
+
+function applyPermitChanges(container, changes) {
+    const live = container.getAttribute('data-live') === 'true';
+    let delta = 0;
+
+    changes.deleted.forEach(permitId => {
+        const card = container.querySelector(`.permit-card[data-permit-id="${permitId}"]`);
+        if (card) {
+            card.remove();
+            delta -= 1;
+        }
+    });
+
+    if (live) {
+        const viewCounties = getSet('viewFilterCounties');
+        const dismissedCounties = getSet('dismissedCountySet');
+
+        // Newest first: each insert goes to the top of its county
+        changes.inserted.forEach(permit => {
+            if (container.querySelector(`.permit-card[data-permit-id="${permit.id}"]`)) {
+                return;
+            }
+            // Same view filter the server applied to the rest of the page
+            if (dismissedCounties.has(permit.county) || (viewCounties.size > 0 && !viewCounties.has(permit.county))) {
+                return;
+            }
+            const grid = countySection(container, permit.county).querySelector('.permits-grid');
+            grid.insertAdjacentHTML('afterbegin', permitCardHtml(permit));
+            delta += 1;
+        });
+    }
+
+    adjustTotalPermits(delta);
+}
+
+function adjustTotalPermits(delta) {
+    const total = document.getElementById('total-permits');
+    if (total && delta) {
+        const count = parseInt(total.getAttribute('data-count'), 10) + delta;
+        total.setAttribute('data-count', count);
+        total.textContent = count + ' permits';
+    }
+}
+
+let permitSyncInFlight = false;
+
+function syncPermitChanges() {
+    const container = document.getElementById('permits-container');
+    if (!container || permitSyncInFlight) {
+        return;
+    }
+    permitSyncInFlight = true;
+
+    const step = () => fetch(`/api/permits/changes?since=${container.getAttribute('data-version')}`)
+        .then(response => response.json())
+        .then(changes => {
+            if (changes.reset) {
+                location.reload();
+                return;
+            }
+            applyPermitChanges(container, changes);
+            container.setAttribute('data-version', changes.version);
+            if (changes.more) {
+                return step();
+            }
+            applyViewFilters();
+        });
+
+    step()
+        .catch(error => console.error('Error syncing permits:', error))
+        .finally(() => { permitSyncInFlight = false; });
+}
+
+function applyStatus(data) {
+    document.getElementById('scraping-status').textContent = data.is_running ? 'Updating...' : 'Completed';
+
+    // Format the last run time properly (already formatted on server with timezone)
+    if (data.last_run) {
+        document.getElementById('last-run').textContent = data.last_run;
+    } else {
+        document.getElementById('last-run').textContent = 'Never';
+    }
+
+    document.getElementById('last-count').textContent = data.last_count + ' permits';
+}
+
+let lastStatusRun = undefined;
+let statusPollTimer = null;
+
+// Fallback when event streams are unavailable: poll status every 10 seconds
+function startStatusPolling() {
+    if (statusPollTimer) {
+        return;
+    }
+    statusPollTimer = setInterval(() => {
+        fetch('/api/status')
+        .then(response => response.json())
+        .then(data => {
+            applyStatus(data);
+
+            // Pull in the permits from a scrape that finished since the last poll
+            if (!data.is_running && lastStatusRun !== undefined && data.last_run !== lastStatusRun) {
+                syncPermitChanges();
+            }
+            if (!data.is_running) {
+                lastStatusRun = data.last_run;
+            }
+        })
+        .catch(error => console.error('Error updating status:', error));
+    }, 10000);
+}
+
+// Live updates: the server pushes status changes and new change versions
+function startEventStream() {
+    if (!window.EventSource) {
+        startStatusPolling();
+        return;
+    }
+
+    const events = new EventSource('/api/events');
+    events.addEventListener('status', event => applyStatus(JSON.parse(event.data)));
+    events.addEventListener('permits', event => {
+        const container = document.getElementById('permits-container');
+        const { version } = JSON.parse(event.data);
+        if (container && String(version) !== container.getAttribute('data-version')) {
+            syncPermitChanges();
+        }
+    });
+    events.onerror = () => {
+        // The browser reconnects by itself unless the server refused the stream
+        if (events.readyState === EventSource.CLOSED) {
+            startStatusPolling();
+        }
+    };
+}
+
+startEventStream();
+
+// Theme toggle functionality
+function toggleTheme() {
+    const body = document.body;
+    const themeIcon = document.getElementById('theme-icon');
+    const currentTheme = body.getAttribute('data-theme');
+
+    if (currentTheme === 'dark') {
+        body.setAttribute('data-theme', 'light');
+        themeIcon.innerHTML = '<circle cx="12" cy="12" r="5"/><path d="M12 1v2M12 21v2M4.22 4.22l1.42 1.42M18.36 18.36l1.42 1.42M1 12h2M21 12h2M4.22 19.78l1.42-1.42M18.36 5.64l1.42-1.42"/>';
+        localStorage.setItem('theme', 'light');
+    } else {
+        body.setAttribute('data-theme', 'dark');
+        themeIcon.innerHTML = '<path d="M21 12.79A9 9 0 1 1 11.21 3 7 7 0 0 0 21 12.79z"/>';
+        localStorage.setItem('theme', 'dark');
+    }
+}
+
+// Load saved theme on page load
+document.addEventListener('DOMContentLoaded', function() {
+    const savedTheme = localStorage.getItem('theme') || 'light';
+    const body = document.body;
+    const themeIcon = document.getElementById('theme-icon');
+
+    body.setAttribute('data-theme', savedTheme);
+
+    if (savedTheme === 'dark') {
+        themeIcon.innerHTML = '<path d="M21 12.79A9 9 0 1 1 11.21 3 7 7 0 0 0 21 12.79z"/>';
+    }
+
+    // Initialize localStorage
+    initializeStorage();
+
+    // Update monitoring count display
+    updateMonitoringCount();
+
+    // Apply view filters on page load
+    applyViewFilters();
+    syncViewWithServer();
+
+    // Initialize push notifications
+    initializePushNotifications();
+});
+
+function updateMonitoringCount() {
+    const monitorCounties = getSet('monitorCounties');
+    const countText = monitorCounties.size === 0 ? 'All counties' : `${monitorCounties.size} counties`;
+    document.getElementById('monitoring-count-text').textContent = countText;
+}
+
+// Device management
+function getOrCreateDeviceId() {
+    let deviceId = localStorage.getItem('deviceId');
+    if (!deviceId) {
+        deviceId = 'device_' + Math.random().toString(36).substr(2, 9) + '_' + Date.now();
+        localStorage.setItem('deviceId', deviceId);
+    }
+    return deviceId;
+}
+
+// iOS detection
+function isIOS() {
+    return /iPad|iPhone|iPod/.test(navigator.userAgent);
+}
+
+function isStandalone() {
+    return window.navigator.standalone === true;
+}
+
+function showIOSBanner() {
+    if (isIOS() && !isStandalone()) {
+        const banner = document.createElement('div');
+        banner.id = 'ios-banner';
+        banner.style.cssText = `
+            position: fixed;
+            top: 0;
+            left: 0;
+            right: 0;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            padding: 12px;
+            text-align: center;
+            font-size: 14px;
+            z-index: 10000;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.2);
+        `;
+        banner.innerHTML = `
+            📱 Add to Home Screen to receive notifications
+            <button onclick="this.parentElement.remove()" style="margin-left: 10px; background: rgba(255,255,255,0.2); border: none; color: white; padding: 4px 8px; border-radius: 4px;">✕</button>
+        `;
+        document.body.appendChild(banner);
+
+        // Adjust body padding to account for banner
+        document.body.style.paddingTop = '60px';
+    }
+}
+
+// Push notification functions
+let isSubscribed = false;
+// Service worker registration is handled in subscribeUser()
+
+function urlBase64ToUint8Array(base64String) {
+    const padding = '='.repeat((4 - base64String.length % 4) % 4);
+    const base64 = (base64String + padding)
+        .replace(/-/g, '+')
+        .replace(/_/g, '/');
+
+    const rawData = window.atob(base64);
+    const outputArray = new Uint8Array(rawData.length);
+
+    for (let i = 0; i < rawData.length; ++i) {
+        outputArray[i] = rawData.charCodeAt(i);
+    }
+    return outputArray;
+}
+
+function arrayBufferToBase64(buffer) {
+    const bytes = new Uint8Array(buffer);
+    let binary = '';
+    for (let i = 0; i < bytes.byteLength; i++) {
+        binary += String.fromCharCode(bytes[i]);
+    }
+    return window.btoa(binary);
+}
+
+function updateSubscriptionOnServer(subscription, keys) {
+    console.log('Sending subscription to server:', subscription);
+    console.log('Keys being sent:', keys);
+
+    const deviceId = getOrCreateDeviceId();
+    const preferences = {
+        monitorCounties: Array.from(getSet('monitorCounties')),
+        dismissedCountySet: Array.from(getSet('dismissedCountySet')),
+        dismissedPermitSet: Array.from(getSet('dismissedPermitSet')),
+        viewFilterCounties: Array.from(getSet('viewFilterCounties'))
+    };
+
+    const payload = {
+        deviceId: deviceId,
+        endpoint: subscription.endpoint,
+        keys: keys,
+        preferences: preferences
+    };
+
+    console.log('Payload being sent:', payload);
+    console.log('Payload keys:', payload.keys);
+
+    return fetch('/api/push/subscribe', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(payload)
+    });
+}
+
+function updatePreferencesOnServer() {
+    const deviceId = getOrCreateDeviceId();
+    const preferences = {
+        monitorCounties: Array.from(getSet('monitorCounties')),
+        dismissedCountySet: Array.from(getSet('dismissedCountySet')),
+        dismissedPermitSet: Array.from(getSet('dismissedPermitSet')),
+        viewFilterCounties: Array.from(getSet('viewFilterCounties'))
+    };
+
+    return fetch('/api/push/prefs', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            deviceId: deviceId,
+            preferences: preferences
+        })
+    });
+}
+
+async function unsubscribeUser() {
+    try {
+        // Get the service worker registration
+        const registration = await navigator.serviceWorker.ready;
+        const subscription = await registration.pushManager.getSubscription();
+
+        if (subscription) {
+            await subscription.unsubscribe();
+
+            // Send unsubscribe request to server
+            await fetch('/api/push/unsubscribe', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({
+                    endpoint: subscription.endpoint
+                })
+            });
+        }
+
+        console.log('User is unsubscribed.');
+        isSubscribed = false;
+        updateBtn();
+
+    } catch (error) {
+        console.log('Error unsubscribing', error);
+    }
+}
+
+async function subscribeUser() {
+    console.log('Attempting to subscribe user...');
+
+    try {
+        // Check if service worker and push are supported
+        if (!('serviceWorker' in navigator) || !('PushManager' in window)) {
+            alert('Push notifications not supported in this browser');
+            return;
+        }
+
+        // 1) Register service worker at root path
+        let reg;
+        try {
+            reg = await navigator.serviceWorker.register('/sw.js', { scope: '/' });
+            await navigator.serviceWorker.ready; // ensure active
+            console.log('Service worker registered and ready');
+        } catch (e) {
+            console.error('SW register failed', e);
+            alert('Could not register service worker.');
+            return;
+        }
+
+        // 2) Ask permission
+        const perm = await Notification.requestPermission();
+        if (perm !== 'granted') {
+            alert('Notifications not allowed');
+            return;
+        }
+
+        // 3) Get public key
+        const response = await fetch('/api/vapid-public-key');
+        const data = await response.json();
+        if (!data.publicKey) {
+            alert('Public key missing on server');
+            return;
+        }
+        console.log('Received public key from server');
+
+        // 4) Subscribe using the ready service worker
+        const ready = await navigator.serviceWorker.ready;
+        const subscription = await ready.pushManager.subscribe({
+            userVisibleOnly: true,
+            applicationServerKey: urlBase64ToUint8Array(data.publicKey)
+        });
+
+        console.log('User is subscribed:', subscription);
+
+        // Extract keys using getKey() method
+        const p256dh = subscription.getKey('p256dh');
+        const auth = subscription.getKey('auth');
+
+        console.log('p256dh key:', p256dh);
+        console.log('auth key:', auth);
+
+        // Convert ArrayBuffer to base64 string
+        const p256dhBase64 = p256dh ? arrayBufferToBase64(p256dh) : '';
+        const authBase64 = auth ? arrayBufferToBase64(auth) : '';
+
+        console.log('p256dh base64:', p256dhBase64);
+        console.log('auth base64:', authBase64);
+
+        // Create keys object
+        const keys = {
+            p256dh: p256dhBase64,
+            auth: authBase64
+        };
+
+        console.log('Keys object:', keys);
+
+        // 5) Send subscription to server
+        const serverResponse = await updateSubscriptionOnServer(subscription, keys);
+        console.log('Server response:', serverResponse);
+
+        if (serverResponse.ok) {
+            isSubscribed = true;
+            updateBtn();
+            console.log('Successfully subscribed!');
+            alert('Notifications enabled on this device.');
+        } else {
+            console.error('Server subscription failed:', serverResponse);
+            throw new Error('Server subscription failed');
+        }
+
+    } catch (err) {
+        console.log('Failed to subscribe the user:', err);
+        alert('Failed to enable notifications. Please try again.');
+    }
+}
+
+function updateBtn() {
+    const btn = document.getElementById('notificationBtn');
+    const testBtn = document.getElementById('testNotificationBtn');
+
+    if (isSubscribed) {
+        btn.textContent = '🔕 Disable Notifications';
+        btn.onclick = unsubscribeUser;
+        // Show test button in debug mode
+        if (testBtn) {
+            testBtn.style.display = 'inline-flex';
+        }
+    } else {
+        btn.textContent = '🔔 Enable Notifications';
+        btn.onclick = subscribeUser;
+        // Hide test button when not subscribed
+        if (testBtn) {
+            testBtn.style.display = 'none';
+        }
+    }
+}
+
+async function toggleNotifications() {
+    if (isSubscribed) {
+        unsubscribeUser();
+    } else {
+        await subscribeUser();
+    }
+}
+
+function sendTestNotification() {
+    const deviceId = getOrCreateDeviceId();
+
+    fetch('/api/push/test', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ deviceId: deviceId })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            alert('Test notification sent!');
+        } else {
+            alert('Failed to send test notification: ' + data.error);
+        }
+    })
+    .catch(error => {
+        console.error('Error sending test notification:', error);
+        alert('Error sending test notification');
+    });
+}
+
+function initializePushNotifications() {
+    // Show iOS banner if needed
+    showIOSBanner();
+
+    // Always show the notification button initially
+    const btn = document.getElementById('notificationBtn');
+    if (btn) {
+        btn.style.display = 'inline-flex';
+        btn.style.visibility = 'visible';
+        console.log('Notification button made visible');
+    } else {
+        console.error('Notification button not found!');
+    }
+
+    // Check if push notifications are available on the server
+    fetch('/api/vapid-public-key')
+    .then(response => {
+        if (!response.ok) {
+            console.warn('Push notifications not available on server, but showing button anyway');
+            // Don't hide the button - let user try anyway
+            return;
+        }
+
+        if ('serviceWorker' in navigator && 'PushManager' in window) {
+            console.log('Service Worker and Push is supported');
+            // Service worker will be registered when user clicks Enable Notifications
+        } else {
+            console.warn('Push messaging is not supported, but showing button anyway');
+            // Don't hide the button - let user try anyway
+        }
+    })
+    .catch(function(error) {
+        console.warn('Failed to check push notification availability, but showing button anyway:', error);
+        // Don't hide the button - let user try anyway
+    });
+}
@@ -0,0 +1,52 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Point the app at a throwaway database and keep the scraper from starting on import
+_db_dir = tempfile.mkdtemp(prefix='permits-tests-')
+os.environ.setdefault('PERMITS_DATABASE_URI', f"sqlite:///{os.path.join(_db_dir, 'permits.db')}")
+os.environ['SCRAPE_SCHEDULER'] = 'false'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as permits_app  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+@pytest.fixture
+def app_context():
+    with permits_app.app.app_context():
+        yield permits_app
+        permits_app.db.session.rollback()
+        for table in reversed(permits_app.db.metadata.sorted_tables):
+            permits_app.db.session.execute(table.delete())
+        permits_app.db.session.commit()
+
+
+@pytest.fixture
+def client(app_context):
+    return permits_app.app.test_client()
+
+
+@pytest.fixture
+def make_permits(app_context):
+    """Insert permits through the ingest path; returns them in insert order"""
+    def make(count, date_issued=None, **overrides):
+        rows = []
+        for i in range(count):
+            row = {
+                'county': ['ANDREWS', 'WARD', 'REEVES'][i % 3],
+                'operator': f'Operator {i % 2}',
+                'lease_name': f'Lease {make.serial}',
+                'well_number': str(i),
+                'api_number': f'42-{make.serial:05d}',
+                'rrc_link': f'https://example.test/{make.serial}',
+            }
+            row.update(overrides)
+            rows.append(row)
+            make.serial += 1
+        return permits_app.insert_new_permits(rows, date_issued or permits_app.date.today())
+    make.serial = 0
+    return make
@@ -0,0 +1,65 @@
+from datetime import date, datetime
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from conftest import permits_app
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 16, 13, 45, 2, 123456)
+    cursor = permits_app.encode_permit_cursor(created_at, 42)
+    assert permits_app.decode_permit_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize('cursor', ['', 'nonsense', '2026-10-16T13:45:02', '2026-10-16T13:45:02,x'])
+def test_bad_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        permits_app.decode_permit_cursor(cursor)
+
+
+def filtered_ids(**args):
+    query = permits_app.filter_permits(permits_app.Permit.query, MultiDict(args))
+    return sorted(permit.id for permit in query)
+
+
+def test_filter_permits(make_permits):
+    old = make_permits(3, date_issued=date(2026, 10, 1))
+    new = make_permits(3, date_issued=date(2026, 10, 15), operator='ACME OIL & GAS')
+    ids = lambda permits: sorted(permit.id for permit in permits)
+
+    assert filtered_ids(county='andrews,Ward') == ids([old[0], old[1], new[0], new[1]])
+    assert filtered_ids(exclude_county='WARD', exclude_id=str(old[0].id)) == ids([old[2], new[0], new[2]])
+    assert filtered_ids(operator='acme oil') == ids(new)
+    assert filtered_ids(date_from='2026-10-02') == ids(new)
+    assert filtered_ids(date_to='2026-10-01') == ids(old)
+
+
+@pytest.mark.parametrize('args', [
+    {'date_from': '10/01/2026'}, {'since': 'yesterday'}, {'exclude_id': 'abc'}
+])
+def test_filter_permits_rejects_bad_input(app_context, args):
+    with pytest.raises(ValueError):
+        filtered_ids(**args)
+
+
+def test_unpaged_request_returns_every_permit(client, make_permits, monkeypatch):
+    monkeypatch.setattr(permits_app, 'API_PERMITS_PAGE_SIZE', 2)
+    make_permits(5)
+    resp = client.get('/api/permits')
+    assert len(resp.get_json()) == 5
+    assert 'X-Next-Cursor' not in resp.headers
+
+
+def test_keyset_pages_cover_every_permit_once(client, make_permits):
+    permits = make_permits(5)
+    seen = []
+    url = '/api/permits?limit=2&fields=id'
+    for _ in range(5):
+        resp = client.get(url)
+        seen.extend(row['id'] for row in resp.get_json())
+        if 'X-Next-Cursor' not in resp.headers:
+            break
+        url = f"/api/permits?limit=2&fields=id&after={resp.headers['X-Next-Cursor']}"
+    assert seen == [permit.id for permit in reversed(permits)]
+
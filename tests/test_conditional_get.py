@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from werkzeug.http import http_date
+
+from conftest import permits_app
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Pin DataVersion.current_second(); advance with clock.tick()"""
+    class Clock:
+        # Ahead of any modified_at the app has already recorded
+        now = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(hours=1)
+
+        def tick(self, seconds=1):
+            self.now += timedelta(seconds=seconds)
+
+    fake = Clock()
+    monkeypatch.setattr(permits_app.DataVersion, 'current_second', staticmethod(lambda: fake.now))
+    return fake
+
+
+def test_data_version_last_modified_never_runs_ahead_of_the_clock(clock):
+    version = permits_app.DataVersion()
+    for _ in range(3):
+        version.bump()
+        assert version.modified_at == clock.now
+    clock.tick()
+    version.bump()
+    assert version.modified_at == clock.now
+
+
+def test_real_clock_last_modified_is_whole_seconds_and_not_in_the_future():
+    version = permits_app.DataVersion()
+    version.bump()
+    assert version.modified_at.microsecond == 0
+    assert version.modified_at <= datetime.now(timezone.utc)
+
+
+def test_if_modified_since_sees_writes_within_the_same_second(client, make_permits, clock):
+    make_permits(1)
+    permits_app.data_version.bump()
+    written = permits_app.data_version.modified_at
+
+    # Still in the second of the write: no Last-Modified, and If-Modified-Since is not trusted
+    resp = client.get('/api/permits')
+    assert 'Last-Modified' not in resp.headers
+    assert client.get('/api/permits', headers={'If-Modified-Since': http_date(written)}).status_code == 200
+
+    clock.tick()
+    first = client.get('/api/permits')
+    last_modified = first.headers['Last-Modified']
+    assert client.get('/api/permits', headers={'If-Modified-Since': last_modified}).status_code == 304
+
+    make_permits(1)
+    permits_app.data_version.bump()
+    resp = client.get('/api/permits', headers={'If-Modified-Since': last_modified})
+    assert resp.status_code == 200
+    assert len(resp.get_json()) == 2
+
+
+def test_etag_revalidation(client, make_permits):
+    make_permits(1)
+    etag = client.get('/api/permits').headers['ETag']
+    assert client.get('/api/permits', headers={'If-None-Match': etag}).status_code == 304
+    permits_app.data_version.bump()
+    assert client.get('/api/permits', headers={'If-None-Match': etag}).status_code == 200
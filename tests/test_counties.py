@@ -0,0 +1,33 @@
+import pytest
+
+from conftest import permits_app
+
+
+@pytest.mark.parametrize('raw, expected', [
+    ('ANDREWS', 'ANDREWS'),
+    ('Andrews', 'ANDREWS'),
+    ('  andrews  county ', 'ANDREWS'),
+    ('ANDREWS COUNTY', 'ANDREWS'),
+    ('Val  Verde', 'VAL VERDE'),
+    # Aliases for RRC spellings
+    ('DE WITT', 'DEWITT'),
+    ('De Witt County', 'DEWITT'),
+    ('THROCKMORTON', 'THROCK MORTON'),
+    ('LASALLE', 'LA SALLE'),
+    ('MC MULLEN', 'MCMULLEN'),
+    ('Mc Culloch', 'MCCULLOCH'),
+    # Compacted spellings (no spaces or punctuation)
+    ('DEWITT', 'DEWITT'),
+    ('TOMGREEN', 'TOM GREEN'),
+    ('McMullen', 'MCMULLEN'),
+    # Unknown names come back cleaned but unchanged
+    ('Nowhere County', 'NOWHERE'),
+    ('', ''),
+    (None, ''),
+])
+def test_normalize_county_name(raw, expected):
+    assert permits_app.normalize_county_name(raw) == expected
+
+
+def test_every_alias_targets_a_texas_county():
+    assert set(permits_app.COUNTY_ALIASES.values()) <= permits_app.TEXAS_COUNTY_SET
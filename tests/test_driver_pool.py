@@ -0,0 +1,45 @@
+import pytest
+
+from conftest import permits_app
+
+
+class FakeDriver:
+    def __init__(self, healthy=True):
+        self.healthy = healthy
+        self.quit_called = False
+
+    @property
+    def current_url(self):
+        if not self.healthy:
+            raise RuntimeError('browser is gone')
+        return 'about:blank'
+
+    def delete_all_cookies(self):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_failed_restart_after_health_check_frees_the_slot(monkeypatch):
+    pool = permits_app.ChromeDriverPool(size=1, checkout_timeout=0.1)
+    dead = FakeDriver(healthy=False)
+    pool._idle.append(permits_app.PooledDriver(dead))
+    pool._created = 1
+
+    def chrome_fails_to_start():
+        raise RuntimeError('chrome did not start')
+
+    monkeypatch.setattr(permits_app, '_create_chrome_driver', chrome_fails_to_start)
+    with pytest.raises(RuntimeError):
+        with pool.checkout():
+            pass
+    assert dead.quit_called
+    assert pool._created == 0
+
+    # The slot is usable again instead of timing out
+    monkeypatch.setattr(permits_app, '_create_chrome_driver', FakeDriver)
+    with pool.checkout() as pooled:
+        assert pooled.is_healthy()
+    assert pool._created == 1
+    assert len(pool._idle) == 1
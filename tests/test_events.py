@@ -0,0 +1,55 @@
+from werkzeug.test import EnvironBuilder
+
+from conftest import permits_app
+
+
+def test_slow_client_queue_stays_bounded():
+    broadcaster = permits_app.EventBroadcaster(max_streams=2, queue_size=3)
+    events = broadcaster.subscribe()
+    for version in range(10):
+        broadcaster.publish('permits', {'version': version})
+
+    assert events.qsize() == 3
+    assert events.get_nowait() == 'event: permits\ndata: {"version": 7}\n\n'
+
+
+def test_streams_over_the_cap_are_refused_until_one_closes():
+    broadcaster = permits_app.EventBroadcaster(max_streams=1)
+    events = broadcaster.subscribe()
+    assert broadcaster.subscribe() is None
+
+    stream = broadcaster.stream(events)
+    next(stream)
+    stream.close()
+    assert broadcaster.subscribe() is not None
+
+
+def test_stream_sends_heartbeats_when_idle(monkeypatch):
+    monkeypatch.setattr(permits_app, 'EVENTS_HEARTBEAT', 0.01)
+    broadcaster = permits_app.EventBroadcaster()
+    stream = broadcaster.stream(broadcaster.subscribe(), initial=['event: status\ndata: {}\n\n'])
+
+    assert next(stream).startswith('retry:')
+    assert next(stream) == 'event: status\ndata: {}\n\n'
+    assert next(stream) == ': heartbeat\n\n'
+    stream.close()
+
+
+def test_events_endpoint_refuses_streams_past_the_cap(client, monkeypatch):
+    monkeypatch.setattr(permits_app.event_broadcaster, 'max_streams', 0)
+    assert client.get('/api/events').status_code == 503
+
+
+def test_dropped_stream_that_never_started_releases_its_slot(app_context, monkeypatch):
+    broadcaster = permits_app.EventBroadcaster(max_streams=1)
+    monkeypatch.setattr(permits_app, 'event_broadcaster', broadcaster)
+    statuses = []
+
+    # Call the WSGI app directly: the test client would read the first chunk
+    environ = EnvironBuilder('/api/events').get_environ()
+    app_iter = permits_app.app(environ, lambda status, headers: statuses.append(status))
+    assert statuses == ['200 OK']
+    assert broadcaster.subscribe() is None
+
+    app_iter.close()  # The server gives up before a single chunk was read
+    assert broadcaster.subscribe() is not None
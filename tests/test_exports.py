@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+
+import pytest
+
+from conftest import permits_app
+
+
+def csv_rows(resp):
+    return list(csv.DictReader(io.StringIO(resp.get_data(as_text=True))))
+
+
+def test_csv_export_streams_every_permit(client, make_permits):
+    make_permits(5)
+    resp = client.get('/export/csv')
+    assert resp.status_code == 200
+    assert resp.is_streamed
+    assert resp.headers['Content-Disposition'].endswith('_all.csv')
+    assert len(csv_rows(resp)) == 5
+
+
+def test_csv_export_applies_filters(client, make_permits):
+    make_permits(6)
+    resp = client.get('/export/csv?county=WARD&visible=false')
+    assert resp.headers['Content-Disposition'].endswith('_visible.csv')
+    assert {row['County'] for row in csv_rows(resp)} == {'WARD'}
+
+
+def test_empty_filters_export_everything(client, make_permits):
+    make_permits(3)
+    resp = client.get('/export/csv?county=&fields=&visible=false')
+    assert resp.headers['Content-Disposition'].endswith('_all.csv')
+    assert len(csv_rows(resp)) == 3
+
+
+def test_visible_export_uses_the_saved_view(client, make_permits):
+    permits = make_permits(6)
+    dismissed = [permit.id for permit in permits if permit.county == 'ANDREWS'][0]
+    client.post('/api/view', json={'deviceId': 'device_test', 'preferences': {
+        'viewFilterCounties': ['ANDREWS', 'WARD'],
+        'dismissedCountySet': ['WARD'],
+        'dismissedPermitSet': [str(dismissed)],
+    }})
+
+    resp = client.get('/export/csv?visible=true')
+    assert resp.headers['Content-Disposition'].endswith('_visible.csv')
+    assert 'Cookie' in resp.headers['Vary']
+    rows = csv_rows(resp)
+    assert len(rows) == 1
+    assert rows[0]['County'] == 'ANDREWS'
+
+
+def test_visible_export_without_a_saved_view_exports_everything(client, make_permits):
+    make_permits(4)
+    resp = client.get('/export/csv?visible=true')
+    assert resp.headers['Content-Disposition'].endswith('_all.csv')
+    assert len(csv_rows(resp)) == 4
+
+
+def test_export_search_matches_the_index(client, make_permits):
+    make_permits(4)
+    resp = client.get('/export/csv?search=operator 1')
+    assert {row['Operator'] for row in csv_rows(resp)} == {'Operator 1'}
+
+
+def test_unknown_export_format(client):
+    assert client.get('/export/xlsx').status_code == 404
+
+
+def test_ndjson_export_matches_the_api_shape(client, make_permits):
+    make_permits(3)
+    resp = client.get('/export/ndjson?fields=id,county,date_issued')
+    lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert len(lines) == 3
+    assert all(set(line) == {'id', 'county', 'date_issued'} for line in lines)
+    assert lines == client.get('/api/permits?fields=id,county,date_issued').get_json()
+
+
+@pytest.mark.parametrize('export_format', ['arrow', 'parquet'])
+def test_columnar_exports_round_trip_as_dictionaries_grow(client, make_permits, monkeypatch, export_format):
+    pa = pytest.importorskip('pyarrow')
+    pq = pytest.importorskip('pyarrow.parquet')
+    # Two rows per batch: the first batch sees ANDREWS and WARD, later ones add REEVES
+    monkeypatch.setattr(permits_app, 'EXPORT_COLUMNAR_BATCH_SIZE', 2)
+    make_permits(7)
+    make_permits(1, operator='Late Operator', county='LOVING')
+
+    resp = client.get(f'/export/{export_format}?fields=id,county,operator,date_issued')
+    assert resp.status_code == 200
+    body = resp.get_data()
+    if export_format == 'arrow':
+        batches = list(pa.ipc.open_stream(body))
+        assert [batch.num_rows for batch in batches] == [2, 2, 2, 2]
+        table = pa.Table.from_batches(batches)
+    else:
+        table = pq.read_table(io.BytesIO(body))
+        assert pq.ParquetFile(io.BytesIO(body)).metadata.num_row_groups == 4
+    assert pa.types.is_dictionary(table.schema.field('county').type)
+
+    exported = sorted(table.to_pylist(), key=lambda row: row['id'])
+    expected = sorted(
+        client.get('/api/permits?fields=id,county,operator,date_issued').get_json(),
+        key=lambda row: row['id'],
+    )
+    assert [(row['id'], row['county'], row['operator'], row['date_issued'].isoformat()) for row in exported] == \
+        [(row['id'], row['county'], row['operator'], row['date_issued']) for row in expected]
+    assert {row['county'] for row in exported} == {'ANDREWS', 'WARD', 'REEVES', 'LOVING'}
@@ -0,0 +1,97 @@
+import os
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from conftest import FIXTURES, permits_app
+
+RRCFormSession = permits_app.RRCFormSession
+RESULTS_URL = 'https://webapps.rrc.state.tx.us/DP/publicQueryAction.do'
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+class FakeResponse:
+    def __init__(self, content, url):
+        self.content = content
+        self.url = url
+        self.headers = {'Content-Type': 'text/html; charset=UTF-8'}
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture
+def form_session(monkeypatch):
+    session = RRCFormSession()
+    monkeypatch.setattr(session.session, 'get', lambda url, timeout: FakeResponse(
+        read_fixture('rrc_query_form.html'), 'https://webapps.rrc.state.tx.us/DP/initializePublicQueryAction.do'
+    ))
+    return session.load()
+
+
+def test_load_captures_the_query_form(form_session):
+    assert form_session.action_url == 'https://webapps.rrc.state.tx.us/DP/publicQueryAction.do'
+    assert form_session.method == 'post'
+    assert form_session.fields == {
+        'searchArgs.paramValue': '|2=|3=|4=',
+        'pager.pageSize': '20',
+        'submitStart': '',
+        'submitEnd': '',
+        'searchArgs.districtCode': '',  # First option when none is selected
+        'searchArgs.statusCode': 'A',
+        'searchArgs.horizontal': 'H',  # Checked boxes only
+        'searchArgs.amended': 'N',
+        'searchArgs.remarks': 'none',
+    }
+
+
+def test_build_query_fills_the_dates_and_clicks_submit(form_session):
+    data = form_session.build_query('10/16/2026', '10/17/2026')
+
+    assert data['submitStart'] == '10/16/2026'
+    assert data['submitEnd'] == '10/17/2026'
+    assert data['submit'] == 'Submit'
+    assert 'reset' not in data and 'help' not in data
+    assert data['searchArgs.statusCode'] == 'A'
+    assert form_session.fields['submitStart'] == ''  # The captured defaults are left alone
+
+
+def test_submit_posts_the_query(form_session, monkeypatch):
+    posted = {}
+
+    def post(url, data, timeout):
+        posted.update(url=url, data=data)
+        return FakeResponse(read_fixture('rrc_results.html'), RESULTS_URL)
+
+    monkeypatch.setattr(form_session.session, 'post', post)
+    url, content, charset = form_session.submit('10/16/2026', '10/16/2026')
+
+    assert posted['url'] == form_session.action_url
+    assert posted['data'] == form_session.build_query('10/16/2026', '10/16/2026')
+    assert (url, charset) == (RESULTS_URL, 'UTF-8')
+    assert content == read_fixture('rrc_results.html')
+
+
+def test_pager_links_expand_to_every_page_in_offset_order():
+    links = RRCFormSession.page_urls(read_fixture('rrc_results_pager.html'), RESULTS_URL)
+    assert [RRCFormSession.page_offset(url) for url in links] == [20, 40, 60, 120]
+    assert all(url.startswith('https://webapps.rrc.state.tx.us/DP/publicQueryAction.do?') for url in links)
+
+    pages = RRCFormSession.expand_page_urls(links)
+    assert [RRCFormSession.page_offset(url) for url in pages] == [20, 40, 60, 80, 100, 120]
+    filled_in = parse_qs(urlparse(pages[3]).query)
+    assert filled_in == {'methodToCall': ['search'], 'pager.offset': ['80']}
+
+
+@pytest.mark.parametrize('links, offsets', [
+    ([], []),
+    ([RESULTS_URL + '?pager.offset=0'], []),  # Only the first page
+    ([RESULTS_URL + '?pager.offset=50', RESULTS_URL + '?pager.offset=25'], [25, 50]),
+    ([RESULTS_URL + '?pager.offset=40', RESULTS_URL + '?pager.offset=20&x=1'], [20, 40]),
+])
+def test_expand_page_urls_edge_cases(links, offsets):
+    assert [RRCFormSession.page_offset(url) for url in RRCFormSession.expand_page_urls(links)] == offsets
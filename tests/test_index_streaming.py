@@ -0,0 +1,30 @@
+from conftest import permits_app
+
+
+def test_head_is_sent_before_the_index_queries_run(app_context, make_permits, monkeypatch):
+    make_permits(3)
+    calls = []
+    index_context = permits_app._index_context
+    monkeypatch.setattr(permits_app, '_index_context', lambda: calls.append('context') or index_context())
+
+    with permits_app.app.test_request_context('/'):
+        stream = permits_app.stream_html(buffer_size=1024)
+        head = next(stream)
+        assert calls == []
+        assert head.startswith('<!DOCTYPE html>')
+        assert head.rstrip().endswith('</head>')
+        assert '/static/app.css?v=' in head
+
+        body = list(stream)
+        assert calls == ['context']
+        assert body[0].startswith('<body>')
+        assert len(body) > 1  # The rest arrives in buffer_size pieces
+        assert all(len(chunk) >= 1024 for chunk in body[:-1])
+
+
+def test_streamed_page_matches_the_rendered_page(client, make_permits, monkeypatch):
+    make_permits(4)
+    streamed = client.get('/')
+    monkeypatch.setattr(permits_app, 'INDEX_STREAMING', False)
+    rendered = client.get('/')
+    assert streamed.get_data(as_text=True) == rendered.get_data(as_text=True)
@@ -0,0 +1,64 @@
+import re
+
+from conftest import permits_app
+
+
+def listed_ids(html):
+    return {int(permit_id) for permit_id in re.findall(r'data-permit-id="(\d+)"', html)}
+
+
+def total(html):
+    return int(re.search(r'id="total-permits" data-count="(\d+)"', html).group(1))
+
+
+def save_view(client, **preferences):
+    resp = client.post('/api/view', json={'deviceId': 'device_test', 'preferences': preferences})
+    assert resp.status_code == 200
+    return resp
+
+
+def test_index_pages_and_counts_with_the_saved_view(client, make_permits, monkeypatch):
+    monkeypatch.setattr(permits_app, 'INDEX_PAGE_SIZE', 2)
+    permits = make_permits(9)  # Three each in ANDREWS, WARD and REEVES
+    by_county = {}
+    for permit in permits:
+        by_county.setdefault(permit.county, []).append(permit.id)
+
+    html = client.get('/').get_data(as_text=True)
+    assert total(html) == 9
+    assert 'data-view-synced="false"' in html
+
+    dismissed = by_county['ANDREWS'][0]
+    save_view(client, viewFilterCounties=['ANDREWS', 'WARD'], dismissedCountySet=['WARD'],
+              dismissedPermitSet=[str(dismissed), 'not-an-id'])
+
+    pages = [client.get(f'/?page={page}').get_data(as_text=True) for page in (1, 2)]
+    assert total(pages[0]) == 2
+    assert 'data-view-synced="true"' in pages[0]
+    assert listed_ids(pages[0]) == set(by_county['ANDREWS'][1:])
+    assert listed_ids(pages[1]) == listed_ids(pages[0])  # page is clamped to the last one
+
+
+def test_saving_the_view_invalidates_the_cached_index(client, make_permits):
+    make_permits(3)
+    first = client.get('/')
+    etag = first.headers['ETag']
+    assert 'Cookie' in first.headers['Vary']
+    assert client.get('/', headers={'If-None-Match': etag}).status_code == 304
+
+    save_view(client, dismissedCountySet=['WARD'])
+    assert client.get('/', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_view_requires_a_device(client):
+    assert client.post('/api/view', json={'preferences': {}}).status_code == 400
+
+
+def test_county_filter_lists_every_county_whatever_the_search(client, make_permits):
+    make_permits(3)
+    make_permits(1, county='LOVING', operator='Lone Operator')
+
+    html = client.get('/?search=lone').get_data(as_text=True)
+    assert total(html) == 1
+    listed = re.findall(r'id="view_county_([^"]+)"', html)
+    assert listed == ['ANDREWS', 'LOVING', 'REEVES', 'WARD']
@@ -0,0 +1,59 @@
+from datetime import date
+
+import pytest
+
+from conftest import permits_app
+
+db = permits_app.db
+
+
+def index_names():
+    return {index['name'] for index in db.inspect(db.engine).get_indexes('permits')}
+
+
+def add_raw_permit(api_number, lease_name, well_number, county='WARD'):
+    return db.session.execute(db.text(
+        "INSERT INTO permits (county, operator, lease_name, well_number, api_number, date_issued, rrc_link, created_at) "
+        "VALUES (:county, 'Operator', :lease_name, :well_number, :api_number, :day, '', :day)"
+    ), {'county': county, 'lease_name': lease_name, 'well_number': well_number,
+        'api_number': api_number, 'day': date(2026, 10, 16)}).lastrowid
+
+
+@pytest.fixture
+def table_without_natural_key(app_context):
+    """permits as created before ux_permits_natural_key; the index is put back afterwards"""
+    db.session.execute(db.text('DROP INDEX ux_permits_natural_key'))
+    db.session.commit()
+    assert 'ux_permits_natural_key' not in index_names()
+    yield
+    db.session.rollback()
+    db.session.execute(db.text('DELETE FROM permits'))
+    db.session.commit()
+    for index in permits_app.Permit.__table__.indexes:
+        index.create(db.engine, checkfirst=True)
+
+
+def test_duplicate_permits_are_removed_before_the_natural_key_index(table_without_natural_key):
+
+    first = add_raw_permit('42-00001', 'Lease A', '1')
+    repeat = add_raw_permit('42-00001', 'Lease A', '1')
+    other = add_raw_permit('42-00001', 'Lease A', '2')
+    second_repeat = add_raw_permit('42-00001', 'Lease A', '1', county='ANDREWS')
+    db.session.commit()
+
+    permits_app.migrate_database()
+
+    assert 'ux_permits_natural_key' in index_names()
+    assert sorted(permit.id for permit in permits_app.Permit.query) == [first, other]
+    changes = permits_app.PermitChange.query.order_by(permits_app.PermitChange.id).all()
+    assert [(change.permit_id, change.action) for change in changes] == [(repeat, 'delete'), (second_repeat, 'delete')]
+
+
+def test_migration_is_a_no_op_once_the_index_exists(app_context, make_permits):
+    make_permits(2)
+    changes = permits_app.PermitChange.query.count()
+
+    permits_app.migrate_database()
+
+    assert permits_app.Permit.query.count() == 2
+    assert permits_app.PermitChange.query.count() == changes
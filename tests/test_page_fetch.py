@@ -0,0 +1,84 @@
+import threading
+import time
+
+from conftest import permits_app
+
+
+class NoWait:
+    def wait(self, url):
+        pass
+
+
+def test_results_come_back_in_url_order_when_fetches_finish_out_of_order():
+    urls = [f'https://rrc.test/page?pager.offset={offset}' for offset in (20, 40, 60, 80)]
+    delays = dict(zip(urls, (0.2, 0.15, 0.1, 0.0)))
+    finished = []
+
+    def fetch(url):
+        time.sleep(delays[url])
+        finished.append(url)
+        return f'html for {url}'
+
+    results = permits_app.fetch_pages_concurrently(fetch, urls, workers=4, rate_limiter=NoWait())
+
+    assert finished == list(reversed(urls))
+    assert results == [(url, f'html for {url}', None) for url in urls]
+
+
+def test_failing_page_yields_its_error():
+    error = ConnectionError('reset by peer')
+
+    def fetch(url):
+        if url.endswith('40'):
+            raise error
+        return 'html'
+
+    urls = ['https://rrc.test/?pager.offset=20', 'https://rrc.test/?pager.offset=40', 'https://rrc.test/?pager.offset=60']
+    results = permits_app.fetch_pages_concurrently(fetch, urls, workers=2, rate_limiter=NoWait())
+
+    assert results[1] == (urls[1], None, error)
+    assert [html for _, html, _ in results] == ['html', None, 'html']
+
+
+def test_no_urls():
+    assert permits_app.fetch_pages_concurrently(lambda url: 'html', []) == []
+
+
+def test_rate_limiter_spaces_requests_to_one_host(monkeypatch):
+    clock = {'now': 100.0}
+    sleeps = []
+    monkeypatch.setattr(permits_app.time, 'monotonic', lambda: clock['now'])
+    monkeypatch.setattr(permits_app.time, 'sleep', sleeps.append)
+    limiter = permits_app.HostRateLimiter(0.25)
+
+    # Three requests to one host at the same moment get consecutive slots; another host is not held up
+    for url in ('https://rrc.test/?pager.offset=20', 'https://rrc.test/?pager.offset=40',
+                'https://other.test/', 'https://rrc.test/?pager.offset=60'):
+        limiter.wait(url)
+    assert sleeps == [0.25, 0.5]
+
+    # Once the interval has passed the next request goes straight out
+    clock['now'] += 1
+    limiter.wait('https://rrc.test/?pager.offset=80')
+    assert sleeps == [0.25, 0.5]
+
+
+def test_every_fetch_waits_for_the_rate_limiter_first():
+    events = []
+    lock = threading.Lock()
+
+    class RecordingLimiter:
+        def wait(self, url):
+            with lock:
+                events.append(('wait', url))
+
+    def fetch(url):
+        with lock:
+            assert ('wait', url) in events
+            events.append(('fetch', url))
+        return 'html'
+
+    urls = [f'https://rrc.test/?pager.offset={offset}' for offset in range(20, 120, 20)]
+    permits_app.fetch_pages_concurrently(fetch, urls, workers=3, rate_limiter=RecordingLimiter())
+    assert sorted(url for action, url in events if action == 'wait') == sorted(urls)
+    assert len(events) == 2 * len(urls)
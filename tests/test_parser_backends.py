@@ -0,0 +1,105 @@
+import os
+
+import pytest
+
+from conftest import FIXTURES, permits_app
+
+# Module each optional backend imports; html.parser is always there
+BACKEND_MODULES = {'html.parser': None, 'lxml': 'lxml.html', 'selectolax': 'selectolax.lexbor'}
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture(autouse=True)
+def clear_table_cache():
+    permits_app._results_table_cache.clear()
+    yield
+    permits_app._results_table_cache.clear()
+
+
+@pytest.fixture(params=list(permits_app.PARSER_BACKENDS))
+def backend(request):
+    if BACKEND_MODULES[request.param]:
+        pytest.importorskip(BACKEND_MODULES[request.param])
+    return permits_app.PARSER_BACKENDS[request.param]()
+
+
+def test_backend_matches_html_parser(backend):
+    html = read_fixture('rrc_results.html').decode('utf-8')
+    expected = permits_app.extract_results_rows(html, permits_app.SoupParserBackend())
+
+    columns, rows = expected
+    assert columns['county'] == 7
+    assert len(rows) == 5  # Four permits plus the footer row
+    assert rows[1][0][3] == 'DEVON ENERGY PRODUCTION CO, L.P. & AFFILIATES (216378)'
+    assert rows[1][1] == '/DP/drillDownQueryAction.do?univDocNo=496123457&fromPublicQuery=Y'
+    assert permits_app.extract_results_rows(html, backend) == expected
+
+
+def test_backend_agrees_using_cached_table_position(backend):
+    html = read_fixture('rrc_results.html').decode('utf-8')
+    first = permits_app.extract_results_rows(html, backend)
+    assert permits_app._results_table_cache[backend.name] is not None
+    assert permits_app.extract_results_rows(html, backend) == first
+
+
+def test_declared_encoding_is_honoured(backend):
+    raw = read_fixture('rrc_results_latin1.html')
+    from_bytes = permits_app.extract_results_rows(raw, backend, encoding='iso-8859-1')
+    from_text = permits_app.extract_results_rows(raw.decode('iso-8859-1'), backend)
+
+    assert from_bytes == from_text
+    cells = from_bytes[1][0][0]
+    assert cells[3] == 'PEÑA OPERATING, LLC (652001)'
+    assert cells[4] == 'SEÑORA RANCH ½'
+
+
+def test_backend_links_match_html_parser(backend):
+    raw = read_fixture('rrc_results.html')
+    expected = permits_app.SoupParserBackend().links(raw)
+    assert '/DP/initializePublicQueryAction.do' in expected
+    assert backend.links(raw) == expected
+    assert backend.links(raw.decode('utf-8')) == expected
+
+
+def test_read_permit_rows_maps_columns():
+    rows = permits_app.read_permit_rows(read_fixture('rrc_results.html').decode('utf-8'))
+
+    assert [row['county'] for row in rows] == ['ANDREWS', 'WARD', 'REEVES', 'MARTIN']
+    assert [row['status_no'] for row in rows] == [912345, 912346, 912340, 912339]
+    assert rows[0]['rrc_link'] == 'https://webapps.rrc.state.tx.us/DP/drillDownQueryAction.do?univDocNo=496123456&fromPublicQuery=Y'
+    assert rows[2]['rrc_link'].startswith('https://webapps.rrc.state.tx.us/DP/drillDownQueryAction.do?univDocNo=496123458')
+    assert rows[3]['rrc_link'].startswith('https://webapps.rrc.state.tx.us/DP/drillDownQueryAction.do?name=')
+
+
+class FakeResponse:
+    def __init__(self, content, content_type):
+        self.content = content
+        self.headers = {'Content-Type': content_type}
+        self.url = 'https://webapps.rrc.state.tx.us/DP/publicQueryAction.do'
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.mark.parametrize('content_type, charset', [
+    ('text/html; charset=ISO-8859-1', 'ISO-8859-1'),
+    ('text/html;charset="utf-8"', 'utf-8'),
+    ('text/html', None),  # Left to the page's meta charset, not requests' ISO-8859-1 default
+])
+def test_declared_charset(content_type, charset):
+    assert permits_app.RRCFormSession.declared_charset(FakeResponse(b'', content_type)) == charset
+
+
+def test_fetched_pages_are_parsed_from_bytes_in_the_declared_charset(monkeypatch):
+    raw = read_fixture('rrc_results_latin1.html')
+    session = permits_app.RRCFormSession()
+    monkeypatch.setattr(session.session, 'get', lambda url, timeout: FakeResponse(raw, 'text/html; charset=iso-8859-1'))
+
+    content, encoding = session.fetch('https://webapps.rrc.state.tx.us/DP/publicQueryAction.do?pager.offset=20')
+    assert content == raw
+    rows = permits_app.read_permit_rows(content, encoding)
+    assert rows[0]['operator'] == 'PEÑA OPERATING, LLC (652001)'
@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta
+
+from conftest import permits_app
+
+
+def change_ids():
+    return [change.id for change in permits_app.PermitChange.query.order_by(permits_app.PermitChange.id)]
+
+
+def test_change_ids_are_not_reused_after_pruning(app_context, make_permits, monkeypatch):
+    make_permits(3)
+    held = max(change_ids())
+
+    permits_app.PermitChange.query.update({'created_at': datetime.utcnow() - timedelta(days=30)})
+    permits_app.db.session.commit()
+    permits_app.prune_permit_changes()
+    assert change_ids() == []
+
+    make_permits(1)
+    assert min(change_ids()) > held
+
+
+def test_changes_since_a_version(client, make_permits):
+    first = make_permits(2)
+    version = client.get('/api/permits/changes?since=0').get_json()['version']
+    second = make_permits(1)
+    client.post(f'/api/dismiss/{first[0].id}')
+
+    changes = client.get(f'/api/permits/changes?since={version}').get_json()
+    assert [permit['id'] for permit in changes['inserted']] == [second[0].id]
+    assert changes['deleted'] == [first[0].id]
+    assert changes['more'] is False
+
+
+def test_changes_since_an_unknown_version_resets(client, make_permits):
+    make_permits(1)
+    assert client.get('/api/permits/changes?since=999').get_json()['reset'] is True
+    assert client.get('/api/permits/changes').status_code == 400
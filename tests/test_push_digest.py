@@ -0,0 +1,75 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from conftest import permits_app
+
+SUBSCRIPTION = SimpleNamespace(id=7, device_id='device-7', endpoint='https://push.example.test/7', p256dh='key', auth='auth')
+
+
+def permits(count, counties=('ANDREWS', 'WARD', 'REEVES', 'LOVING')):
+    return [{
+        'id': i, 'county': counties[i % len(counties)], 'operator': f'Operator {i}', 'lease_name': f'Lease {i}',
+        'well_number': str(i), 'api_number': f'42-{i:05d}', 'rrc_link': f'https://example.test/{i}'
+    } for i in range(count)]
+
+
+def test_single_permit_digest_names_the_permit():
+    dispatcher = permits_app.PushDispatcher(mode='digest')
+    [message] = dispatcher._messages_for(SUBSCRIPTION, permits(1))
+
+    assert message['title'] == 'New Permit in ANDREWS'
+    assert message['body'] == 'Operator 0 - Lease 0 #0'
+    assert message['url'] == 'https://example.test/0'
+    assert message['permit_count'] == 1
+    assert message['subscription_id'] == 7
+    assert message['subscription'] == {'endpoint': SUBSCRIPTION.endpoint, 'keys': {'p256dh': 'key', 'auth': 'auth'}}
+
+
+def test_multi_permit_digest_summarises_counties_and_leases():
+    dispatcher = permits_app.PushDispatcher(mode='digest')
+    [message] = dispatcher._messages_for(SUBSCRIPTION, permits(5))
+
+    assert message['title'] == '5 new permits in Andrews, Ward, Reeves +1 more'
+    assert message['body'] == 'Operator 0 - Lease 0 #0; Operator 1 - Lease 1 #1; Operator 2 - Lease 2 #2; +2 more'
+    assert message['url'] == '/'
+    assert message['permit_count'] == 5
+
+
+def test_digest_splits_at_the_max_batch_size():
+    dispatcher = permits_app.PushDispatcher(mode='digest', digest_max_batch=2)
+    messages = dispatcher._messages_for(SUBSCRIPTION, permits(5, counties=('WARD',)))
+
+    assert [message['permit_count'] for message in messages] == [2, 2, 1]
+    assert messages[0]['title'] == '2 new permits in Ward'
+    assert messages[2]['title'] == 'New Permit in WARD'
+
+
+def test_single_mode_sends_one_push_per_permit():
+    dispatcher = permits_app.PushDispatcher(mode='single', digest_max_batch=50)
+    messages = dispatcher._messages_for(SUBSCRIPTION, permits(3))
+    assert [message['permit_count'] for message in messages] == [1, 1, 1]
+
+
+def test_jobs_within_the_coalescing_window_are_merged():
+    dispatcher = permits_app.PushDispatcher(coalesce_window=0.3)
+    first, second, late = permits(3)
+    dispatcher._jobs.put([first])
+    threading.Timer(0.05, dispatcher._jobs.put, [[second]]).start()
+
+    started = time.monotonic()
+    batch, jobs = dispatcher._next_batch()
+    assert batch == [first, second] and jobs == 2
+    assert time.monotonic() - started >= 0.25  # Waited out the window after the first job
+
+    dispatcher._jobs.put([late])
+    assert dispatcher._next_batch() == ([late], 1)
+
+
+def test_no_coalescing_window_sends_each_job_alone():
+    dispatcher = permits_app.PushDispatcher(coalesce_window=0)
+    first, second = permits(2)
+    dispatcher._jobs.put([first])
+    dispatcher._jobs.put([second])
+    assert dispatcher._next_batch() == ([first], 1)
+    assert dispatcher._next_batch() == ([second], 1)
@@ -0,0 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import permits_app
+
+SubscriptionHealth = permits_app.SubscriptionHealth
+
+
+@pytest.mark.parametrize('success, status_code, expected', [
+    (True, 201, SubscriptionHealth.OK),
+    (False, 404, SubscriptionHealth.DEAD),
+    (False, 410, SubscriptionHealth.DEAD),
+    (False, 429, SubscriptionHealth.BACKOFF),
+    (False, 500, SubscriptionHealth.BACKOFF),
+    (False, 503, SubscriptionHealth.BACKOFF),
+    (False, None, SubscriptionHealth.BACKOFF),
+    (False, 400, SubscriptionHealth.REJECTED),
+    (False, 401, SubscriptionHealth.REJECTED),
+    (False, 403, SubscriptionHealth.REJECTED),
+    (False, 413, SubscriptionHealth.REJECTED),
+])
+def test_classify(success, status_code, expected):
+    assert SubscriptionHealth().classify(success, status_code) == expected
+
+
+def make_subscription(subscription_id, **fields):
+    return permits_app.DeviceSubscription(
+        id=subscription_id, device_id=f'device-{subscription_id}', endpoint=f'https://push.example.test/{subscription_id}',
+        p256dh='key', auth='auth', error_count=0, **fields
+    )
+
+
+def test_record_only_backs_off_transient_failures():
+    health = SubscriptionHealth(backoff_base=60, max_consecutive_errors=3)
+    ok, transient, rejected, dead = (make_subscription(i) for i in range(1, 5))
+    dead_ids = health.record([ok, transient, rejected, dead], {
+        1: (SubscriptionHealth.OK, None),
+        2: (SubscriptionHealth.BACKOFF, '503 Service Unavailable'),
+        3: (SubscriptionHealth.REJECTED, '403 Forbidden'),
+        4: (SubscriptionHealth.DEAD, '410 Gone'),
+    })
+
+    assert dead_ids == {4}
+    assert transient.error_count == 1 and transient.backoff_until is not None
+    assert rejected.error_count == 0 and rejected.backoff_until is None
+    assert rejected.last_error == '403 Forbidden'
+
+
+def message(subscription_id, title):
+    return {'subscription_id': subscription_id, 'device_id': f'device-{subscription_id}', 'title': title}
+
+
+@pytest.fixture
+def dispatcher():
+    dispatcher = permits_app.PushDispatcher(workers=2, max_attempts=3, retry_delay=0)
+    dispatcher._executor = ThreadPoolExecutor(max_workers=2)
+    yield dispatcher
+    dispatcher._executor.shutdown()
+
+
+def test_deliver_retries_transient_failures_only(dispatcher):
+    responses = {
+        'flaky': [(False, 503, 'unavailable'), (True, 201, None)],
+        'forbidden': [(False, 403, 'forbidden')],
+        'down': [(False, 500, 'error')] * 3,
+        'fine': [(True, 201, None)],
+    }
+    calls = []
+
+    def send(message):
+        calls.append(message['title'])
+        return responses[message['title']].pop(0)
+
+    dispatcher._send = send
+    outcomes, sent = dispatcher._deliver([
+        message(1, 'flaky'), message(2, 'forbidden'), message(3, 'down'), message(4, 'fine')
+    ])
+
+    assert calls.count('forbidden') == 1
+    assert calls.count('down') == 3
+    assert outcomes[1][0] == SubscriptionHealth.OK
+    assert outcomes[2][0] == SubscriptionHealth.REJECTED
+    assert outcomes[3] == (SubscriptionHealth.BACKOFF, 'error')
+    assert outcomes[4][0] == SubscriptionHealth.OK
+    assert sent == 2
+
+
+def test_deliver_keeps_the_worst_message_per_device(dispatcher):
+    responses = {'first': [(True, 201, None)], 'second': [(False, 503, 'unavailable')] * 3}
+    dispatcher._send = lambda message: responses[message['title']].pop(0)
+
+    outcomes, sent = dispatcher._deliver([message(1, 'first'), message(1, 'second')])
+
+    assert outcomes[1] == (SubscriptionHealth.BACKOFF, 'unavailable')
+    assert sent == 1
@@ -0,0 +1,124 @@
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import permits_app
+
+PREFS = {
+    1: None,
+    2: json.dumps({}),
+    3: json.dumps({'monitorCounties': ['ANDREWS', 'WARD']}),
+    4: json.dumps({'monitorCounties': ['WARD'], 'dismissedPermitSet': ['12']}),
+    5: json.dumps({'dismissedCountySet': ['REEVES']}),
+    6: json.dumps({'monitorCounties': ['REEVES'], 'dismissedCountySet': ['REEVES']}),
+    7: json.dumps({'dismissedPermitSet': ['10', '11']}),
+    8: '{not json',
+}
+
+PERMITS = [
+    {'id': permit_id, 'county': county}
+    for permit_id, county in enumerate(['ANDREWS', 'WARD', 'REEVES', 'LOVING', 'WARD', 'ANDREWS'], start=10)
+]
+
+
+def inline_recipients(subscriptions, permit):
+    """The per-device checks the monitor ran before the routing index existed"""
+    recipients = set()
+    for subscription in subscriptions:
+        try:
+            prefs = json.loads(subscription.prefs_json) if subscription.prefs_json else {}
+            monitor_counties = set(prefs.get('monitorCounties', []))
+            dismissed_counties = set(prefs.get('dismissedCountySet', []))
+            dismissed_permits = set(prefs.get('dismissedPermitSet', []))
+        except Exception:
+            continue
+        if permit['county'] in dismissed_counties:
+            continue
+        if str(permit['id']) in dismissed_permits:
+            continue
+        if monitor_counties and permit['county'] not in monitor_counties:
+            continue
+        recipients.add(subscription.id)
+    return recipients
+
+
+def test_index_routes_like_the_inline_checks():
+    subscriptions = [SimpleNamespace(id=subscription_id, prefs_json=prefs) for subscription_id, prefs in PREFS.items()]
+    index = permits_app.PushRoutingIndex()
+    index.sync(subscriptions)
+
+    assert set(index.invalid) == {8}
+    for permit in PERMITS:
+        assert index.route(permit) == inline_recipients(subscriptions, permit), permit
+
+
+def test_sync_reparses_only_changed_prefs(monkeypatch):
+    index = permits_app.PushRoutingIndex()
+    subscriptions = [SimpleNamespace(id=subscription_id, prefs_json=prefs) for subscription_id, prefs in PREFS.items()]
+    index.sync(subscriptions)
+
+    parsed = []
+    parse = index._parse
+    monkeypatch.setattr(index, '_parse', lambda prefs_json: parsed.append(prefs_json) or parse(prefs_json))
+    subscriptions[2].prefs_json = json.dumps({'monitorCounties': ['LOVING']})
+    index.sync(subscriptions[:-1])
+
+    assert parsed == [subscriptions[2].prefs_json]
+    assert 8 not in index.invalid
+    assert index.route({'id': 13, 'county': 'LOVING'}) == inline_recipients(subscriptions[:-1], {'id': 13, 'county': 'LOVING'})
+
+
+@pytest.fixture
+def fan_out(app_context, monkeypatch):
+    """Run PushDispatcher._fan_out against a fresh routing index, capturing the messages it would send"""
+    index = permits_app.PushRoutingIndex()
+    monkeypatch.setattr(permits_app, 'push_routing_index', index)
+    monkeypatch.setattr(permits_app.seen_permit_cache, 'claim', lambda keys: list(keys))
+    dispatcher = permits_app.PushDispatcher(mode='single')
+    sent = []
+    dispatcher._deliver = lambda messages: (sent.extend(messages), ({}, 0))[1]
+
+    def run(permits):
+        sent.clear()
+        dispatcher._fan_out(permits)
+        return {message['subscription_id'] for message in sent}
+
+    run.index = index
+    return run
+
+
+def add_subscription(subscription_id, prefs, **fields):
+    subscription = permits_app.DeviceSubscription(
+        id=subscription_id, device_id=f'device-{subscription_id}', endpoint=f'https://push.example.test/{subscription_id}',
+        p256dh='key', auth='auth', prefs_json=json.dumps(prefs), **fields
+    )
+    permits_app.db.session.add(subscription)
+    permits_app.db.session.commit()
+    return subscription
+
+
+def permit(permit_id, county):
+    return {'id': permit_id, 'county': county, 'operator': 'Operator', 'lease_name': f'Lease {permit_id}',
+            'well_number': '1', 'api_number': f'42-{permit_id:05d}', 'rrc_link': 'https://example.test'}
+
+
+def test_devices_backing_off_stay_indexed_but_are_not_sent_to(fan_out, monkeypatch):
+    add_subscription(1, {'monitorCounties': ['WARD']})
+    add_subscription(2, {'monitorCounties': ['WARD']}, backoff_until=datetime.utcnow() + timedelta(hours=1))
+
+    assert fan_out([permit(1, 'WARD')]) == {1}
+    assert set(fan_out.index._entries) == {1, 2}
+
+    parsed = []
+    parse = fan_out.index._parse
+    monkeypatch.setattr(fan_out.index, '_parse', lambda prefs_json: parsed.append(prefs_json) or parse(prefs_json))
+    assert fan_out([permit(2, 'WARD')]) == {1}
+    assert parsed == []  # Nothing changed, so nothing was re-parsed
+
+    subscription = permits_app.db.session.get(permits_app.DeviceSubscription, 2)
+    subscription.backoff_until = datetime.utcnow() - timedelta(seconds=1)
+    permits_app.db.session.commit()
+    assert fan_out([permit(3, 'WARD')]) == {1, 2}
+    assert parsed == []
@@ -0,0 +1,84 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import permits_app
+
+SeenPermit = permits_app.SeenPermit
+
+
+@pytest.fixture
+def cache(app_context):
+    return permits_app.SeenPermitCache(ttl_hours=1, chunk_size=2)
+
+
+def stored(app_context):
+    return {row.permit_no: row.expires_at for row in SeenPermit.query.all()}
+
+
+def test_claim_returns_unseen_keys_once(cache, app_context):
+    assert cache.claim(['a', 'b', 'a']) == ['a', 'b']
+    assert cache.claim(['a', 'c']) == ['c']
+
+    rows = stored(app_context)
+    assert set(rows) == {'a', 'b', 'c'}
+    # Naive UTC, an hour out, like the column's other readers expect
+    for expires_at in rows.values():
+        assert expires_at.tzinfo is None
+        assert abs(expires_at - (datetime.utcnow() + timedelta(hours=1))) < timedelta(minutes=1)
+
+
+def test_expiry_is_utc_whatever_the_local_zone(cache, app_context, monkeypatch):
+    monkeypatch.setenv('TZ', 'America/Chicago')
+    time.tzset()
+    try:
+        cache.claim(['a'])
+        expires_at = stored(app_context)['a']
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+    assert abs(expires_at - (datetime.utcnow() + timedelta(hours=1))) < timedelta(minutes=1)
+
+
+def test_expired_keys_are_claimed_again_and_renewed_in_place(cache, app_context):
+    cache.claim(['a', 'b', 'c'])
+    expired = datetime.utcnow() - timedelta(minutes=1)
+    cache._expiry['a'] = expired
+    SeenPermit.query.filter_by(permit_no='a').update({'expires_at': expired})
+    permits_app.db.session.commit()
+
+    assert cache.claim(['a', 'b']) == ['a']
+    assert stored(app_context)['a'] > datetime.utcnow()
+    assert SeenPermit.query.count() == 3
+
+
+def test_warm_loads_only_unexpired_rows(cache, app_context):
+    now = datetime.utcnow()
+    permits_app.db.session.add_all([
+        SeenPermit(permit_no='fresh', expires_at=now + timedelta(minutes=5)),
+        SeenPermit(permit_no='stale', expires_at=now - timedelta(minutes=5)),
+    ])
+    permits_app.db.session.commit()
+
+    cache.warm()
+    assert set(cache._expiry) == {'fresh'}
+    assert cache.claim(['fresh', 'stale']) == ['stale']
+
+
+def test_sweep_deletes_expired_and_undated_rows(cache, app_context):
+    cache.claim(['keep', 'drop'])
+    past = datetime.utcnow() - timedelta(seconds=1)
+    cache._expiry['drop'] = past
+    SeenPermit.query.filter_by(permit_no='drop').update({'expires_at': past})
+    permits_app.db.session.add(SeenPermit(permit_no='legacy', expires_at=None))
+    permits_app.db.session.commit()
+
+    assert cache.sweep() == 2
+    assert set(stored(app_context)) == {'keep'}
+    assert set(cache._expiry) == {'keep'}
+
+
+def test_sweeper_only_starts_with_the_scheduler():
+    # conftest sets SCRAPE_SCHEDULER=false, so importing the app started no sweeper
+    assert permits_app.seen_permit_cache._sweeper is None
@@ -0,0 +1,33 @@
+import hashlib
+import os
+import re
+
+from conftest import permits_app
+
+
+def test_index_links_fingerprinted_assets(client):
+    html = client.get('/').get_data(as_text=True)
+    for filename in ('app.css', 'app.js'):
+        with open(os.path.join(permits_app.app.static_folder, filename), 'rb') as f:
+            content = f.read()
+        version = hashlib.sha256(content).hexdigest()[:12]
+        url = f'/static/{filename}?v={version}'
+        assert url in html
+
+        resp = client.get(url)
+        assert resp.status_code == 200
+        assert resp.data == content
+        assert resp.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+        resp.close()
+
+
+def test_stale_fingerprint_is_not_cached_for_long(client):
+    resp = client.get('/static/app.js?v=000000000000')
+    assert resp.status_code == 200
+    assert 'immutable' not in resp.headers.get('Cache-Control', '')
+    resp.close()
+
+
+def test_index_page_has_no_inline_assets(client):
+    html = client.get('/').get_data(as_text=True)
+    assert not re.search(r'<style>|<script>\s*function', html)
@@ -0,0 +1,28 @@
+from datetime import date
+
+from sqlalchemy import event
+
+from conftest import permits_app
+
+
+def scraped_rows(count, start=0):
+    return [{
+        'county': 'WARD', 'operator': 'Operator', 'lease_name': f'Lease {i}', 'well_number': '1',
+        'api_number': f'42-{i:05d}', 'rrc_link': f'https://example.test/{i}', 'status_no': 900000 + i,
+        'status_date': '10/16/2026',
+    } for i in range(start, start + count)]
+
+
+def test_store_inserts_new_rows_without_counting_the_table(app_context):
+    statements = []
+    listen = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(permits_app.db.engine, 'before_cursor_execute', listen)
+    try:
+        first = permits_app.store_permit_rows(scraped_rows(3), date(2026, 10, 16))
+        again = permits_app.store_permit_rows(scraped_rows(4), date(2026, 10, 16))
+    finally:
+        event.remove(permits_app.db.engine, 'before_cursor_execute', listen)
+
+    assert len(first) == 3
+    assert [permit.lease_name for permit in again] == ['Lease 3']
+    assert not [statement for statement in statements if 'count(' in statement.lower()]
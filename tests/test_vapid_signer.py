@@ -0,0 +1,56 @@
+from conftest import permits_app
+
+
+class FakeVapid:
+    """Stands in for py_vapid's Vapid: records each signing"""
+
+    def __init__(self):
+        self.signed = []
+
+    def sign(self, claims):
+        self.signed.append(claims)
+        return {'Authorization': f"vapid t={claims['aud']}:{claims['exp']}", 'Crypto-Key': 'p256ecdsa=key'}
+
+
+def make_signer(monkeypatch, now):
+    clock = {'now': now}
+    monkeypatch.setattr(permits_app.time, 'time', lambda: clock['now'])
+    signer = permits_app.VapidSigner('unused', {'sub': 'mailto:test@example.test'}, token_ttl=3600, refresh_margin=600)
+    signer._vapid = FakeVapid()
+    return signer, clock
+
+
+def test_headers_are_cached_per_push_service(monkeypatch):
+    signer, _ = make_signer(monkeypatch, 1_000_000)
+
+    first = signer.headers_for('https://fcm.googleapis.com/fcm/send/device-a')
+    assert signer.headers_for('https://fcm.googleapis.com/fcm/send/device-b') == first
+    other = signer.headers_for('https://updates.push.services.mozilla.com/wpush/v2/device-c')
+
+    assert other != first
+    assert [claims['aud'] for claims in signer._vapid.signed] == [
+        'https://fcm.googleapis.com', 'https://updates.push.services.mozilla.com'
+    ]
+    assert signer._vapid.signed[0] == {'sub': 'mailto:test@example.test', 'aud': 'https://fcm.googleapis.com', 'exp': 1_003_600}
+
+
+def test_headers_are_resigned_near_expiry(monkeypatch):
+    signer, clock = make_signer(monkeypatch, 1_000_000)
+    endpoint = 'https://fcm.googleapis.com/fcm/send/device-a'
+    first = signer.headers_for(endpoint)
+
+    clock['now'] += 3600 - 601  # Just outside the refresh margin
+    assert signer.headers_for(endpoint) == first
+    assert len(signer._vapid.signed) == 1
+
+    clock['now'] += 1  # Within refresh_margin of expiry
+    refreshed = signer.headers_for(endpoint)
+    assert refreshed != first
+    assert signer._vapid.signed[-1]['exp'] == clock['now'] + 3600
+
+
+def test_callers_get_copies_of_the_cached_headers(monkeypatch):
+    signer, _ = make_signer(monkeypatch, 1_000_000)
+    endpoint = 'https://fcm.googleapis.com/fcm/send/device-a'
+    signer.headers_for(endpoint)['Authorization'] = 'tampered'
+    assert signer.headers_for(endpoint)['Authorization'].startswith('vapid t=')
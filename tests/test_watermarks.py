@@ -0,0 +1,123 @@
+import os
+from datetime import date, timedelta
+
+import pytest
+
+from conftest import FIXTURES, permits_app
+
+
+def rows(*status_numbers):
+    return [{'status_no': number, 'status_date': '10/16/2026'} for number in status_numbers]
+
+
+def test_advance_keeps_the_highest_status_number(app_context):
+    day = date(2026, 10, 16)
+    permits_app._advance_watermark(day, rows(912340, None, 912346, 912345))
+    watermark = permits_app.ScrapeWatermark.query.filter_by(scrape_date=day).one()
+    assert watermark.last_status_no == 912346
+    first_run = watermark.last_run_at
+
+    # A run that only saw older filings never moves the watermark back
+    permits_app._advance_watermark(day, rows(912001))
+    watermark = permits_app.ScrapeWatermark.query.filter_by(scrape_date=day).one()
+    assert watermark.last_status_no == 912346
+    assert watermark.last_run_at >= first_run
+
+
+def test_advance_without_numbered_rows_still_records_the_run(app_context):
+    day = date(2026, 10, 16)
+    permits_app._advance_watermark(day, rows(None))
+    watermark = permits_app.ScrapeWatermark.query.filter_by(scrape_date=day).one()
+    assert watermark.last_status_no is None
+    assert watermark.last_run_at is not None
+
+
+def test_advance_drops_watermarks_past_retention(app_context):
+    day = date(2026, 10, 16)
+    retention = permits_app.WATERMARK_RETENTION_DAYS
+    for age in (retention + 1, retention, 1):
+        permits_app._advance_watermark(day - timedelta(days=age), rows(1))
+    permits_app._advance_watermark(day, rows(2))
+
+    kept = sorted(watermark.scrape_date for watermark in permits_app.ScrapeWatermark.query.all())
+    assert kept == [day - timedelta(days=retention), day - timedelta(days=1), day]
+
+
+class FakeFormSession:
+    """Serves result pages by URL; a page given as an exception fails to load"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.fetched = []
+
+    def fetch(self, url):
+        self.fetched.append(url)
+        page = self.pages[url]
+        if isinstance(page, Exception):
+            raise page
+        return url, None
+
+
+def page_url(offset):
+    return f'https://rrc.test/DP/publicQueryAction.do?pager.offset={offset}'
+
+
+@pytest.fixture
+def walk(monkeypatch):
+    """Run _fetch_pages_above_watermark over numbered pages (page 0 is the first results page)"""
+    monkeypatch.setattr(permits_app, 'PAGE_FETCH_WORKERS', 1)
+    monkeypatch.setattr(permits_app.rrc_rate_limiter, 'min_interval', 0)
+
+    def run(first_rows, later_pages, watermark):
+        pages = {page_url(20 * (number + 1)): page for number, page in enumerate(later_pages)}
+        monkeypatch.setattr(permits_app, 'read_permit_rows', lambda url, encoding=None: pages[url])
+        session = FakeFormSession(pages)
+        result = permits_app._fetch_pages_above_watermark(session, first_rows, list(pages), watermark)
+        assert [url for url, _, _ in result] == sorted(session.fetched, key=permits_app.RRCFormSession.page_offset)
+        return result, [permits_app.RRCFormSession.page_offset(url) // 20 for url in session.fetched]
+
+    return run
+
+
+def test_newest_first_walk_stops_at_the_first_stale_page(walk):
+    pages = [rows(95, 94, 93), rows(92, 91, 90), rows(89, 88, 87)]
+    result, fetched = walk(rows(98, 97, 96), pages, watermark=92)
+    assert fetched == [1, 2]
+    assert [page_rows for _, page_rows, _ in result] == pages[:2]
+
+
+def test_newest_first_walk_skips_everything_when_the_first_page_is_stale(walk):
+    result, fetched = walk(rows(98, 97, 96), [rows(95, 94, 93)], watermark=98)
+    assert result == [] and fetched == []
+
+
+def test_oldest_first_walk_starts_from_the_last_page(walk):
+    pages = [rows(4, 5, 6), rows(7, 8, 9), rows(10, 11, 12)]
+    result, fetched = walk(rows(1, 2, 3), pages, watermark=9)
+    assert fetched == [3, 2]
+    assert [page_rows for _, page_rows, _ in result] == pages[1:]
+
+
+def test_unsorted_first_page_fetches_every_page(walk):
+    with open(os.path.join(FIXTURES, 'rrc_results.html'), encoding='utf-8') as f:
+        first_rows = permits_app.read_permit_rows(f.read())
+    assert [row['status_no'] for row in first_rows] == [912345, 912346, 912340, 912339]
+
+    pages = [rows(912300), rows(912400, 912200), rows(912100)]
+    result, fetched = walk(first_rows, pages, watermark=912346)
+    assert sorted(fetched) == [1, 2, 3]
+    assert len(result) == 3
+
+
+def test_unsorted_later_page_turns_the_stop_off(walk):
+    pages = [rows(95, 97, 94), rows(92, 91, 90), rows(89, 88, 87)]
+    result, fetched = walk(rows(99, 98, 96), pages, watermark=92)
+    assert fetched == [1, 2, 3]
+
+
+def test_failed_page_is_reported_and_the_walk_goes_on(walk):
+    error = ConnectionError('reset')
+    pages = [error, rows(95, 94, 93), rows(92, 91, 90), rows(89, 88, 87)]
+    result, fetched = walk(rows(98, 97, 96), pages, watermark=92)
+    assert fetched == [1, 2, 3]
+    assert result[0][1:] == (None, error)